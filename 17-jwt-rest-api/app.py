@@ -8,10 +8,15 @@ Perfect for IoT applications that need secure device-to-cloud communication.
 
 from flask import Flask, request, jsonify
 from functools import wraps
+from collections import OrderedDict
+import itertools
 import jwt
 import datetime
 import hashlib
 import os
+import signal
+import threading
+import time
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -22,11 +27,20 @@ app = Flask(__name__)
 # Configuration
 app.config['SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'dev-secret-key-change-in-production')
 JWT_EXPIRATION_MINUTES = int(os.getenv('JWT_EXPIRATION_MINUTES', 30))
+JWT_CACHE_SIZE = int(os.getenv('JWT_CACHE_SIZE', 10000))  # 0 disables the cache
 
 # In-memory storage (in production, use a real database)
 users_db = {}  # {username: {password_hash, email, user_id}}
 sensors_db = {}  # {sensor_id: {name, type, location, owner_id}}
 telemetry_db = {}  # {sensor_id: [data_points]}
+sensors_by_owner = {}  # {owner_id: {sensor_id, ...}}, index of sensors_db
+sensor_numbers = itertools.count(1)  # never reused, even after a delete
+
+# Verified tokens, least recently used first
+# {sha256(token): {current_user, exp, secret}}
+token_cache = OrderedDict()
+token_cache_lock = threading.Lock()
+token_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
 
 # Helper function to hash passwords
 def hash_password(password):
@@ -57,6 +71,120 @@ def generate_token(user_id, username):
     return token
 
 
+# Sensor storage, keeping sensors_by_owner in step with sensors_db
+def add_sensor(sensor):
+    """Store a new sensor and index it by owner."""
+    sensors_db[sensor['sensor_id']] = sensor
+    sensors_by_owner.setdefault(sensor['owner_id'], set()).add(sensor['sensor_id'])
+    telemetry_db[sensor['sensor_id']] = []
+
+
+def remove_sensor(sensor_id):
+    """Delete a sensor, its telemetry and its index entry."""
+    sensor = sensors_db.pop(sensor_id)
+    telemetry_db.pop(sensor_id, None)
+
+    owned = sensors_by_owner.get(sensor['owner_id'])
+    if owned is not None:
+        owned.discard(sensor_id)
+        if not owned:
+            del sensors_by_owner[sensor['owner_id']]
+
+
+# Verified-token cache
+def cached_user(token_digest):
+    """
+    Look up a verified token in the cache.
+
+    Entries are only used until the token's own expiration and while
+    the secret key they were verified with is still in use.
+
+    Args:
+        token_digest: SHA-256 hex digest of the token
+
+    Returns:
+        current_user dictionary, or None on a cache miss
+    """
+    with token_cache_lock:
+        entry = token_cache.get(token_digest)
+        if entry and entry['exp'] > time.time() and entry['secret'] == app.config['SECRET_KEY']:
+            token_cache.move_to_end(token_digest)
+            token_cache_stats['hits'] += 1
+            return entry['current_user']
+
+        if entry:
+            del token_cache[token_digest]
+        token_cache_stats['misses'] += 1
+        return None
+
+
+def cache_user(token_digest, current_user, exp):
+    """Cache a verified token until its expiration (Unix time)."""
+    if JWT_CACHE_SIZE <= 0:
+        return
+
+    with token_cache_lock:
+        token_cache[token_digest] = {
+            'current_user': current_user,
+            'exp': exp,
+            'secret': app.config['SECRET_KEY']
+        }
+        token_cache.move_to_end(token_digest)
+        while len(token_cache) > JWT_CACHE_SIZE:
+            token_cache.popitem(last=False)
+            token_cache_stats['evictions'] += 1
+
+
+def invalidate_token_cache():
+    """Forget all verified tokens, e.g. after a key rotation."""
+    with token_cache_lock:
+        token_cache.clear()
+        token_cache_stats['invalidations'] += 1
+
+
+def rotate_secret_key(new_key):
+    """
+    Switch to a new JWT signing key.
+
+    Tokens signed with the old key are rejected from now on, including
+    those already in the verified-token cache.
+
+    Args:
+        new_key: New secret key
+    """
+    app.config['SECRET_KEY'] = new_key
+    invalidate_token_cache()
+
+
+def reload_secret_key(signum=None, frame=None):
+    """
+    Re-read JWT_SECRET_KEY and rotate to it if it changed.
+
+    Installed as the SIGHUP handler: edit .env, then send HUP to the
+    server process. Values in .env override the environment.
+    """
+    load_dotenv(override=True)
+    new_key = os.getenv('JWT_SECRET_KEY', 'dev-secret-key-change-in-production')
+    if new_key == app.config['SECRET_KEY']:
+        print("Secret key unchanged")
+        return
+
+    rotate_secret_key(new_key)
+    print("Secret key rotated: tokens signed with the old key are rejected")
+
+
+def token_cache_info():
+    """Size and hit-rate counters of the verified-token cache."""
+    with token_cache_lock:
+        lookups = token_cache_stats['hits'] + token_cache_stats['misses']
+        return {
+            'size': len(token_cache),
+            'max_size': JWT_CACHE_SIZE,
+            **token_cache_stats,
+            'hit_rate': round(token_cache_stats['hits'] / lookups, 4) if lookups else 0.0
+        }
+
+
 # JWT Token Validation Decorator
 def token_required(f):
     """
@@ -67,6 +195,9 @@ def token_required(f):
         @token_required
         def protected_route(current_user):
             return jsonify({'message': f'Hello {current_user["username"]}'})
+
+    Tokens that were verified before are taken from the verified-token
+    cache instead of being decoded again.
     """
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -85,6 +216,12 @@ def token_required(f):
         if not token:
             return jsonify({'error': 'Missing Authorization header'}), 401
 
+        # Devices send the same token many times; skip verifying it again
+        token_digest = hashlib.sha256(token.encode()).hexdigest()
+        current_user = cached_user(token_digest)
+        if current_user:
+            return f(current_user, *args, **kwargs)
+
         try:
             # Decode and verify token
             payload = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
@@ -92,6 +229,8 @@ def token_required(f):
                 'user_id': payload['user_id'],
                 'username': payload['username']
             }
+            if 'exp' in payload:
+                cache_user(token_digest, current_user, payload['exp'])
         except jwt.ExpiredSignatureError:
             return jsonify({'error': 'Token has expired'}), 401
         except jwt.InvalidTokenError:
@@ -113,7 +252,8 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'service': 'JWT REST API',
-        'timestamp': datetime.datetime.utcnow().isoformat()
+        'timestamp': datetime.datetime.utcnow().isoformat(),
+        'token_cache': token_cache_info()
     })
 
 
@@ -235,11 +375,10 @@ def get_sensors(current_user):
     """Get all sensors owned by current user."""
     user_id = current_user['user_id']
 
-    # Filter sensors by owner
+    # Look up the owner's sensors in the index instead of scanning all sensors
     user_sensors = {
-        sensor_id: sensor_data
-        for sensor_id, sensor_data in sensors_db.items()
-        if sensor_data['owner_id'] == user_id
+        sensor_id: sensors_db[sensor_id]
+        for sensor_id in sensors_by_owner.get(user_id, ())
     }
 
     return jsonify({
@@ -267,19 +406,16 @@ def create_sensor(current_user):
     if not data or not all(k in data for k in ['name', 'type', 'location']):
         return jsonify({'error': 'Missing required fields: name, type, location'}), 400
 
-    # Create sensor
-    sensor_id = f"sensor_{len(sensors_db) + 1}"
-    sensors_db[sensor_id] = {
+    # Create sensor (with empty telemetry storage)
+    sensor_id = f"sensor_{next(sensor_numbers)}"
+    add_sensor({
         'sensor_id': sensor_id,
         'name': data['name'],
         'type': data['type'],
         'location': data['location'],
         'owner_id': current_user['user_id'],
         'created_at': datetime.datetime.utcnow().isoformat()
-    }
-
-    # Initialize telemetry storage for this sensor
-    telemetry_db[sensor_id] = []
+    })
 
     return jsonify({
         'message': 'Sensor created successfully',
@@ -287,6 +423,26 @@ def create_sensor(current_user):
     }), 201
 
 
+@app.route('/api/sensors/<sensor_id>', methods=['DELETE'])
+@token_required
+def delete_sensor(current_user, sensor_id):
+    """Delete a sensor and its telemetry data."""
+    # Check if sensor exists
+    if sensor_id not in sensors_db:
+        return jsonify({'error': 'Sensor not found'}), 404
+
+    # Check ownership
+    if sensors_db[sensor_id]['owner_id'] != current_user['user_id']:
+        return jsonify({'error': 'Access denied'}), 403
+
+    remove_sensor(sensor_id)
+
+    return jsonify({
+        'message': 'Sensor deleted successfully',
+        'sensor_id': sensor_id
+    })
+
+
 @app.route('/api/sensors/<sensor_id>/data', methods=['GET'])
 @token_required
 def get_sensor_data(current_user, sensor_id):
@@ -370,6 +526,7 @@ if __name__ == '__main__':
     print("JWT REST API Server")
     print("=" * 70)
     print(f"Token expiration: {JWT_EXPIRATION_MINUTES} minutes")
+    print(f"Verified-token cache: {JWT_CACHE_SIZE} tokens" if JWT_CACHE_SIZE > 0 else "Verified-token cache: disabled")
     print(f"Secret key configured: {'Yes' if app.config['SECRET_KEY'] != 'dev-secret-key-change-in-production' else 'No (using default)'}")
     print()
     print("Available endpoints:")
@@ -382,6 +539,7 @@ if __name__ == '__main__':
     print("    GET  /api/profile              - Get user profile")
     print("    GET  /api/sensors              - List user's sensors")
     print("    POST /api/sensors              - Create new sensor")
+    print("    DELETE /api/sensors/<id>       - Delete sensor")
     print("    GET  /api/sensors/<id>/data    - Get sensor data")
     print("    POST /api/sensors/<id>/data    - Add sensor data")
     print()
@@ -389,4 +547,8 @@ if __name__ == '__main__':
     print("=" * 70)
     print()
 
+    # kill -HUP <pid> reloads JWT_SECRET_KEY from .env
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, reload_secret_key)
+
     app.run(debug=True, host='0.0.0.0', port=5000)
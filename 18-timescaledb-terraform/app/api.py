@@ -7,12 +7,18 @@ Demonstrates the power of continuous aggregates for fast queries.
 """
 
 from flask import Flask, jsonify, request
-import psycopg2
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import os
+import threading
 from datetime import datetime, timedelta
 import time
 
+from sensor_keys import SENSOR_COLUMNS, SensorDictionary, detect_schema
+from shards import ShardRing, parse_shards
+
 
 app = Flask(__name__)
 
@@ -25,10 +31,399 @@ DB_CONFIG = {
     'password': os.getenv('DB_PASSWORD', 'postgres')
 }
 
+# Database shards (e.g. "shard1=db1:5432,shard2=db2:5432").
+# Without DB_SHARDS the API uses the single database from DB_CONFIG.
+SHARDS = parse_shards(os.getenv('DB_SHARDS', ''), DB_CONFIG)
+SHARD_RING = ShardRing(list(SHARDS))
+DEFAULT_SHARD = next(iter(SHARDS))
+
+
+# Query shapes used by the endpoints (also executed by the warm-up phase).
+# {sensor_column} is sensor_id, or sensor_key on compact-schema shards
+# (see sensor_query).
+SENSOR_LIST_QUERY = """
+    SELECT
+        {sensor_column},
+        MAX(time) as last_reading,
+        COUNT(*) as total_readings
+    FROM sensor_data
+    GROUP BY {sensor_column}
+"""
+
+CURRENT_READING_QUERY = """
+    SELECT time, {sensor_column}, temperature, humidity, pressure
+    FROM sensor_data
+    WHERE {sensor_column} = %s
+    ORDER BY time DESC
+    LIMIT 1
+"""
+
+RAW_DATA_QUERY = """
+    SELECT time, temperature, humidity, pressure
+    FROM sensor_data
+    WHERE {sensor_column} = %s
+    AND time > %s
+    ORDER BY time ASC
+"""
+
+HOT_SENSORS_QUERY = """
+    SELECT {sensor_column}
+    FROM sensor_data
+    WHERE time > %s
+    GROUP BY {sensor_column}
+    ORDER BY COUNT(*) DESC, {sensor_column}
+    LIMIT %s
+"""
+
+AGGREGATE_QUERY_TEMPLATE = """
+    SELECT
+        bucket as time,
+        avg_temperature,
+        min_temperature,
+        max_temperature,
+        avg_humidity,
+        avg_pressure,
+        reading_count
+    FROM {view}
+    WHERE {sensor_column} = %s
+    AND bucket > %s
+    ORDER BY bucket ASC
+"""
+
+AGGREGATE_QUERIES = {
+    aggregation: AGGREGATE_QUERY_TEMPLATE.format(
+        view=f'sensor_data_{aggregation}', sensor_column='{sensor_column}'
+    )
+    for aggregation in ('hourly', 'daily', 'monthly')
+}
+
+# Default period of each endpoint
+DEFAULT_PERIODS = {
+    'raw': '1d',
+    'hourly': '1w',
+    'daily': '1m',
+    'monthly': '1y'
+}
+
+PERFORMANCE_RAW_QUERY = """
+    SELECT
+        time_bucket('1 hour', time) AS hour,
+        AVG(temperature) as avg_temp
+    FROM sensor_data
+    WHERE {sensor_column} = %s
+    AND time > NOW() - INTERVAL '7 days'
+    GROUP BY hour
+    ORDER BY hour
+"""
+
+PERFORMANCE_AGGREGATE_QUERY = """
+    SELECT bucket, avg_temperature
+    FROM sensor_data_hourly
+    WHERE {sensor_column} = %s
+    AND bucket > NOW() - INTERVAL '7 days'
+    ORDER BY bucket
+"""
+
+PERFORMANCE_FLEET_RAW_QUERY = """
+    SELECT
+        time_bucket('1 hour', time) AS hour,
+        AVG(temperature) as avg_temp
+    FROM sensor_data
+    WHERE time > NOW() - INTERVAL '7 days'
+    GROUP BY hour
+    ORDER BY hour
+"""
+
+PERFORMANCE_FLEET_AGGREGATE_QUERY = """
+    SELECT
+        bucket,
+        SUM(avg_temperature * reading_count) / SUM(reading_count) as avg_temperature
+    FROM sensor_data_hourly
+    WHERE bucket > NOW() - INTERVAL '7 days'
+    GROUP BY bucket
+    ORDER BY bucket
+"""
+
+
+# Connection pool configuration (one pool per worker process)
+DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', 1))
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', 10))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))  # seconds to wait for a free connection
+
+# In-process cache of the sensor list, in seconds (0 disables caching).
+# Off by default: a cached list can be up to this many seconds stale.
+SENSOR_LIST_CACHE_TTL = int(os.getenv('SENSOR_LIST_CACHE_TTL', 0))
+
+# Warm-up phase run by every worker before it reports ready
+WARMUP_ENABLED = os.getenv('WARMUP_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+WARMUP_CONNECTIONS = int(os.getenv('WARMUP_CONNECTIONS', 4))
+WARMUP_HOT_SENSORS = int(os.getenv('WARMUP_HOT_SENSORS', 10))
+WARMUP_LOOKBACK = os.getenv('WARMUP_LOOKBACK', '1d')
+
+_pools = {}
+_pools_pid = None
+_pool_lock = threading.Lock()
+
+_sensor_list_cache = {'sensors': None, 'expires': 0.0}
+_sensor_list_lock = threading.Lock()
+
+# sensor_data schema of every shard, detected on first use
+_shard_schemas = {}
+
+# Cached sensor_id <-> sensor_key mapping of every compact-schema shard
+_sensor_dictionaries = {shard: SensorDictionary() for shard in SHARDS}
+
+_warmup_state = {
+    'status': 'pending',
+    'started_at': None,
+    'duration_ms': None,
+    'steps': {},
+    'error': None
+}
+_warmup_pid = None
+_warmup_lock = threading.Lock()
+
+
+class BlockingConnectionPool(ThreadedConnectionPool):
+    """
+    Thread-safe pool that waits for a free connection.
+
+    ThreadedConnectionPool raises PoolError as soon as all maxconn
+    connections are borrowed; here getconn() waits up to
+    DB_POOL_TIMEOUT seconds for one to be returned instead.
+    """
+
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self._available = threading.BoundedSemaphore(maxconn)
+
+    def getconn(self, key=None):
+        if not self._available.acquire(timeout=DB_POOL_TIMEOUT):
+            raise PoolError(f"no free connection within {DB_POOL_TIMEOUT:g} s")
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._available.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._available.release()
+
+
+def get_pool(shard=None):
+    """
+    Get the connection pool of a shard for the current process.
+
+    Pools are created lazily and tied to the process ID, so every
+    pre-forked worker opens its own connections instead of sharing
+    sockets inherited from the master process.
+
+    Args:
+        shard: Shard name (None = default shard)
+
+    Returns:
+        BlockingConnectionPool object
+    """
+    global _pools, _pools_pid
+
+    shard = shard or DEFAULT_SHARD
+
+    with _pool_lock:
+        if _pools_pid != os.getpid():
+            _pools = {}
+            _pools_pid = os.getpid()
+
+        if shard not in _pools:
+            _pools[shard] = BlockingConnectionPool(
+                DB_POOL_MIN,
+                DB_POOL_MAX,
+                cursor_factory=RealDictCursor,
+                **SHARDS[shard]
+            )
+
+        return _pools[shard]
+
+
+def close_pool():
+    """Close all pooled connections of the current process."""
+    global _pools, _pools_pid
+
+    with _pool_lock:
+        if _pools_pid == os.getpid():
+            for pool in _pools.values():
+                pool.closeall()
+        _pools = {}
+        _pools_pid = None
+
+
+@contextmanager
+def get_db_connection(shard=None):
+    """
+    Borrow a database connection (with RealDictCursor) from a shard's pool.
+
+    The connection runs in autocommit mode so that no transaction is
+    left open when it goes back to the pool. Broken connections are
+    discarded instead of being returned.
+
+    Args:
+        shard: Shard name (None = default shard)
+    """
+    pool = get_pool(shard)
+    conn = pool.getconn()
+    try:
+        conn.autocommit = True
+        yield conn
+    finally:
+        pool.putconn(conn, close=bool(conn.closed))
+
+
+def scatter_gather(func):
+    """
+    Run a function on every shard in parallel.
+
+    Args:
+        func: Function taking a shard name
+
+    Returns:
+        Dictionary {shard_name: result} (first exception is re-raised)
+    """
+    if len(SHARDS) == 1:
+        return {DEFAULT_SHARD: func(DEFAULT_SHARD)}
+
+    with ThreadPoolExecutor(max_workers=len(SHARDS)) as executor:
+        futures = {shard: executor.submit(func, shard) for shard in SHARDS}
+        return {shard: future.result() for shard, future in futures.items()}
+
+
+def shard_schema(shard, cursor):
+    """
+    Get the sensor_data schema of a shard ('standard' or 'compact').
+
+    Detected once per process; restart the API after re-initializing
+    a shard with another schema.
+    """
+    schema = _shard_schemas.get(shard)
+    if schema is None:
+        schema = _shard_schemas[shard] = detect_schema(cursor)
+    return schema
+
+
+def sensor_query(query, shard, cursor):
+    """Fill in the sensor column of a query shape for a shard's schema."""
+    return query.format(sensor_column=SENSOR_COLUMNS[shard_schema(shard, cursor)])
+
+
+def encode_sensor(shard, cursor, sensor_id):
+    """
+    Translate a sensor_id into the value of a shard's sensor column.
+
+    Returns:
+        sensor_id itself (standard schema), its cached sensor_key
+        (compact schema), or None for a sensor the shard does not know
+    """
+    if shard_schema(shard, cursor) == 'standard':
+        return sensor_id
+    return _sensor_dictionaries[shard].encode(cursor, [sensor_id]).get(sensor_id)
+
+
+def decode_sensors(shard, cursor, rows):
+    """
+    Replace sensor_key by sensor_id in the result rows of a compact shard.
+
+    Keys missing from the sensors table are reported as their number.
+
+    Returns:
+        The rows, changed in place
+    """
+    if rows and shard_schema(shard, cursor) == 'compact':
+        names = _sensor_dictionaries[shard].decode(cursor, [row['sensor_key'] for row in rows])
+        for row in rows:
+            key = row.pop('sensor_key')
+            row['sensor_id'] = names.get(key, str(key))
+    return rows
+
+
+def execute_for_sensor(cursor, shard, query, sensor_id, *params):
+    """
+    Run a query shape filtered by one sensor on a shard.
+
+    The sensor (translated to its key on compact shards) is passed as
+    the first query parameter, followed by params. An unknown sensor
+    matches no rows.
+    """
+    cursor.execute(
+        sensor_query(query, shard, cursor),
+        (encode_sensor(shard, cursor, sensor_id),) + params
+    )
+
+
+def merge_sensor_lists(shard_results):
+    """
+    Merge per-shard sensor lists into one list sorted by sensor_id.
+
+    A sensor found on several shards (e.g. while rebalancing) is
+    reported once with its latest reading and total reading count.
+
+    Args:
+        shard_results: Iterable of sensor row lists
+
+    Returns:
+        List of sensor rows
+    """
+    merged = {}
+
+    for sensors in shard_results:
+        for sensor in sensors:
+            existing = merged.get(sensor['sensor_id'])
+            if existing is None:
+                merged[sensor['sensor_id']] = dict(sensor)
+            else:
+                existing['last_reading'] = max(existing['last_reading'], sensor['last_reading'])
+                existing['total_readings'] += sensor['total_readings']
+
+    return [merged[sensor_id] for sensor_id in sorted(merged)]
+
+
+def get_sensor_list(refresh=False):
+    """
+    Get all sensors with their latest reading time from all shards.
+
+    If SENSOR_LIST_CACHE_TTL is set, the result is cached in-process
+    for that many seconds because the query aggregates the whole
+    hypertable.
+
+    Args:
+        refresh: Bypass the cache and query the database
+
+    Returns:
+        List of sensor rows
+    """
+    now = time.monotonic()
 
-def get_db_connection():
-    """Get database connection with RealDictCursor."""
-    return psycopg2.connect(**DB_CONFIG, cursor_factory=RealDictCursor)
+    with _sensor_list_lock:
+        cached = _sensor_list_cache['sensors']
+        if not refresh and cached is not None and now < _sensor_list_cache['expires']:
+            return cached
+
+    def fetch_sensors(shard):
+        with get_db_connection(shard) as conn:
+            cursor = conn.cursor()
+            cursor.execute(sensor_query(SENSOR_LIST_QUERY, shard, cursor))
+            sensors = decode_sensors(shard, cursor, cursor.fetchall())
+            cursor.close()
+        return sensors
+
+    sensors = merge_sensor_lists(scatter_gather(fetch_sensors).values())
+
+    if SENSOR_LIST_CACHE_TTL > 0:
+        with _sensor_list_lock:
+            _sensor_list_cache['sensors'] = sensors
+            _sensor_list_cache['expires'] = now + SENSOR_LIST_CACHE_TTL
+
+    return sensors
 
 
 def parse_period(period_str):
@@ -67,15 +462,208 @@ def parse_period(period_str):
         return timedelta(days=1)
 
 
+def find_hot_sensors(cursor, shard, since, limit):
+    """
+    Find the sensors with the most readings since a point in time.
+
+    Args:
+        cursor: Database cursor
+        shard: Shard name the cursor belongs to
+        since: datetime lower bound
+        limit: Maximum number of sensors
+
+    Returns:
+        List of sensor IDs
+    """
+    cursor.execute(sensor_query(HOT_SENSORS_QUERY, shard, cursor), (since, limit))
+    rows = decode_sensors(shard, cursor, cursor.fetchall())
+
+    return [row['sensor_id'] for row in rows]
+
+
+def prewarm_recent_chunks(cursor, since):
+    """
+    Load the most recent hypertable chunks into shared buffers.
+
+    Uses the pg_prewarm extension when it is installed in the database.
+
+    Args:
+        cursor: Database cursor
+        since: datetime lower bound for chunks
+
+    Returns:
+        Number of blocks loaded (None if pg_prewarm is unavailable)
+    """
+    cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_prewarm'")
+    if not cursor.fetchone():
+        return None
+
+    cursor.execute("""
+        SELECT COALESCE(SUM(pg_prewarm(chunk)), 0) AS blocks
+        FROM show_chunks('sensor_data', newer_than => %s::timestamptz) AS chunk
+    """, (since,))
+
+    return int(cursor.fetchone()['blocks'])
+
+
+def warm_up_shard(shard, since):
+    """
+    Warm up the connection pool and data of one shard.
+
+    Args:
+        shard: Shard name
+        since: datetime lower bound for "recent" data
+
+    Returns:
+        Dictionary with the timings of each step
+    """
+    steps = {}
+    pool = get_pool(shard)
+
+    # Step 1: Open connections
+    start = time.time()
+    connections = []
+    try:
+        for _ in range(min(WARMUP_CONNECTIONS, DB_POOL_MAX)):
+            conn = pool.getconn()
+            conn.autocommit = True
+            connections.append(conn)
+
+        cursor = connections[0].cursor()
+        hot_sensors = find_hot_sensors(cursor, shard, since, WARMUP_HOT_SENSORS)
+        cursor.close()
+        steps['connections'] = {
+            'opened': len(connections),
+            'time_ms': round((time.time() - start) * 1000, 2)
+        }
+
+        # Step 2: Execute each query shape on every connection
+        start = time.time()
+        sample_sensor = hot_sensors[0] if hot_sensors else 'sensor_001'
+        for conn in connections:
+            cursor = conn.cursor()
+            execute_for_sensor(cursor, shard, CURRENT_READING_QUERY, sample_sensor)
+            execute_for_sensor(cursor, shard, RAW_DATA_QUERY, sample_sensor, datetime.now())
+            for query in AGGREGATE_QUERIES.values():
+                execute_for_sensor(cursor, shard, query, sample_sensor, datetime.now())
+            execute_for_sensor(cursor, shard, PERFORMANCE_AGGREGATE_QUERY, sample_sensor)
+            cursor.close()
+        steps['statements'] = {
+            'connections': len(connections),
+            'time_ms': round((time.time() - start) * 1000, 2)
+        }
+
+        # Step 3: Touch recent chunks and aggregate buckets
+        start = time.time()
+        cursor = connections[0].cursor()
+        blocks = prewarm_recent_chunks(cursor, since)
+        rows = 0
+        for sensor_id in hot_sensors:
+            execute_for_sensor(cursor, shard, CURRENT_READING_QUERY, sensor_id)
+            execute_for_sensor(cursor, shard, RAW_DATA_QUERY, sensor_id, since)
+            rows += len(cursor.fetchall())
+            for aggregation, query in AGGREGATE_QUERIES.items():
+                period = parse_period(DEFAULT_PERIODS[aggregation])
+                execute_for_sensor(cursor, shard, query, sensor_id, datetime.now() - period)
+                rows += len(cursor.fetchall())
+        cursor.close()
+        steps['data'] = {
+            'hot_sensors': hot_sensors,
+            'rows_read': rows,
+            'prewarmed_blocks': blocks,
+            'time_ms': round((time.time() - start) * 1000, 2)
+        }
+    finally:
+        for conn in connections:
+            pool.putconn(conn, close=bool(conn.closed))
+
+    return steps
+
+
+def warm_up():
+    """
+    Warm up the current worker before it reports ready.
+
+    Steps (on all shards in parallel):
+        1. Open WARMUP_CONNECTIONS pooled connections
+        2. Run every endpoint query shape once on each connection
+           (loads catalog caches and plans in each backend)
+        3. Read the most recent chunks and aggregate buckets of the
+           hottest sensors (and pg_prewarm the chunks if available)
+    Then:
+        4. Run the sensor list query (and fill its cache if enabled)
+
+    Progress and timings are recorded in _warmup_state.
+    """
+    steps = _warmup_state['steps']
+    since = datetime.now() - parse_period(WARMUP_LOOKBACK)
+    start_warmup = time.time()
+
+    _warmup_state['status'] = 'running'
+    _warmup_state['started_at'] = datetime.now().isoformat()
+
+    try:
+        steps['shards'] = scatter_gather(lambda shard: warm_up_shard(shard, since))
+
+        # Step 4: Pre-populate caches
+        start = time.time()
+        sensors = get_sensor_list(refresh=True)
+        steps['caches'] = {
+            'sensor_list': len(sensors),
+            'time_ms': round((time.time() - start) * 1000, 2)
+        }
+
+        _warmup_state['status'] = 'done'
+
+    except Exception as e:
+        _warmup_state['status'] = 'failed'
+        _warmup_state['error'] = str(e)
+
+    _warmup_state['duration_ms'] = round((time.time() - start_warmup) * 1000, 2)
+    print(f"[pid {os.getpid()}] Warm-up {_warmup_state['status']} "
+          f"in {_warmup_state['duration_ms']} ms", flush=True)
+
+
+def start_warmup():
+    """
+    Start the warm-up phase in a background thread (once per process).
+
+    The worker serves requests immediately, but /api/ready reports
+    503 until warm-up has finished.
+    """
+    global _warmup_pid
+
+    with _warmup_lock:
+        if _warmup_pid == os.getpid():
+            return
+        _warmup_pid = os.getpid()
+
+        if not WARMUP_ENABLED:
+            _warmup_state['status'] = 'disabled'
+            return
+
+        _warmup_state['status'] = 'pending'
+        _warmup_state['steps'] = {}
+        threading.Thread(target=warm_up, name='warmup', daemon=True).start()
+
+
+def ping_shard(shard):
+    """Check that a shard accepts queries."""
+    with get_db_connection(shard) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.close()
+
+
 @app.route('/api/health', methods=['GET'])
 def health():
     """Health check endpoint."""
     try:
-        conn = get_db_connection()
-        conn.close()
+        scatter_gather(ping_shard)
         return jsonify({
             'status': 'healthy',
             'service': 'TimescaleDB API',
+            'shards': len(SHARDS),
             'timestamp': datetime.now().isoformat()
         })
     except Exception as e:
@@ -85,26 +673,42 @@ def health():
         }), 500
 
 
+@app.route('/api/ready', methods=['GET'])
+def ready():
+    """
+    Readiness check endpoint.
+
+    Reports 503 until the warm-up phase of this worker has finished
+    successfully and the database is reachable. Readiness is tracked
+    per worker process: the check is answered by whichever worker
+    accepts the request. Warm-up is started here if no server hook
+    started it (e.g. gunicorn without -c gunicorn.conf.py).
+    """
+    start_warmup()
+    warmup = dict(_warmup_state)
+
+    if warmup['status'] in ('pending', 'running'):
+        return jsonify({'status': 'warming_up', 'warmup': warmup}), 503
+
+    if warmup['status'] == 'failed':
+        return jsonify({'status': 'warmup_failed', 'warmup': warmup}), 503
+
+    try:
+        scatter_gather(ping_shard)
+        return jsonify({'status': 'ready', 'warmup': warmup})
+    except Exception as e:
+        return jsonify({
+            'status': 'not_ready',
+            'error': str(e),
+            'warmup': warmup
+        }), 503
+
+
 @app.route('/api/sensors', methods=['GET'])
 def list_sensors():
     """List all sensors with their latest reading time."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT
-                sensor_id,
-                MAX(time) as last_reading,
-                COUNT(*) as total_readings
-            FROM sensor_data
-            GROUP BY sensor_id
-            ORDER BY sensor_id
-        """)
-
-        sensors = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        sensors = get_sensor_list()
 
         return jsonify({
             'sensors': sensors,
@@ -119,20 +723,16 @@ def list_sensors():
 def get_current_reading(sensor_id):
     """Get the most recent reading for a sensor."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        shard = SHARD_RING.shard_for(sensor_id)
+        with get_db_connection(shard) as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            SELECT time, sensor_id, temperature, humidity, pressure
-            FROM sensor_data
-            WHERE sensor_id = %s
-            ORDER BY time DESC
-            LIMIT 1
-        """, (sensor_id,))
+            execute_for_sensor(cursor, shard, CURRENT_READING_QUERY, sensor_id)
 
-        reading = cursor.fetchone()
-        cursor.close()
-        conn.close()
+            reading = cursor.fetchone()
+            if reading:
+                decode_sensors(shard, cursor, [reading])
+            cursor.close()
 
         if not reading:
             return jsonify({'error': 'Sensor not found'}), 404
@@ -151,7 +751,7 @@ def get_raw_data(sensor_id):
     Query params:
         period: Time period (e.g., '1h', '1d', '1w')
     """
-    period_str = request.args.get('period', '1d')
+    period_str = request.args.get('period', DEFAULT_PERIODS['raw'])
     period = parse_period(period_str)
 
     start_time = datetime.now() - period
@@ -159,20 +759,14 @@ def get_raw_data(sensor_id):
     try:
         start_query = time.time()
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        shard = SHARD_RING.shard_for(sensor_id)
+        with get_db_connection(shard) as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            SELECT time, temperature, humidity, pressure
-            FROM sensor_data
-            WHERE sensor_id = %s
-            AND time > %s
-            ORDER BY time ASC
-        """, (sensor_id, start_time))
+            execute_for_sensor(cursor, shard, RAW_DATA_QUERY, sensor_id, start_time)
 
-        data = cursor.fetchall()
-        cursor.close()
-        conn.close()
+            data = cursor.fetchall()
+            cursor.close()
 
         query_time = time.time() - start_query
 
@@ -196,7 +790,7 @@ def get_hourly_aggregates(sensor_id):
     Query params:
         period: Time period (e.g., '1d', '1w', '1m')
     """
-    period_str = request.args.get('period', '1w')
+    period_str = request.args.get('period', DEFAULT_PERIODS['hourly'])
     period = parse_period(period_str)
 
     start_time = datetime.now() - period
@@ -204,27 +798,14 @@ def get_hourly_aggregates(sensor_id):
     try:
         start_query = time.time()
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        shard = SHARD_RING.shard_for(sensor_id)
+        with get_db_connection(shard) as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            SELECT
-                bucket as time,
-                avg_temperature,
-                min_temperature,
-                max_temperature,
-                avg_humidity,
-                avg_pressure,
-                reading_count
-            FROM sensor_data_hourly
-            WHERE sensor_id = %s
-            AND bucket > %s
-            ORDER BY bucket ASC
-        """, (sensor_id, start_time))
-
-        data = cursor.fetchall()
-        cursor.close()
-        conn.close()
+            execute_for_sensor(cursor, shard, AGGREGATE_QUERIES['hourly'], sensor_id, start_time)
+
+            data = cursor.fetchall()
+            cursor.close()
 
         query_time = time.time() - start_query
 
@@ -249,7 +830,7 @@ def get_daily_aggregates(sensor_id):
     Query params:
         period: Time period (e.g., '1w', '1m', '1y')
     """
-    period_str = request.args.get('period', '1m')
+    period_str = request.args.get('period', DEFAULT_PERIODS['daily'])
     period = parse_period(period_str)
 
     start_time = datetime.now() - period
@@ -257,27 +838,14 @@ def get_daily_aggregates(sensor_id):
     try:
         start_query = time.time()
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        shard = SHARD_RING.shard_for(sensor_id)
+        with get_db_connection(shard) as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            SELECT
-                bucket as time,
-                avg_temperature,
-                min_temperature,
-                max_temperature,
-                avg_humidity,
-                avg_pressure,
-                reading_count
-            FROM sensor_data_daily
-            WHERE sensor_id = %s
-            AND bucket > %s
-            ORDER BY bucket ASC
-        """, (sensor_id, start_time))
-
-        data = cursor.fetchall()
-        cursor.close()
-        conn.close()
+            execute_for_sensor(cursor, shard, AGGREGATE_QUERIES['daily'], sensor_id, start_time)
+
+            data = cursor.fetchall()
+            cursor.close()
 
         query_time = time.time() - start_query
 
@@ -302,7 +870,7 @@ def get_monthly_aggregates(sensor_id):
     Query params:
         period: Time period (e.g., '1y', '2y')
     """
-    period_str = request.args.get('period', '1y')
+    period_str = request.args.get('period', DEFAULT_PERIODS['monthly'])
     period = parse_period(period_str)
 
     start_time = datetime.now() - period
@@ -310,27 +878,14 @@ def get_monthly_aggregates(sensor_id):
     try:
         start_query = time.time()
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        shard = SHARD_RING.shard_for(sensor_id)
+        with get_db_connection(shard) as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            SELECT
-                bucket as time,
-                avg_temperature,
-                min_temperature,
-                max_temperature,
-                avg_humidity,
-                avg_pressure,
-                reading_count
-            FROM sensor_data_monthly
-            WHERE sensor_id = %s
-            AND bucket > %s
-            ORDER BY bucket ASC
-        """, (sensor_id, start_time))
-
-        data = cursor.fetchall()
-        cursor.close()
-        conn.close()
+            execute_for_sensor(cursor, shard, AGGREGATE_QUERIES['monthly'], sensor_id, start_time)
+
+            data = cursor.fetchall()
+            cursor.close()
 
         query_time = time.time() - start_query
 
@@ -347,55 +902,108 @@ def get_monthly_aggregates(sensor_id):
         return jsonify({'error': str(e)}), 500
 
 
+def timed_query(shard, query, sensor_id=None):
+    """
+    Run a query on a shard and measure its execution time.
+
+    Args:
+        shard: Shard name
+        query: SQL query (a query shape if sensor_id is given)
+        sensor_id: Sensor the query shape is filtered by
+
+    Returns:
+        Tuple (rows, seconds)
+    """
+    with get_db_connection(shard) as conn:
+        cursor = conn.cursor()
+        params = None
+        if sensor_id is not None:
+            # Translate outside the timed part
+            query = sensor_query(query, shard, cursor)
+            params = (encode_sensor(shard, cursor, sensor_id),)
+        start = time.time()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        elapsed = time.time() - start
+        cursor.close()
+
+    return rows, elapsed
+
+
+def fleet_performance_comparison():
+    """
+    Compare raw and aggregate queries over the whole fleet.
+
+    Each query runs on all shards in parallel; the reported time is
+    the wall-clock time of the scatter-gather, per-shard times are
+    listed separately.
+    """
+    start = time.time()
+    raw_results = scatter_gather(lambda shard: timed_query(shard, PERFORMANCE_FLEET_RAW_QUERY))
+    raw_time = time.time() - start
+
+    start = time.time()
+    agg_results = scatter_gather(lambda shard: timed_query(shard, PERFORMANCE_FLEET_AGGREGATE_QUERY))
+    agg_time = time.time() - start
+
+    raw_hours = {row['hour'] for rows, _ in raw_results.values() for row in rows}
+    agg_hours = {row['bucket'] for rows, _ in agg_results.values() for row in rows}
+
+    speedup = raw_time / agg_time if agg_time > 0 else 0
+
+    return jsonify({
+        'scope': 'fleet',
+        'period': '7 days',
+        'shards': {
+            shard: {
+                'raw_time_ms': round(raw_results[shard][1] * 1000, 2),
+                'aggregate_time_ms': round(agg_results[shard][1] * 1000, 2)
+            }
+            for shard in SHARDS
+        },
+        'raw_query': {
+            'time_ms': round(raw_time * 1000, 2),
+            'data_points': len(raw_hours)
+        },
+        'aggregate_query': {
+            'time_ms': round(agg_time * 1000, 2),
+            'data_points': len(agg_hours)
+        },
+        'speedup': f"{speedup:.1f}x",
+        'improvement_percent': round((1 - agg_time / raw_time) * 100, 1)
+    })
+
+
 @app.route('/api/stats/performance', methods=['GET'])
 def performance_comparison():
     """
     Compare performance between raw queries and continuous aggregates.
 
     Demonstrates the power of continuous aggregates.
+
+    Query params:
+        sensor_id: Sensor to test (default: sensor_001)
+        scope: 'sensor' (default) or 'fleet' for all sensors on all shards
     """
     sensor_id = request.args.get('sensor_id', 'sensor_001')
 
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        if request.args.get('scope') == 'fleet':
+            return fleet_performance_comparison()
 
-        results = {}
+        shard = SHARD_RING.shard_for(sensor_id)
 
         # Test 1: Raw query for hourly averages (last week)
-        start = time.time()
-        cursor.execute("""
-            SELECT
-                time_bucket('1 hour', time) AS hour,
-                AVG(temperature) as avg_temp
-            FROM sensor_data
-            WHERE sensor_id = %s
-            AND time > NOW() - INTERVAL '7 days'
-            GROUP BY hour
-            ORDER BY hour
-        """, (sensor_id,))
-        raw_data = cursor.fetchall()
-        raw_time = time.time() - start
+        raw_data, raw_time = timed_query(shard, PERFORMANCE_RAW_QUERY, sensor_id)
 
         # Test 2: Continuous aggregate query
-        start = time.time()
-        cursor.execute("""
-            SELECT bucket, avg_temperature
-            FROM sensor_data_hourly
-            WHERE sensor_id = %s
-            AND bucket > NOW() - INTERVAL '7 days'
-            ORDER BY bucket
-        """, (sensor_id,))
-        agg_data = cursor.fetchall()
-        agg_time = time.time() - start
-
-        cursor.close()
-        conn.close()
+        agg_data, agg_time = timed_query(shard, PERFORMANCE_AGGREGATE_QUERY, sensor_id)
 
         speedup = raw_time / agg_time if agg_time > 0 else 0
 
         return jsonify({
             'sensor_id': sensor_id,
+            'shard': shard,
             'period': '7 days',
             'raw_query': {
                 'time_ms': round(raw_time * 1000, 2),
@@ -417,10 +1025,12 @@ if __name__ == '__main__':
     print("=" * 60)
     print("TimescaleDB REST API")
     print("=" * 60)
-    print(f"Database: {DB_CONFIG['database']} @ {DB_CONFIG['host']}:{DB_CONFIG['port']}")
+    for shard, config in SHARDS.items():
+        print(f"Database ({shard}): {config['database']} @ {config['host']}:{config['port']}")
     print()
     print("Endpoints:")
     print("  GET  /api/health")
+    print("  GET  /api/ready")
     print("  GET  /api/sensors")
     print("  GET  /api/sensors/<id>/current")
     print("  GET  /api/sensors/<id>/raw?period=1d")
@@ -428,9 +1038,12 @@ if __name__ == '__main__':
     print("  GET  /api/sensors/<id>/daily?period=1m")
     print("  GET  /api/sensors/<id>/monthly?period=1y")
     print("  GET  /api/stats/performance?sensor_id=sensor_001")
+    print("  GET  /api/stats/performance?scope=fleet")
     print()
-    print("Starting server on http://0.0.0.0:5000")
+    print("Starting development server on http://0.0.0.0:5000")
+    print("For production use: gunicorn -c gunicorn.conf.py api:app")
     print("=" * 60)
     print()
 
+    start_warmup()
     app.run(host='0.0.0.0', port=5000, debug=False)
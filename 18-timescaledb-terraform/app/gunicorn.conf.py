@@ -0,0 +1,89 @@
+"""
+Gunicorn configuration for the TimescaleDB REST API
+
+Production entry point with pre-forked workers, threads per worker
+and one database connection pool per worker process.
+
+Usage:
+    gunicorn -c gunicorn.conf.py api:app
+
+Graceful reload:
+    kill -HUP <master_pid>    # restart workers, keep listening socket
+
+All settings can be overridden with environment variables.
+"""
+
+import os
+
+
+def available_cpus():
+    """
+    Count the CPUs this process may run on.
+
+    Respects CPU affinity (e.g. docker --cpuset-cpus) where supported.
+
+    Returns:
+        Number of usable CPU cores
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# Server socket
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+backlog = 2048
+
+# Workers: (2 x cores) + 1 pre-forked processes, each with a thread pool.
+# Requests mostly wait on PostgreSQL, so threads keep every worker busy.
+workers = int(os.getenv('GUNICORN_WORKERS', available_cpus() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+keepalive = 5
+
+# Load the application once in the master before forking workers
+preload_app = True
+
+# Timeouts and graceful shutdown/reload
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# Recycle workers periodically to bound memory growth
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+# Logging
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    """Log the effective worker layout once the master is ready."""
+    server.log.info(
+        "TimescaleDB API ready: %d workers x %d threads (%d CPUs)",
+        workers, threads, available_cpus()
+    )
+
+
+def post_fork(server, worker):
+    """Give every worker its own connection pool."""
+    from api import close_pool
+
+    # Drop any pool inherited from the master (preload_app)
+    close_pool()
+
+
+def post_worker_init(worker):
+    """Warm up the worker's pool and caches before it reports ready."""
+    from api import start_warmup
+
+    start_warmup()
+
+
+def worker_exit(server, worker):
+    """Close pooled connections when a worker shuts down."""
+    from api import close_pool
+
+    close_pool()
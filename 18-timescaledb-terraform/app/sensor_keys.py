@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Sensor Dictionary Encoding for TimescaleDB
+
+The compact schema (init_database.py --schema compact) stores a small
+integer sensor_key in sensor_data and its aggregates instead of the
+sensor_id string. The sensors table maps one to the other:
+
+    sensors (sensor_key INTEGER PRIMARY KEY, sensor_id VARCHAR(50) UNIQUE)
+
+Keys are assigned by each database, so every shard has its own sensors
+table and needs its own SensorDictionary. A sensor never changes its
+key, which makes the mapping safe to cache for the life of a process.
+"""
+
+import threading
+
+
+# Column identifying the sensor in sensor_data and its aggregates
+SENSOR_COLUMNS = {
+    'standard': 'sensor_id',
+    'compact': 'sensor_key'
+}
+
+SCHEMA_QUERY = """
+    SELECT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'sensor_data' AND column_name = 'sensor_key'
+    )
+"""
+
+
+def row_values(row):
+    """Get the values of a row from a tuple or a dictionary cursor."""
+    return tuple(row.values()) if isinstance(row, dict) else tuple(row)
+
+
+def detect_schema(cursor):
+    """
+    Detect the sensor_data schema of a database.
+
+    Args:
+        cursor: Database cursor (tuple or dictionary rows)
+
+    Returns:
+        'compact' if sensor_data has a sensor_key column, else 'standard'
+    """
+    cursor.execute(SCHEMA_QUERY)
+    return 'compact' if row_values(cursor.fetchone())[0] else 'standard'
+
+
+class SensorDictionary:
+    """
+    Cached two-way mapping between sensor_id and sensor_key of one database.
+
+    Lookups that miss the cache go to the sensors table in one query
+    per call; unknown sensors are not cached, so sensors registered
+    later by another process are found on the next lookup.
+    """
+
+    def __init__(self):
+        self.keys = {}
+        self.names = {}
+        self.lock = threading.Lock()
+
+    def store(self, rows):
+        """Cache (sensor_key, sensor_id) rows."""
+        with self.lock:
+            for row in rows:
+                key, name = row_values(row)
+                self.keys[name] = key
+                self.names[key] = name
+
+    def encode(self, cursor, sensor_ids, register=False):
+        """
+        Get the keys of sensors.
+
+        Args:
+            cursor: Database cursor
+            sensor_ids: Iterable of sensor identifiers
+            register: Insert sensors missing from the sensors table
+                      (the caller commits)
+
+        Returns:
+            Dictionary {sensor_id: sensor_key}; unknown sensors are left out
+        """
+        sensor_ids = list(sensor_ids)
+        missing = sorted({name for name in sensor_ids if name not in self.keys})
+
+        if missing:
+            if register:
+                # Sorted, so concurrent loaders lock the same rows in the same order
+                cursor.execute("""
+                    INSERT INTO sensors (sensor_id)
+                    SELECT unnest(%s::text[])
+                    ON CONFLICT (sensor_id) DO NOTHING
+                """, (missing,))
+            cursor.execute(
+                "SELECT sensor_key, sensor_id FROM sensors WHERE sensor_id = ANY(%s)", (missing,)
+            )
+            self.store(cursor.fetchall())
+
+        return {name: self.keys[name] for name in sensor_ids if name in self.keys}
+
+    def decode(self, cursor, sensor_keys):
+        """
+        Get the identifiers of sensor keys.
+
+        Args:
+            cursor: Database cursor
+            sensor_keys: Iterable of sensor keys
+
+        Returns:
+            Dictionary {sensor_key: sensor_id}; unknown keys are left out
+        """
+        sensor_keys = list(sensor_keys)
+        missing = sorted({key for key in sensor_keys if key not in self.names})
+
+        if missing:
+            cursor.execute(
+                "SELECT sensor_key, sensor_id FROM sensors WHERE sensor_key = ANY(%s)", (missing,)
+            )
+            self.store(cursor.fetchall())
+
+        return {key: self.names[key] for key in sensor_keys if key in self.names}
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Sensor Sharding for TimescaleDB
+
+Maps sensors to database shards with consistent hashing of sensor_id.
+Adding or removing a shard only moves about 1/N of the sensors.
+
+Shards are configured as a comma-separated list (DB_SHARDS / --shards):
+    shard1=db1:5432,shard2=db2:5432,shard3=db3:5432/iotdata
+
+Placement depends only on the shard names, so the API (inside Docker)
+and the scripts (on the host) can reach the same shards under
+different addresses as long as they use the same names.
+"""
+
+import bisect
+import hashlib
+
+
+# Points per shard on the hash ring (more = more even distribution)
+VIRTUAL_NODES = 160
+
+
+def parse_shards(spec, base_config):
+    """
+    Parse a shard list into database configurations.
+
+    Args:
+        spec: Comma-separated '[name=]host[:port][/database]' entries
+              (empty = single database from base_config)
+        base_config: Default database configuration
+
+    Returns:
+        Dictionary {shard_name: db_config}, in configuration order
+    """
+    if not spec or not spec.strip():
+        return {'shard1': dict(base_config)}
+
+    shards = {}
+
+    for index, entry in enumerate(spec.split(',')):
+        entry = entry.strip()
+        if not entry:
+            continue
+
+        name = f"shard{index + 1}"
+        if '=' in entry:
+            name, entry = entry.split('=', 1)
+
+        config = dict(base_config)
+
+        if '/' in entry:
+            entry, config['database'] = entry.split('/', 1)
+        if ':' in entry:
+            entry, port = entry.split(':', 1)
+            config['port'] = int(port)
+        if entry:
+            config['host'] = entry
+
+        if name in shards:
+            raise ValueError(f"Duplicate shard name: {name}")
+        shards[name] = config
+
+    return shards
+
+
+def stable_hash(key):
+    """
+    Hash a string to a 64-bit integer.
+
+    Unlike hash(), the result is the same in every process.
+
+    Args:
+        key: String to hash
+
+    Returns:
+        Integer in [0, 2**64)
+    """
+    digest = hashlib.md5(key.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+class ShardRing:
+    """Consistent hash ring mapping sensor IDs to shard names."""
+
+    def __init__(self, shard_names, virtual_nodes=VIRTUAL_NODES):
+        """
+        Build the hash ring.
+
+        Args:
+            shard_names: List of shard names
+            virtual_nodes: Points per shard on the ring
+        """
+        if not shard_names:
+            raise ValueError("At least one shard is required")
+
+        self.shard_names = list(shard_names)
+
+        points = sorted(
+            (stable_hash(f"{name}#{i}"), name)
+            for name in self.shard_names
+            for i in range(virtual_nodes)
+        )
+        self._hashes = [point[0] for point in points]
+        self._names = [point[1] for point in points]
+
+    def shard_for(self, sensor_id):
+        """
+        Get the shard that owns a sensor.
+
+        Args:
+            sensor_id: Sensor identifier
+
+        Returns:
+            Shard name
+        """
+        if len(self.shard_names) == 1:
+            return self.shard_names[0]
+
+        index = bisect.bisect(self._hashes, stable_hash(sensor_id))
+        return self._names[index % len(self._names)]
+
+    def partition(self, sensor_ids):
+        """
+        Group sensors by owning shard.
+
+        Args:
+            sensor_ids: Iterable of sensor identifiers
+
+        Returns:
+            Dictionary {shard_name: [sensor_ids]} (all shards present)
+        """
+        groups = {name: [] for name in self.shard_names}
+        for sensor_id in sensor_ids:
+            groups[self.shard_for(sensor_id)].append(sensor_id)
+        return groups
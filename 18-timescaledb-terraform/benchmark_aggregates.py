@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Continuous Aggregate Refresh Benchmark
+
+Compares refresh time of the two aggregate layouts of init_database.py:
+- flat: hourly, daily and monthly all built from raw sensor_data
+- hierarchical: daily built from hourly, monthly from daily
+
+Both layouts are created side by side as bench_flat_* and
+bench_hierarchical_* views on the existing data, so the real
+aggregates are not touched. For each level the benchmark measures a
+full refresh and an incremental refresh after the newest day of raw
+data was rewritten, then checks that both layouts agree.
+"""
+
+import argparse
+from datetime import timedelta
+import json
+import sys
+import time
+
+from benchmark_utils import connect, data_anchor, database_config, print_table, sensor_column
+from init_database import (
+    AGGREGATE_LAYOUTS, AGGREGATE_LEVELS, create_continuous_aggregates, drop_continuous_aggregates
+)
+
+
+def refresh(cursor, view, start=None, end=None):
+    """
+    Refresh a continuous aggregate window.
+
+    Returns:
+        Seconds the refresh took
+    """
+    began = time.time()
+    cursor.execute("CALL refresh_continuous_aggregate(%s, %s, %s)", (view, start, end))
+    return time.time() - began
+
+
+def invalidate_recent(cursor, since):
+    """Rewrite raw rows since a time unchanged, so their buckets need a refresh."""
+    cursor.execute("UPDATE sensor_data SET temperature = temperature WHERE time > %s", (since,))
+    return cursor.rowcount
+
+
+def compare_layouts(cursor, level):
+    """
+    Compare one aggregate level of both layouts.
+
+    Returns:
+        Dictionary with the number of buckets, buckets whose
+        reading_count differs, and the largest avg_temperature difference
+    """
+    cursor.execute(f"""
+        SELECT
+            count(*),
+            count(*) FILTER (WHERE f.reading_count IS DISTINCT FROM h.reading_count),
+            max(abs(f.avg_temperature - h.avg_temperature))
+        FROM bench_flat_{level} f
+        FULL JOIN bench_hierarchical_{level} h USING (bucket, {sensor_column(cursor)})
+    """)
+    buckets, count_mismatches, max_avg_difference = cursor.fetchone()
+    return {
+        'buckets': buckets,
+        'count_mismatches': count_mismatches,
+        'max_avg_difference': float(max_avg_difference or 0)
+    }
+
+
+def run_benchmark(db_config, invalidate_days, keep):
+    """
+    Run the refresh benchmark for both layouts.
+
+    Args:
+        db_config: Database configuration
+        invalidate_days: Days of newest raw data rewritten before the
+                         incremental refresh
+        keep: Leave the bench_* views in place
+
+    Returns:
+        Dictionary with refresh times per layout and level, and the
+        layout comparison
+    """
+    conn = connect(db_config)
+    cursor = conn.cursor()
+
+    sensor_id, anchor = data_anchor(cursor)
+    if sensor_id is None:
+        print("✗ sensor_data is empty - run generate_data.py first")
+        sys.exit(1)
+
+    results = {'layouts': {}, 'comparison': {}}
+    since = anchor - timedelta(days=invalidate_days)
+
+    for layout in AGGREGATE_LAYOUTS:
+        prefix = f"bench_{layout}"
+        drop_continuous_aggregates(conn, prefix)
+        create_continuous_aggregates(conn, layout, prefix)
+
+        print(f"\nRefreshing {layout} layout...")
+        full = {}
+        for level, _ in AGGREGATE_LEVELS:
+            full[level] = refresh(cursor, f"{prefix}_{level}")
+            print(f"  {level}: full refresh {full[level]:.2f} s")
+
+        rows = invalidate_recent(cursor, since)
+        print(f"  Rewrote {rows:,} raw rows of the last {invalidate_days} day(s)")
+
+        incremental = {}
+        for level, _ in AGGREGATE_LEVELS:
+            incremental[level] = refresh(cursor, f"{prefix}_{level}")
+            print(f"  {level}: incremental refresh {incremental[level]:.2f} s")
+
+        results['layouts'][layout] = {'full': full, 'incremental': incremental}
+
+    for level, _ in AGGREGATE_LEVELS:
+        results['comparison'][level] = compare_layouts(cursor, level)
+
+    if not keep:
+        for layout in AGGREGATE_LAYOUTS:
+            drop_continuous_aggregates(conn, f"bench_{layout}")
+
+    cursor.close()
+    conn.close()
+    return results
+
+
+def print_results(results):
+    """Print refresh times and the layout comparison."""
+    print()
+    print("=" * 60)
+    print("Refresh time (seconds)")
+    print("=" * 60)
+
+    rows = []
+    for level, _ in AGGREGATE_LEVELS:
+        row = [level]
+        for layout in AGGREGATE_LAYOUTS:
+            timings = results['layouts'][layout]
+            row += [f"{timings['full'][level]:.2f}", f"{timings['incremental'][level]:.2f}"]
+        rows.append(row)
+
+    totals = ['total']
+    for layout in AGGREGATE_LAYOUTS:
+        timings = results['layouts'][layout]
+        totals += [f"{sum(timings['full'].values()):.2f}", f"{sum(timings['incremental'].values()):.2f}"]
+    rows.append(totals)
+
+    headers = ['Level']
+    for layout in AGGREGATE_LAYOUTS:
+        headers += [f"{layout} full", f"{layout} incremental"]
+    print_table(headers, rows)
+
+    print()
+    print("Layout comparison (flat vs hierarchical):")
+    for level, comparison in results['comparison'].items():
+        status = "✓" if not comparison['count_mismatches'] and comparison['max_avg_difference'] < 1e-9 else "✗"
+        print(f"  {status} {level}: {comparison['buckets']:,} buckets, "
+              f"{comparison['count_mismatches']} reading_count mismatches, "
+              f"max avg_temperature difference {comparison['max_avg_difference']:.2e}")
+    print()
+
+
+def main():
+    """Main function with argument parsing."""
+    parser = argparse.ArgumentParser(
+        description='Benchmark refresh time of flat and hierarchical continuous aggregates'
+    )
+
+    parser.add_argument(
+        '--database',
+        type=str,
+        default='',
+        help='Database to benchmark as host[:port][/database] (default: localhost:5432/iotdata)'
+    )
+
+    parser.add_argument(
+        '--invalidate-days',
+        type=int,
+        default=1,
+        help='Days of newest data rewritten before the incremental refresh (default: 1)'
+    )
+
+    parser.add_argument(
+        '--keep',
+        action='store_true',
+        help='Keep the bench_flat_* and bench_hierarchical_* views afterwards'
+    )
+
+    parser.add_argument(
+        '--json',
+        type=str,
+        default=None,
+        help='Also write the results to this JSON file'
+    )
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Continuous Aggregate Refresh Benchmark")
+    print("=" * 60)
+
+    results = run_benchmark(database_config(args.database), args.invalidate_days, args.keep)
+    print_results(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Compression Benchmark for TimescaleDB
+
+Measures what native compression does to sensor_data:
+1. Table size and API query latency on uncompressed chunks
+2. Compresses all chunks with the chosen segmentby/orderby
+3. Table size and API query latency on compressed chunks
+
+The aggregate query shapes are measured as well: their real-time part
+(buckets not materialized yet) reads the raw chunks.
+
+By default the chunks are decompressed again at the end and the
+previous compression settings are restored, so the benchmark can be
+repeated with other settings on the same data.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import psycopg2
+
+from benchmark_utils import (
+    RAW_QUERY_SHAPES, aggregate_shapes, connect, data_anchor, database_config,
+    format_bytes, hypertable_size, print_table, run_query_shapes, sensor_column, summarize
+)
+
+
+def compression_state(cursor):
+    """
+    Get the compression state of sensor_data.
+
+    Returns:
+        (compression enabled, number of compressed chunks, number of chunks)
+    """
+    cursor.execute("""
+        SELECT compression_enabled FROM timescaledb_information.hypertables
+        WHERE hypertable_name = 'sensor_data'
+    """)
+    row = cursor.fetchone()
+    if row is None:
+        print("✗ sensor_data is not a hypertable - run init_database.py first")
+        sys.exit(1)
+
+    cursor.execute("""
+        SELECT count(*) FILTER (WHERE is_compressed), count(*)
+        FROM timescaledb_information.chunks
+        WHERE hypertable_name = 'sensor_data'
+    """)
+    compressed, chunks = cursor.fetchone()
+    return row[0], compressed, chunks
+
+
+def compression_settings(cursor):
+    """
+    Read the current segmentby/orderby settings of sensor_data.
+
+    Returns:
+        (segmentby, orderby) as accepted by ALTER TABLE ... SET, or
+        None if compression is not configured
+    """
+    try:
+        # TimescaleDB 2.14+
+        cursor.execute("""
+            SELECT coalesce(compress_segmentby, ''), coalesce(compress_orderby, '')
+            FROM timescaledb_information.hypertable_compression_settings
+            WHERE hypertable = 'sensor_data'::regclass
+        """)
+        return cursor.fetchone()
+    except psycopg2.Error:
+        pass
+
+    cursor.execute("""
+        SELECT attname, segmentby_column_index, orderby_column_index, orderby_asc, orderby_nullsfirst
+        FROM timescaledb_information.compression_settings
+        WHERE hypertable_name = 'sensor_data'
+    """)
+    rows = cursor.fetchall()
+    if not rows:
+        return None
+
+    segmentby = [row for row in rows if row[1] is not None]
+    orderby = [row for row in rows if row[2] is not None]
+    return (
+        ', '.join(row[0] for row in sorted(segmentby, key=lambda row: row[1])),
+        ', '.join(
+            f"{row[0]} {'ASC' if row[3] else 'DESC'} NULLS {'FIRST' if row[4] else 'LAST'}"
+            for row in sorted(orderby, key=lambda row: row[2])
+        )
+    )
+
+
+def compress_all(cursor, segmentby, orderby):
+    """
+    Enable compression and compress every chunk of sensor_data.
+
+    Returns:
+        Seconds spent compressing
+    """
+    cursor.execute("""
+        ALTER TABLE sensor_data SET (
+            timescaledb.compress,
+            timescaledb.compress_segmentby = %s,
+            timescaledb.compress_orderby = %s
+        )
+    """, (segmentby, orderby))
+
+    start = time.time()
+    cursor.execute("""
+        SELECT compress_chunk(c, if_not_compressed => true)
+        FROM show_chunks('sensor_data') c
+    """)
+    cursor.fetchall()
+    return time.time() - start
+
+
+def decompress_all(cursor, was_enabled, settings):
+    """
+    Decompress every chunk and restore the previous compression settings.
+
+    Args:
+        cursor: Database cursor
+        was_enabled: Compression was enabled before the benchmark
+        settings: (segmentby, orderby) before the benchmark (see
+                  compression_settings)
+    """
+    cursor.execute("""
+        SELECT decompress_chunk(c, if_compressed => true)
+        FROM show_chunks('sensor_data') c
+    """)
+    cursor.fetchall()
+
+    if not was_enabled:
+        cursor.execute("ALTER TABLE sensor_data SET (timescaledb.compress = false)")
+    elif settings:
+        cursor.execute("""
+            ALTER TABLE sensor_data SET (
+                timescaledb.compress_segmentby = %s,
+                timescaledb.compress_orderby = %s
+            )
+        """, settings)
+
+
+def run_benchmark(db_config, segmentby, orderby, repeat, keep):
+    """
+    Run the compression benchmark.
+
+    Args:
+        db_config: Database configuration
+        segmentby: compress_segmentby setting (None = the sensor column)
+        orderby: compress_orderby setting
+        repeat: Timed executions per query shape
+        keep: Leave the chunks compressed
+
+    Returns:
+        Dictionary with sizes and latency summaries
+    """
+    conn = connect(db_config)
+    cursor = conn.cursor()
+
+    was_enabled, compressed, chunks = compression_state(cursor)
+    if compressed:
+        print(f"✗ {compressed} of {chunks} chunks are already compressed.")
+        print("  Decompress them first so the baseline is uncompressed:")
+        print("  SELECT decompress_chunk(c, true) FROM show_chunks('sensor_data') c;")
+        sys.exit(1)
+
+    sensor_id, anchor = data_anchor(cursor)
+    if sensor_id is None:
+        print("✗ sensor_data is empty - run generate_data.py first")
+        sys.exit(1)
+
+    if segmentby is None:
+        segmentby = sensor_column(cursor)
+
+    shapes = RAW_QUERY_SHAPES + aggregate_shapes(cursor)
+
+    settings = compression_settings(cursor) if was_enabled else None
+
+    print(f"✓ {chunks} chunks, newest reading {anchor} (queries use {sensor_id})")
+    print()
+
+    # Uncompressed baseline
+    print("Measuring uncompressed chunks...")
+    size_before = hypertable_size(cursor)
+    before = run_query_shapes(cursor, shapes, sensor_id, anchor, repeat)
+
+    print(f"Compressing (segmentby: '{segmentby}', orderby: '{orderby}')...")
+    try:
+        compress_seconds = compress_all(cursor, segmentby, orderby)
+
+        print("Measuring compressed chunks...")
+        size_after = hypertable_size(cursor)
+        after = run_query_shapes(cursor, shapes, sensor_id, anchor, repeat)
+    finally:
+        if keep:
+            print("Keeping chunks compressed (--keep)")
+            if settings:
+                print(f"Note: previous settings (segmentby: '{settings[0]}', orderby: '{settings[1]}') "
+                      "were replaced; decompress the chunks to restore them")
+        else:
+            print("Decompressing...")
+            decompress_all(cursor, was_enabled, settings)
+
+    cursor.close()
+    conn.close()
+
+    return {
+        'segmentby': segmentby,
+        'orderby': orderby,
+        'chunks': chunks,
+        'size_before_bytes': size_before,
+        'size_after_bytes': size_after,
+        'compress_seconds': round(compress_seconds, 2),
+        'latency_ms': {
+            name: {'uncompressed': summarize(before[name]), 'compressed': summarize(after[name])}
+            for name in shapes
+        }
+    }
+
+
+def print_results(results):
+    """Print sizes and a latency comparison table."""
+    before = results['size_before_bytes']
+    after = results['size_after_bytes']
+
+    print()
+    print("=" * 60)
+    print("Results")
+    print("=" * 60)
+    print(f"  Size uncompressed: {format_bytes(before)}")
+    print(f"  Size compressed:   {format_bytes(after)}"
+          f" ({before / after if after else 0:.1f}x smaller)")
+    print(f"  Compression time:  {results['compress_seconds']:.1f} s")
+    print()
+
+    rows = []
+    for name, latency in results['latency_ms'].items():
+        uncompressed = latency['uncompressed']['p50']
+        compressed = latency['compressed']['p50']
+        rows.append([
+            name,
+            f"{uncompressed:.2f}",
+            f"{compressed:.2f}",
+            f"{compressed / uncompressed if uncompressed else 0:.2f}x"
+        ])
+
+    print_table(['Query shape', 'Uncompressed p50 (ms)', 'Compressed p50 (ms)', 'Ratio'], rows)
+    print()
+
+
+def main():
+    """Main function with argument parsing."""
+    parser = argparse.ArgumentParser(
+        description='Benchmark table size and query latency with native compression'
+    )
+
+    parser.add_argument(
+        '--database',
+        type=str,
+        default='',
+        help='Database to benchmark as host[:port][/database] (default: localhost:5432/iotdata)'
+    )
+
+    parser.add_argument(
+        '--segmentby',
+        type=str,
+        default=None,
+        help='compress_segmentby columns, empty for none '
+             '(default: sensor_id, or sensor_key in the compact schema)'
+    )
+
+    parser.add_argument(
+        '--orderby',
+        type=str,
+        default='time DESC',
+        help='compress_orderby setting (default: "time DESC")'
+    )
+
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=5,
+        help='Timed executions per query shape (default: 5)'
+    )
+
+    parser.add_argument(
+        '--keep',
+        action='store_true',
+        help='Leave the chunks compressed instead of decompressing them afterwards'
+    )
+
+    parser.add_argument(
+        '--json',
+        type=str,
+        default=None,
+        help='Also write the results to this JSON file'
+    )
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("TimescaleDB Compression Benchmark")
+    print("=" * 60)
+    print()
+
+    results = run_benchmark(
+        database_config(args.database),
+        segmentby=args.segmentby,
+        orderby=args.orderby,
+        repeat=args.repeat,
+        keep=args.keep
+    )
+    print_results(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Index Profile Benchmark for TimescaleDB
+
+Compares the index profiles of init_database.py --indexes on the
+existing sensor_data:
+1. Builds the profile's indexes (and drops the others)
+2. Measures index size and API query latency
+3. Measures insert throughput: a sample of the newest rows is inserted
+   again right after the newest reading, inside a transaction that is
+   rolled back, so the data is left unchanged
+
+The indexes sensor_data had before are restored at the end.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from benchmark_utils import (
+    RAW_QUERY_SHAPES, connect, data_anchor, database_config, format_bytes,
+    print_table, run_query_shapes, sensor_column, summarize
+)
+from init_database import INDEX_PROFILES, apply_index_profile, current_index_profile
+
+
+def index_sizes(cursor):
+    """
+    Get the heap and index size of sensor_data.
+
+    Returns:
+        (table bytes, index bytes) over all chunks
+    """
+    cursor.execute("SELECT table_bytes, index_bytes FROM hypertable_detailed_size('sensor_data')")
+    table_bytes, index_bytes = cursor.fetchone()
+    return table_bytes or 0, index_bytes or 0
+
+
+def prepare_insert_sample(cursor, column, anchor, rows):
+    """
+    Copy the newest rows into a temporary table, moved to after the anchor.
+
+    Args:
+        cursor: Database cursor
+        column: Sensor column of the schema
+        anchor: Time of the newest reading
+        rows: Number of rows
+
+    Returns:
+        Number of rows in the sample
+    """
+    cursor.execute("DROP TABLE IF EXISTS bench_insert_sample")
+    cursor.execute(f"""
+        CREATE TEMP TABLE bench_insert_sample AS
+        SELECT time, {column}, temperature, humidity, pressure
+        FROM sensor_data
+        ORDER BY time DESC
+        LIMIT %s
+    """, (rows,))
+    cursor.execute("""
+        UPDATE bench_insert_sample
+        SET time = time + (%s - (SELECT min(time) FROM bench_insert_sample)) + INTERVAL '1 second'
+    """, (anchor,))
+    cursor.execute("SELECT count(*) FROM bench_insert_sample")
+    return cursor.fetchone()[0]
+
+
+def time_inserts(cursor, column, repeat):
+    """
+    Time inserting the sample into sensor_data, rolling back every time.
+
+    Returns:
+        List of durations in seconds
+    """
+    durations = []
+    for _ in range(repeat):
+        cursor.execute("BEGIN")
+        start = time.perf_counter()
+        cursor.execute(f"""
+            INSERT INTO sensor_data (time, {column}, temperature, humidity, pressure)
+            SELECT time, {column}, temperature, humidity, pressure
+            FROM bench_insert_sample
+            ORDER BY time
+        """)
+        durations.append(time.perf_counter() - start)
+        cursor.execute("ROLLBACK")
+    return durations
+
+
+def run_benchmark(db_config, profiles, repeat, insert_rows, insert_repeat):
+    """
+    Run the index benchmark.
+
+    Args:
+        db_config: Database configuration
+        profiles: Index profiles to compare
+        repeat: Timed executions per query shape
+        insert_rows: Rows per timed insert
+        insert_repeat: Timed inserts per profile
+
+    Returns:
+        Dictionary with results per profile
+    """
+    conn = connect(db_config)
+    cursor = conn.cursor()
+
+    sensor_id, anchor = data_anchor(cursor)
+    if sensor_id is None:
+        print("✗ sensor_data is empty - run generate_data.py first")
+        sys.exit(1)
+
+    column = sensor_column(cursor)
+    original = current_index_profile(cursor, column)
+    print(f"✓ Newest reading {anchor} (queries use {sensor_id}), "
+          f"current profile: {original or 'custom'}")
+
+    # Index-only scans need an up-to-date visibility map
+    print("Vacuuming sensor_data...")
+    cursor.execute("VACUUM ANALYZE sensor_data")
+
+    sample = prepare_insert_sample(cursor, column, anchor, insert_rows)
+    print(f"✓ Insert sample: {sample:,} rows")
+
+    results = {'insert_rows': sample, 'original_profile': original, 'profiles': {}}
+
+    try:
+        for profile in profiles:
+            print(f"\nProfile {profile}...")
+            start = time.time()
+            apply_index_profile(conn, profile, column)
+            build_seconds = time.time() - start
+            cursor.execute("ANALYZE sensor_data")
+
+            table_bytes, index_bytes = index_sizes(cursor)
+            latencies = run_query_shapes(cursor, RAW_QUERY_SHAPES, sensor_id, anchor, repeat)
+            durations = time_inserts(cursor, column, insert_repeat)
+            insert_seconds = float(np.median(durations))
+
+            results['profiles'][profile] = {
+                'build_seconds': round(build_seconds, 2),
+                'table_bytes': table_bytes,
+                'index_bytes': index_bytes,
+                'insert_rows_per_second': round(sample / insert_seconds) if insert_seconds else 0,
+                'latency_ms': {name: summarize(values) for name, values in latencies.items()}
+            }
+            print(f"  Indexes {format_bytes(index_bytes)}, built in {build_seconds:.1f} s, "
+                  f"insert {results['profiles'][profile]['insert_rows_per_second']:,} rows/s")
+    finally:
+        restore = original or 'default'
+        print(f"\nRestoring the {restore} profile...")
+        apply_index_profile(conn, restore, column)
+        cursor.close()
+        conn.close()
+
+    return results
+
+
+def print_results(results):
+    """Print sizes, insert throughput and query latency per profile."""
+    profiles = results['profiles']
+
+    print()
+    print("=" * 60)
+    print(f"Results (insert batch: {results['insert_rows']:,} rows)")
+    print("=" * 60)
+
+    rows = []
+    for profile, result in profiles.items():
+        rows.append([
+            profile,
+            format_bytes(result['index_bytes']),
+            f"{result['build_seconds']:.1f}",
+            f"{result['insert_rows_per_second']:,}"
+        ])
+    print_table(['Profile', 'Index size', 'Build (s)', 'Insert (rows/s)'], rows)
+    print()
+
+    rows = []
+    for name in RAW_QUERY_SHAPES:
+        rows.append([name] + [
+            f"{profiles[profile]['latency_ms'][name]['p50']:.2f}" for profile in profiles
+        ])
+    print_table(['Query shape p50 (ms)'] + list(profiles), rows)
+    print()
+
+
+def main():
+    """Main function with argument parsing."""
+    parser = argparse.ArgumentParser(
+        description='Benchmark insert throughput and query latency of the index profiles'
+    )
+
+    parser.add_argument(
+        '--database',
+        type=str,
+        default='',
+        help='Database to benchmark as host[:port][/database] (default: localhost:5432/iotdata)'
+    )
+
+    parser.add_argument(
+        '--profiles',
+        type=str,
+        default=','.join(INDEX_PROFILES),
+        help=f"Comma-separated index profiles to compare (default: {','.join(INDEX_PROFILES)})"
+    )
+
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=5,
+        help='Timed executions per query shape (default: 5)'
+    )
+
+    parser.add_argument(
+        '--insert-rows',
+        type=int,
+        default=100000,
+        help='Rows per timed insert (default: 100000)'
+    )
+
+    parser.add_argument(
+        '--insert-repeat',
+        type=int,
+        default=3,
+        help='Timed inserts per profile, the median is reported (default: 3)'
+    )
+
+    parser.add_argument(
+        '--json',
+        type=str,
+        default=None,
+        help='Also write the results to this JSON file'
+    )
+
+    args = parser.parse_args()
+
+    profiles = [profile.strip() for profile in args.profiles.split(',') if profile.strip()]
+    unknown = [profile for profile in profiles if profile not in INDEX_PROFILES]
+    if unknown:
+        parser.error(f"Unknown index profile(s): {', '.join(unknown)}")
+
+    print("=" * 60)
+    print("TimescaleDB Index Profile Benchmark")
+    print("=" * 60)
+    print()
+
+    results = run_benchmark(
+        database_config(args.database),
+        profiles,
+        repeat=args.repeat,
+        insert_rows=args.insert_rows,
+        insert_repeat=args.insert_repeat
+    )
+    print_results(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
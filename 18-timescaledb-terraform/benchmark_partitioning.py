@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Space Partitioning Benchmark for TimescaleDB
+
+Compares a time-only hypertable with one that is also hash-partitioned
+by sensor (init_database.py --space-partitions). Both are built as
+copies of the newest days of sensor_data (bench_time_only and
+bench_space), with the same chunk interval and indexes, then the API's
+single-sensor and fleet-wide query shapes are timed on each. The
+number of chunks every query scans is read from its plan.
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import timedelta
+
+from benchmark_utils import (
+    RAW_QUERY_SHAPES, connect, data_anchor, database_config, format_bytes,
+    hypertable_size, print_table, run_query_shapes, sensor_column, shape_query, summarize
+)
+
+
+def chunk_interval(cursor):
+    """Chunk time interval of sensor_data."""
+    cursor.execute("""
+        SELECT time_interval FROM timescaledb_information.dimensions
+        WHERE hypertable_name = 'sensor_data' AND dimension_type = 'Time'
+    """)
+    return cursor.fetchone()[0]
+
+
+def build_copy(cursor, table, column, since, interval, partitions=None):
+    """
+    Create a hypertable copy of sensor_data since a point in time.
+
+    Args:
+        cursor: Database cursor
+        table: Name of the copy
+        column: Sensor column of the schema
+        since: Copy readings newer than this
+        interval: Chunk time interval
+        partitions: Hash partitions by sensor (None = time only)
+
+    Returns:
+        Seconds spent loading the rows
+    """
+    cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    cursor.execute(f"CREATE TABLE {table} (LIKE sensor_data INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+
+    if partitions:
+        cursor.execute("""
+            SELECT create_hypertable(%s, 'time', %s, %s,
+                chunk_time_interval => %s, create_default_indexes => FALSE)
+        """, (table, column, partitions, interval))
+    else:
+        cursor.execute("""
+            SELECT create_hypertable(%s, 'time',
+                chunk_time_interval => %s, create_default_indexes => FALSE)
+        """, (table, interval))
+
+    cursor.execute(f"CREATE INDEX ON {table} ({column}, time DESC)")
+    cursor.execute(f"CREATE INDEX ON {table} (time DESC)")
+
+    start = time.time()
+    cursor.execute(f"""
+        INSERT INTO {table} (time, {column}, temperature, humidity, pressure)
+        SELECT time, {column}, temperature, humidity, pressure
+        FROM sensor_data
+        WHERE time > %s
+        ORDER BY time
+    """, (since,))
+    load_seconds = time.time() - start
+
+    cursor.execute(f"VACUUM ANALYZE {table}")
+    return load_seconds
+
+
+def chunks_scanned(cursor, query, params):
+    """
+    Count the chunks a query's plan scans (after chunk exclusion).
+
+    Returns:
+        Number of distinct chunk relations in the plan
+    """
+    cursor.execute("EXPLAIN (FORMAT JSON) " + query, params)
+    plan = cursor.fetchone()[0]
+
+    chunks = set()
+    nodes = [plan[0]['Plan']]
+    while nodes:
+        node = nodes.pop()
+        if node.get('Relation Name', '').startswith('_hyper_'):
+            chunks.add(node['Relation Name'])
+        nodes.extend(node.get('Plans', []))
+    return len(chunks)
+
+
+def run_benchmark(db_config, partitions, days, repeat, keep):
+    """
+    Run the partitioning benchmark.
+
+    Args:
+        db_config: Database configuration
+        partitions: Hash partitions of the space-partitioned copy
+        days: Days of newest data to copy
+        repeat: Timed executions per query shape
+        keep: Leave the bench_* tables in place
+
+    Returns:
+        Dictionary with results per layout
+    """
+    conn = connect(db_config)
+    cursor = conn.cursor()
+
+    sensor_id, anchor = data_anchor(cursor)
+    if sensor_id is None:
+        print("✗ sensor_data is empty - run generate_data.py first")
+        sys.exit(1)
+
+    column = sensor_column(cursor)
+    interval = chunk_interval(cursor)
+    since = anchor - timedelta(days=days)
+    print(f"✓ Copying {days} day(s) up to {anchor}, chunk interval {interval} "
+          f"(queries use {sensor_id})")
+
+    layouts = {'time_only': None, 'space': partitions}
+    results = {'partitions': partitions, 'days': days, 'layouts': {}}
+
+    try:
+        for layout, layout_partitions in layouts.items():
+            table = f"bench_{layout}"
+            print(f"\nBuilding {table}...")
+            load_seconds = build_copy(cursor, table, column, since, interval, layout_partitions)
+
+            cursor.execute("SELECT count(*) FROM show_chunks(%s)", (table,))
+            chunks = cursor.fetchone()[0]
+
+            latencies = run_query_shapes(cursor, RAW_QUERY_SHAPES, sensor_id, anchor, repeat, table)
+            scanned = {
+                name: chunks_scanned(cursor, *shape_query(name, column, sensor_id, anchor, table))
+                for name in RAW_QUERY_SHAPES
+            }
+
+            results['layouts'][layout] = {
+                'chunks': chunks,
+                'size_bytes': hypertable_size(cursor, table),
+                'load_seconds': round(load_seconds, 2),
+                'chunks_scanned': scanned,
+                'latency_ms': {name: summarize(values) for name, values in latencies.items()}
+            }
+            print(f"  {chunks} chunks, loaded in {load_seconds:.1f} s")
+    finally:
+        if not keep:
+            for layout in layouts:
+                cursor.execute(f"DROP TABLE IF EXISTS bench_{layout}")
+        cursor.close()
+        conn.close()
+
+    return results
+
+
+def print_results(results):
+    """Print load time, chunk counts and query latency of both layouts."""
+    layouts = results['layouts']
+
+    print()
+    print("=" * 60)
+    print(f"Results ({results['days']} day(s), {results['partitions']} space partitions)")
+    print("=" * 60)
+
+    print_table(
+        ['Layout', 'Chunks', 'Size', 'Load (s)'],
+        [
+            [layout, result['chunks'], format_bytes(result['size_bytes']), f"{result['load_seconds']:.1f}"]
+            for layout, result in layouts.items()
+        ]
+    )
+    print()
+
+    headers = ['Query shape']
+    for layout in layouts:
+        headers += [f"{layout} p50 (ms)", f"{layout} chunks"]
+
+    rows = []
+    for name in RAW_QUERY_SHAPES:
+        row = [name]
+        for result in layouts.values():
+            row += [f"{result['latency_ms'][name]['p50']:.2f}", result['chunks_scanned'][name]]
+        rows.append(row)
+    print_table(headers, rows)
+    print()
+
+
+def main():
+    """Main function with argument parsing."""
+    parser = argparse.ArgumentParser(
+        description='Benchmark a sensor hash space dimension against time-only partitioning'
+    )
+
+    parser.add_argument(
+        '--database',
+        type=str,
+        default='',
+        help='Database to benchmark as host[:port][/database] (default: localhost:5432/iotdata)'
+    )
+
+    parser.add_argument(
+        '--partitions',
+        type=int,
+        default=4,
+        help='Hash partitions of the space-partitioned copy (default: 4)'
+    )
+
+    parser.add_argument(
+        '--days',
+        type=int,
+        default=7,
+        help='Days of newest data copied into both layouts (default: 7)'
+    )
+
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=5,
+        help='Timed executions per query shape (default: 5)'
+    )
+
+    parser.add_argument(
+        '--keep',
+        action='store_true',
+        help='Keep the bench_time_only and bench_space tables afterwards'
+    )
+
+    parser.add_argument(
+        '--json',
+        type=str,
+        default=None,
+        help='Also write the results to this JSON file'
+    )
+
+    args = parser.parse_args()
+
+    if args.partitions < 2:
+        parser.error("--partitions must be at least 2")
+
+    print("=" * 60)
+    print("TimescaleDB Space Partitioning Benchmark")
+    print("=" * 60)
+    print()
+
+    results = run_benchmark(
+        database_config(args.database),
+        partitions=args.partitions,
+        days=args.days,
+        repeat=args.repeat,
+        keep=args.keep
+    )
+    print_results(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
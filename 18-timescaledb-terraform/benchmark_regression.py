@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+"""
+Performance Regression Suite for the TimescaleDB Stack
+
+Runs the whole stack on a fixed dataset and compares the numbers with
+a stored baseline:
+1. Recreates a dedicated benchmark database (default iotbench) and
+   initializes it with init_database.py's settings under test
+2. Loads a deterministic dataset with generate_data.py (fixed seed,
+   ending at the start of the run) and measures the ingest rate
+3. Times a full refresh_aggregates.py run, and an incremental run
+   after the newest day of raw data was rewritten
+4. Starts the API with gunicorn on the benchmark database and measures
+   per-endpoint latency with client_test.py's load mode
+
+The results are written to JSON. With --baseline they are compared
+metric by metric and the script exits with status 1 if any metric is
+worse than the baseline by more than --threshold.
+"""
+
+import argparse
+from datetime import datetime, timedelta
+import json
+import os
+import subprocess
+import sys
+import time
+
+import requests
+
+from benchmark_aggregates import invalidate_recent
+from benchmark_utils import DB_CONFIG, connect, database_config, print_table
+from client_test import DEFAULT_MIX, parse_mix, run_load_test
+from generate_data import generate_data
+from init_database import AGGREGATE_LAYOUTS, INDEX_PROFILES, SENSOR_SCHEMAS, initialize_database
+from refresh_aggregates import refresh_aggregates
+
+
+# Absolute increase of an error rate that counts as a regression
+ERROR_RATE_TOLERANCE = 0.01
+
+# Seconds to wait for the API to report ready
+API_READY_TIMEOUT = 120
+
+
+def recreate_database(db_config):
+    """
+    Drop and create the benchmark database, with the timescaledb extension.
+
+    Args:
+        db_config: Configuration of the benchmark database
+    """
+    admin = connect(dict(db_config, database='postgres'))
+    cursor = admin.cursor()
+    print(f"Recreating database {db_config['database']}...")
+    cursor.execute(f'DROP DATABASE IF EXISTS "{db_config["database"]}"')
+    cursor.execute(f'CREATE DATABASE "{db_config["database"]}"')
+    cursor.close()
+    admin.close()
+
+    conn = connect(db_config)
+    cursor = conn.cursor()
+    cursor.execute("CREATE EXTENSION IF NOT EXISTS timescaledb")
+    cursor.close()
+    conn.close()
+    print("✓ Database created")
+
+
+def server_versions(db_config):
+    """PostgreSQL and TimescaleDB version of the benchmark database."""
+    conn = connect(db_config)
+    cursor = conn.cursor()
+    cursor.execute("SHOW server_version")
+    postgres = cursor.fetchone()[0]
+    cursor.execute("SELECT extversion FROM pg_extension WHERE extname = 'timescaledb'")
+    timescaledb = cursor.fetchone()[0]
+    cursor.close()
+    conn.close()
+    return {'postgres': postgres, 'timescaledb': timescaledb}
+
+
+def measure_ingest(db_config, dataset, workers):
+    """
+    Load the deterministic dataset and measure the ingest rate.
+
+    Returns:
+        Dictionary with the number of rows and rows per second
+    """
+    start = time.time()
+    generate_data(
+        days=dataset['days'],
+        num_sensors=dataset['sensors'],
+        interval_seconds=dataset['interval_seconds'],
+        shards={'shard1': db_config},
+        workers=workers,
+        seed=dataset['seed'],
+        end_time=datetime.fromisoformat(dataset['end_time'])
+    )
+    seconds = time.time() - start
+
+    conn = connect(db_config)
+    cursor = conn.cursor()
+    cursor.execute("SELECT count(*) FROM sensor_data")
+    rows = cursor.fetchone()[0]
+    # Same statistics and visibility map for every run
+    cursor.execute("VACUUM ANALYZE sensor_data")
+    cursor.close()
+    conn.close()
+
+    return {'rows': rows, 'rows_per_second': rows / seconds if seconds > 0 else 0}
+
+
+def measure_refresh(db_config, invalidate_days=1):
+    """
+    Time a full refresh and an incremental refresh of all aggregates.
+
+    Returns:
+        Dictionary with the seconds of both refreshes and whether every
+        window of both was refreshed
+    """
+    conn = connect(db_config)
+    cursor = conn.cursor()
+
+    print("\nFull refresh...")
+    start = time.time()
+    succeeded = refresh_aggregates(conn, full=True)
+    full_seconds = time.time() - start
+
+    cursor.execute("SELECT max(time) FROM sensor_data")
+    newest = cursor.fetchone()[0]
+    rows = invalidate_recent(cursor, newest - timedelta(days=invalidate_days))
+    print(f"\nIncremental refresh after rewriting {rows:,} rows of the last {invalidate_days} day(s)...")
+    start = time.time()
+    succeeded = refresh_aggregates(conn) and succeeded
+    incremental_seconds = time.time() - start
+
+    cursor.close()
+    conn.close()
+    return {'full_seconds': full_seconds, 'incremental_seconds': incremental_seconds, 'succeeded': succeeded}
+
+
+def start_api(db_config, port, workers):
+    """
+    Start the API with gunicorn on the benchmark database.
+
+    Returns:
+        The gunicorn process, or None if it did not become ready
+    """
+    env = dict(
+        os.environ,
+        DB_HOST=db_config['host'],
+        DB_PORT=str(db_config['port']),
+        DB_NAME=db_config['database'],
+        DB_USER=db_config['user'],
+        DB_PASSWORD=db_config['password'],
+        DB_SHARDS='',
+        GUNICORN_BIND=f"127.0.0.1:{port}",
+        GUNICORN_WORKERS=str(workers)
+    )
+    app_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'api:app'],
+        cwd=app_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    deadline = time.time() + API_READY_TIMEOUT
+    while time.time() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/api/ready", timeout=2).status_code == 200:
+                return process
+        except requests.RequestException:
+            pass
+        time.sleep(1)
+
+    stop_api(process)
+    return None
+
+
+def stop_api(process):
+    """Stop the gunicorn process."""
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def collect_metrics(ingest, refresh, load):
+    """
+    Flatten the measurements into named metrics.
+
+    Metrics ending in _per_second are better when higher, error rates
+    are compared in absolute terms, all others are better when lower.
+
+    Returns:
+        Dictionary {metric name: value}
+    """
+    metrics = {
+        'ingest_rows_per_second': round(ingest['rows_per_second'], 1),
+        'refresh_full_seconds': round(refresh['full_seconds'], 3),
+        'refresh_incremental_seconds': round(refresh['incremental_seconds'], 3)
+    }
+
+    if load and load['total']:
+        metrics['api_requests_per_second'] = load['total']['requests_per_second']
+        metrics['api_error_rate'] = load['total']['error_rate']
+        for endpoint, result in load['endpoints'].items():
+            metrics[f"api_{endpoint}_p50_ms"] = result['p50_ms']
+            metrics[f"api_{endpoint}_p95_ms"] = result['p95_ms']
+
+    return metrics
+
+
+def compare_results(results, baseline, threshold):
+    """
+    Compare metrics with a baseline and print the comparison.
+
+    Args:
+        results: Results of this run
+        baseline: Results of the baseline run
+        threshold: Relative change counted as a regression (e.g. 0.2)
+
+    Returns:
+        List of regressed metric names
+    """
+    if baseline['dataset'] != results['dataset']:
+        print("Note: the baseline was measured on a different dataset, "
+              f"{baseline['dataset']} instead of {results['dataset']}")
+    for setting in ('settings', 'versions'):
+        if baseline.get(setting) != results.get(setting):
+            print(f"Note: {setting} differ: baseline {baseline.get(setting)}, "
+                  f"this run {results.get(setting)}")
+
+    rows = []
+    regressions = []
+    for name, value in results['metrics'].items():
+        base = baseline['metrics'].get(name)
+        if base is None:
+            rows.append([name, '-', value, 'new', ''])
+            continue
+
+        if name.endswith('_error_rate'):
+            regressed = value - base > ERROR_RATE_TOLERANCE
+            change = f"{(value - base) * 100:+.1f} pp"
+        else:
+            relative = (value - base) / base if base else 0.0
+            worse = -relative if name.endswith('_per_second') else relative
+            regressed = worse > threshold
+            change = f"{relative:+.1%}"
+
+        if regressed:
+            regressions.append(name)
+        rows.append([name, base, value, change, '✗ regression' if regressed else '✓'])
+
+    for name in baseline['metrics']:
+        if name not in results['metrics']:
+            rows.append([name, baseline['metrics'][name], '-', 'missing', ''])
+
+    print()
+    print_table(['Metric', 'Baseline', 'Current', 'Change', ''], rows)
+    print()
+    return regressions
+
+
+def main():
+    """Main function with argument parsing."""
+    parser = argparse.ArgumentParser(
+        description='Run the regression benchmark suite and compare it with a baseline'
+    )
+
+    parser.add_argument(
+        '--database',
+        type=str,
+        default='localhost:5432/iotbench',
+        help='Benchmark database as host[:port][/database], dropped and recreated '
+             '(default: localhost:5432/iotbench)'
+    )
+
+    parser.add_argument(
+        '--sensors',
+        type=int,
+        default=100,
+        help='Sensors in the dataset (default: 100)'
+    )
+
+    parser.add_argument(
+        '--days',
+        type=int,
+        default=7,
+        help='Days in the dataset (default: 7)'
+    )
+
+    parser.add_argument(
+        '--interval',
+        type=int,
+        default=60,
+        help='Seconds between readings per sensor (default: 60)'
+    )
+
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=42,
+        help='Dataset seed (default: 42)'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Generator worker processes (default: 1)'
+    )
+
+    parser.add_argument(
+        '--schema',
+        type=str,
+        choices=SENSOR_SCHEMAS,
+        default='standard',
+        help='sensor_data schema under test (default: standard)'
+    )
+
+    parser.add_argument(
+        '--aggregates',
+        type=str,
+        choices=AGGREGATE_LAYOUTS,
+        default='flat',
+        help='Continuous aggregate layout under test (default: flat)'
+    )
+
+    parser.add_argument(
+        '--indexes',
+        type=str,
+        choices=list(INDEX_PROFILES),
+        default='default',
+        help='Index profile under test (default: default)'
+    )
+
+    parser.add_argument(
+        '--api-port',
+        type=int,
+        default=5055,
+        help='Port of the API started for the benchmark (default: 5055)'
+    )
+
+    parser.add_argument(
+        '--api-workers',
+        type=int,
+        default=2,
+        help='Gunicorn workers of the API (default: 2)'
+    )
+
+    parser.add_argument(
+        '--api-users',
+        type=int,
+        default=8,
+        help='Concurrent users of the API load test (default: 8)'
+    )
+
+    parser.add_argument(
+        '--api-duration',
+        type=int,
+        default=30,
+        help='Seconds measured by the API load test (default: 30)'
+    )
+
+    parser.add_argument(
+        '--skip-api',
+        action='store_true',
+        help='Do not start the API or measure endpoint latency'
+    )
+
+    parser.add_argument(
+        '--output',
+        type=str,
+        default='benchmark_results.json',
+        help='File the results are written to (default: benchmark_results.json)'
+    )
+
+    parser.add_argument(
+        '--baseline',
+        type=str,
+        default=None,
+        help='Baseline results to compare with'
+    )
+
+    parser.add_argument(
+        '--update-baseline',
+        action='store_true',
+        help='Write the results to --baseline instead of comparing'
+    )
+
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.2,
+        help='Relative change of a metric counted as a regression (default: 0.2)'
+    )
+
+    args = parser.parse_args()
+
+    if args.update_baseline and not args.baseline:
+        parser.error("--update-baseline requires --baseline")
+
+    db_config = database_config(args.database)
+    if db_config['database'] == DB_CONFIG['database']:
+        parser.error(f"The suite recreates the database; choose another one than {DB_CONFIG['database']}")
+
+    # Ends at the start of the run, rounded down to a whole interval: the
+    # API's periods (last day, week, ...) are relative to NOW(), so they
+    # cover the same number of readings at any time of day
+    end_time = datetime.fromtimestamp(int(time.time()) // args.interval * args.interval)
+    dataset = {
+        'sensors': args.sensors,
+        'days': args.days,
+        'interval_seconds': args.interval,
+        'seed': args.seed,
+        'end_time': end_time.isoformat()
+    }
+
+    print("=" * 60)
+    print("TimescaleDB Regression Suite")
+    print("=" * 60)
+    print()
+
+    recreate_database(db_config)
+    # A failed step finishes faster and would pass as an improvement
+    if not initialize_database(db_config, layout=args.aggregates, schema=args.schema, indexes=args.indexes):
+        print("✗ Initialization failed")
+        sys.exit(1)
+
+    ingest = measure_ingest(db_config, dataset, args.workers)
+    if not ingest['rows']:
+        print("✗ No data was loaded")
+        sys.exit(1)
+
+    refresh = measure_refresh(db_config)
+    if not refresh['succeeded']:
+        print("✗ Refreshing the aggregates failed (see aggregate_refresh_history)")
+        sys.exit(1)
+
+    load = None
+    if not args.skip_api:
+        print("\nStarting the API...")
+        process = start_api(db_config, args.api_port, args.api_workers)
+        if process is None:
+            print("✗ The API did not become ready (is gunicorn installed?); use --skip-api")
+            sys.exit(1)
+        try:
+            load = run_load_test(
+                '127.0.0.1', args.api_port, args.api_users, parse_mix(DEFAULT_MIX),
+                args.api_duration, warmup=5, seed=args.seed
+            )
+        finally:
+            stop_api(process)
+
+    results = {
+        'measured_at': datetime.now().isoformat(timespec='seconds'),
+        'dataset': {key: value for key, value in dataset.items() if key != 'end_time'},
+        'settings': {'schema': args.schema, 'aggregates': args.aggregates, 'indexes': args.indexes},
+        'versions': server_versions(db_config),
+        'rows': ingest['rows'],
+        'metrics': collect_metrics(ingest, refresh, load)
+    }
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✓ Results written to {args.output}")
+
+    if not args.baseline:
+        return
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"Note: no baseline at {args.baseline}; create it with --update-baseline")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    regressions = compare_results(results, baseline, args.threshold)
+    if regressions:
+        print(f"✗ {len(regressions)} metric(s) regressed by more than {args.threshold:.0%}: "
+              f"{', '.join(regressions)}")
+        sys.exit(1)
+    print(f"✓ No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
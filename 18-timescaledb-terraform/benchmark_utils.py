@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the benchmark scripts
+
+Connections, query timing, the API's query shapes and size reporting
+used by benchmark_*.py. Benchmarks run against existing data, so all
+time windows are anchored at the newest reading instead of NOW().
+"""
+
+import psycopg2
+from datetime import timedelta
+import os
+import sys
+import time
+
+import numpy as np
+
+# Shard configuration shared with the API (app/shards.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app'))
+from sensor_keys import SENSOR_COLUMNS, detect_schema  # noqa: E402
+from shards import parse_shards  # noqa: E402
+
+
+# Database configuration
+DB_CONFIG = {
+    'host': 'localhost',
+    'port': 5432,
+    'database': 'iotdata',
+    'user': 'postgres',
+    'password': 'postgres'
+}
+
+# Query shapes of the REST API (app/api.py), parameterized by
+# sensor_id and since (newest reading minus the endpoint's default period).
+# {sensor_column} is sensor_id, or sensor_key in the compact schema;
+# {table} is sensor_data, or a copy of it in benchmarks that compare layouts.
+QUERY_SHAPES = {
+    # GET /api/sensors/<id>/current
+    'current': ("""
+        SELECT time, {sensor_column}, temperature, humidity, pressure
+        FROM {table}
+        WHERE {sensor_column} = %(sensor_id)s
+        ORDER BY time DESC
+        LIMIT 1
+    """, None),
+
+    # GET /api/sensors/<id>/raw (last day)
+    'raw_1d': ("""
+        SELECT time, temperature, humidity, pressure
+        FROM {table}
+        WHERE {sensor_column} = %(sensor_id)s
+        AND time > %(since)s
+        ORDER BY time ASC
+    """, timedelta(days=1)),
+
+    # GET /api/stats/performance, raw side (hourly averages over a week)
+    'hourly_from_raw_1w': ("""
+        SELECT time_bucket('1 hour', time) AS hour, AVG(temperature)
+        FROM {table}
+        WHERE {sensor_column} = %(sensor_id)s
+        AND time > %(since)s
+        GROUP BY hour
+        ORDER BY hour
+    """, timedelta(days=7)),
+
+    # GET /api/stats/performance?scope=fleet, raw side
+    'fleet_hourly_from_raw_1w': ("""
+        SELECT time_bucket('1 hour', time) AS hour, AVG(temperature)
+        FROM {table}
+        WHERE time > %(since)s
+        GROUP BY hour
+        ORDER BY hour
+    """, timedelta(days=7)),
+
+    # GET /api/sensors/<id>/hourly (last week)
+    'hourly_1w': ("""
+        SELECT bucket, avg_temperature, min_temperature, max_temperature,
+               avg_humidity, avg_pressure, reading_count
+        FROM sensor_data_hourly
+        WHERE {sensor_column} = %(sensor_id)s
+        AND bucket > %(since)s
+        ORDER BY bucket ASC
+    """, timedelta(days=7)),
+
+    # GET /api/sensors/<id>/daily (last month)
+    'daily_1m': ("""
+        SELECT bucket, avg_temperature, min_temperature, max_temperature,
+               avg_humidity, avg_pressure, reading_count
+        FROM sensor_data_daily
+        WHERE {sensor_column} = %(sensor_id)s
+        AND bucket > %(since)s
+        ORDER BY bucket ASC
+    """, timedelta(days=30))
+}
+
+# Shapes that read sensor_data directly
+RAW_QUERY_SHAPES = ['current', 'raw_1d', 'hourly_from_raw_1w', 'fleet_hourly_from_raw_1w']
+
+# Shapes that read a continuous aggregate, with the view they read
+AGGREGATE_QUERY_SHAPES = {'hourly_1w': 'sensor_data_hourly', 'daily_1m': 'sensor_data_daily'}
+
+
+def database_config(spec):
+    """
+    Get the configuration of the database to benchmark.
+
+    Args:
+        spec: 'host[:port][/database]' (empty = DB_CONFIG)
+
+    Returns:
+        Database configuration dictionary
+    """
+    return next(iter(parse_shards(spec, DB_CONFIG).values()))
+
+
+def connect(db_config):
+    """Connect in autocommit mode, exiting with an error message on failure."""
+    try:
+        conn = psycopg2.connect(**db_config)
+    except Exception as e:
+        print(f"✗ Error connecting to database: {e}")
+        sys.exit(1)
+
+    conn.autocommit = True
+    return conn
+
+
+def sensor_column(cursor):
+    """Column identifying the sensor in sensor_data ('sensor_id' or 'sensor_key')."""
+    return SENSOR_COLUMNS[detect_schema(cursor)]
+
+
+def data_anchor(cursor):
+    """
+    Pick the sensor and time the query windows are anchored at.
+
+    Returns:
+        (sensor of the newest reading, time of the newest reading),
+        or (None, None) if sensor_data is empty; the sensor is its
+        sensor_key in the compact schema
+    """
+    cursor.execute(f"SELECT {sensor_column(cursor)}, time FROM sensor_data ORDER BY time DESC LIMIT 1")
+    row = cursor.fetchone()
+    return row if row else (None, None)
+
+
+def aggregate_shapes(cursor):
+    """Keys of AGGREGATE_QUERY_SHAPES whose continuous aggregate exists."""
+    names = []
+    for name, view in AGGREGATE_QUERY_SHAPES.items():
+        cursor.execute("SELECT to_regclass(%s)", (view,))
+        if cursor.fetchone()[0] is not None:
+            names.append(name)
+    return names
+
+
+def time_query(cursor, query, params=None, repeat=5):
+    """
+    Time a query.
+
+    Args:
+        cursor: Database cursor
+        query: SQL statement
+        params: Query parameters
+        repeat: Number of timed executions (after one untimed warm-up)
+
+    Returns:
+        List of latencies in milliseconds
+    """
+    cursor.execute(query, params)
+    cursor.fetchall()
+
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(query, params)
+        cursor.fetchall()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return latencies
+
+
+def shape_query(name, column, sensor_id, anchor, table='sensor_data'):
+    """
+    Build one API query shape.
+
+    Args:
+        name: Key of QUERY_SHAPES
+        column: Sensor column of the schema (see sensor_column)
+        sensor_id: Sensor to query (as returned by data_anchor)
+        anchor: Newest reading time; windows end here
+        table: Table the raw shapes read
+
+    Returns:
+        (SQL statement, parameters)
+    """
+    query, period = QUERY_SHAPES[name]
+    params = {'sensor_id': sensor_id, 'since': anchor - period if period else None}
+    return query.format(sensor_column=column, table=table), params
+
+
+def run_query_shapes(cursor, names, sensor_id, anchor, repeat=5, table='sensor_data'):
+    """
+    Time several API query shapes.
+
+    Args:
+        cursor: Database cursor
+        names: Keys of QUERY_SHAPES to run
+        sensor_id: Sensor to query (as returned by data_anchor)
+        anchor: Newest reading time; windows end here
+        repeat: Timed executions per shape
+        table: Table the raw shapes read
+
+    Returns:
+        Dictionary {shape name: list of latencies in ms}
+    """
+    column = sensor_column(cursor)
+    results = {}
+    for name in names:
+        query, params = shape_query(name, column, sensor_id, anchor, table)
+        results[name] = time_query(cursor, query, params, repeat)
+    return results
+
+
+def summarize(latencies):
+    """
+    Summarize latencies.
+
+    Returns:
+        Dictionary with p50, p95 and mean in milliseconds
+    """
+    p50, p95 = np.percentile(latencies, [50, 95])
+    return {'p50': round(float(p50), 3), 'p95': round(float(p95), 3),
+            'mean': round(float(np.mean(latencies)), 3)}
+
+
+def hypertable_size(cursor, table='sensor_data'):
+    """Total size of a hypertable in bytes (data, indexes and TOAST of all chunks)."""
+    cursor.execute("SELECT hypertable_size(%s)", (table,))
+    return cursor.fetchone()[0] or 0
+
+
+def format_bytes(size):
+    """Format a size in bytes as e.g. '12.3 MB'."""
+    for unit in ['B', 'kB', 'MB', 'GB']:
+        if abs(size) < 1024 or unit == 'GB':
+            return f"{size:.1f} {unit}" if unit != 'B' else f"{size} B"
+        size /= 1024
+
+
+def print_table(headers, rows):
+    """Print rows as a left-aligned text table."""
+    widths = [
+        max(len(str(value)) for value in column)
+        for column in zip(headers, *rows)
+    ]
+
+    print("  " + "  ".join(f"{header:<{width}}" for header, width in zip(headers, widths)))
+    print("  " + "  ".join("-" * width for width in widths))
+    for row in rows:
+        print("  " + "  ".join(f"{str(value):<{width}}" for value, width in zip(row, widths)))
@@ -4,11 +4,38 @@ TimescaleDB API Client Test Script
 
 Demonstrates querying the API for different time periods
 and comparing performance between raw and aggregated queries.
+
+With --load it load-tests the API instead: virtual users send a
+weighted mix of requests across all endpoints and sensors, either as
+fast as responses come back (closed loop) or at a target request rate,
+and throughput, error rate and latency percentiles are reported per
+endpoint.
 """
 
 import requests
 import argparse
 import json
+import random
+import threading
+import time
+
+import numpy as np
+
+
+# Endpoints of the load test; {sensor_id} is drawn from all sensors
+LOAD_ENDPOINTS = {
+    'health': '/health',
+    'sensors': '/sensors',
+    'current': '/sensors/{sensor_id}/current',
+    'raw': '/sensors/{sensor_id}/raw?period=1h',
+    'hourly': '/sensors/{sensor_id}/hourly?period=1w',
+    'daily': '/sensors/{sensor_id}/daily?period=1m',
+    'monthly': '/sensors/{sensor_id}/monthly?period=1y',
+    'performance': '/stats/performance?sensor_id={sensor_id}'
+}
+
+# Default request mix (relative weights)
+DEFAULT_MIX = 'current=30,hourly=25,daily=15,monthly=10,raw=10,sensors=5,health=4,performance=1'
 
 
 def test_api(host, port):
@@ -112,6 +139,235 @@ def test_api(host, port):
     print("=" * 70)
 
 
+def parse_mix(mix):
+    """
+    Parse a request mix such as 'current=3,hourly=1'.
+
+    Returns:
+        Dictionary {endpoint: weight}
+
+    Raises:
+        ValueError: On unknown endpoints or invalid weights
+    """
+    weights = {}
+    for part in mix.split(','):
+        if not part.strip():
+            continue
+        endpoint, _, weight = part.partition('=')
+        endpoint = endpoint.strip()
+        if endpoint not in LOAD_ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{endpoint}' (choose from {', '.join(LOAD_ENDPOINTS)})")
+        weights[endpoint] = float(weight) if weight.strip() else 1.0
+        if weights[endpoint] < 0:
+            raise ValueError(f"Negative weight for '{endpoint}'")
+    if not any(weights.values()):
+        raise ValueError("The request mix is empty")
+    return weights
+
+
+def run_load_test(host, port, users, mix, duration, warmup=10, rps=None, timeout=10, seed=42):
+    """
+    Load-test the API with concurrent virtual users.
+
+    Every user is a thread with its own HTTP session. Without a target
+    rate, a user sends its next request as soon as the previous one
+    returned (closed loop). With a target rate, request k is due at
+    start + k / rps and goes to the next free user; if all users are
+    busy, requests fall behind schedule, which is reported as lag.
+    Latency is then measured from the time a request was due, so the
+    wait behind schedule counts (response time); the time from sending
+    to the response is reported separately as service time. Every
+    request due before the end is sent, even if that is only after the
+    end, so the slowest requests are not dropped; their number is
+    reported.
+
+    Args:
+        host: API host
+        port: API port
+        users: Number of virtual users
+        mix: Dictionary {endpoint: weight} (see parse_mix)
+        duration: Seconds measured after the warm-up
+        warmup: Seconds of requests before measuring starts
+        rps: Target requests per second across all users (None = closed loop)
+        timeout: Request timeout in seconds
+        seed: Seed of the request mix and sensor choice
+
+    Returns:
+        Dictionary with the settings, overall and per-endpoint results,
+        or None if the API cannot be reached
+    """
+    base_url = f"http://{host}:{port}/api"
+
+    try:
+        response = requests.get(f"{base_url}/sensors", timeout=timeout)
+        sensor_ids = [sensor['sensor_id'] for sensor in response.json()['sensors']]
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        print("Make sure the API server is running!")
+        return None
+
+    if not sensor_ids:
+        print("No sensors found. Run generate_data.py first!")
+        return None
+
+    endpoints = list(mix)
+    weights = [mix[endpoint] for endpoint in endpoints]
+
+    print(f"✓ {len(sensor_ids)} sensors, {users} users, "
+          f"{f'target {rps:,.0f} requests/s' if rps else 'closed loop'}")
+    print(f"  Warm-up {warmup} s, then measuring for {duration} s...")
+
+    start = time.time()
+    measure_from = start + warmup
+    end = measure_from + duration
+    schedule = {'next': 0, 'max_lag': 0.0, 'sent_after_end': 0}
+    lock = threading.Lock()
+    samples = [[] for _ in range(users)]
+
+    def user(index):
+        rng = random.Random(seed + index)
+        session = requests.Session()
+
+        while True:
+            due = None
+            if rps:
+                with lock:
+                    due = start + schedule['next'] / rps
+                    schedule['next'] += 1
+                if due >= end:
+                    break
+                delay = due - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                elif due >= measure_from:
+                    with lock:
+                        schedule['max_lag'] = max(schedule['max_lag'], -delay)
+
+            sent = time.time()
+            if due is None:
+                if sent >= end:
+                    break
+                # Closed loop: a request is due when it is sent
+                due = sent
+            elif sent >= end and due >= measure_from:
+                with lock:
+                    schedule['sent_after_end'] += 1
+
+            endpoint = rng.choices(endpoints, weights)[0]
+            url = base_url + LOAD_ENDPOINTS[endpoint].format(sensor_id=rng.choice(sensor_ids))
+            try:
+                ok = session.get(url, timeout=timeout).status_code < 400
+            except requests.RequestException:
+                ok = False
+            received = time.time()
+
+            if due >= measure_from:
+                samples[index].append((endpoint, (received - due) * 1000, (received - sent) * 1000, ok))
+
+        session.close()
+
+    threads = [threading.Thread(target=user, args=(index,), daemon=True) for index in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Longer than duration if requests due before the end were sent late
+    elapsed = max(duration, time.time() - measure_from)
+
+    by_endpoint = {}
+    for user_samples in samples:
+        for endpoint, latency, service, ok in user_samples:
+            by_endpoint.setdefault(endpoint, []).append((latency, service, ok))
+
+    def summarize(values):
+        latencies = np.array([latency for latency, _, _ in values])
+        errors = sum(1 for _, _, ok in values if not ok)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        summary = {
+            'requests': len(values),
+            'requests_per_second': round(len(values) / elapsed, 1),
+            'errors': errors,
+            'error_rate': round(errors / len(values), 4),
+            'p50_ms': round(float(p50), 2),
+            'p95_ms': round(float(p95), 2),
+            'p99_ms': round(float(p99), 2),
+            'max_ms': round(float(latencies.max()), 2)
+        }
+
+        if rps:
+            service = np.array([service for _, service, _ in values])
+            p50, p95, p99 = np.percentile(service, [50, 95, 99])
+            summary.update({
+                'service_p50_ms': round(float(p50), 2),
+                'service_p95_ms': round(float(p95), 2),
+                'service_p99_ms': round(float(p99), 2),
+                'service_max_ms': round(float(service.max()), 2)
+            })
+        return summary
+
+    all_samples = [value for values in by_endpoint.values() for value in values]
+    return {
+        'users': users,
+        'target_rps': rps,
+        'warmup_seconds': warmup,
+        'duration_seconds': duration,
+        'measured_seconds': round(elapsed, 1),
+        'mix': mix,
+        'max_lag_seconds': round(schedule['max_lag'], 3) if rps else None,
+        'sent_after_end': schedule['sent_after_end'] if rps else None,
+        'total': summarize(all_samples) if all_samples else None,
+        'endpoints': {
+            endpoint: summarize(by_endpoint[endpoint])
+            for endpoint in endpoints if endpoint in by_endpoint
+        }
+    }
+
+
+def print_load_results(results):
+    """Print throughput, errors and latency percentiles per endpoint."""
+    print()
+    print("=" * 70)
+    print(f"Load test results ({results['users']} users, {results['duration_seconds']} s)")
+    print("=" * 70)
+
+    if not results['total']:
+        print("No requests completed while measuring")
+        return
+
+    rows = list(results['endpoints'].items()) + [('all', results['total'])]
+    if results['target_rps']:
+        print("Response time (from the time a request was due):")
+    print(f"{'Endpoint':<12} {'Requests':>9} {'Req/s':>8} {'Errors':>7} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    print("-" * 70)
+    for endpoint, result in rows:
+        print(f"{endpoint:<12} {result['requests']:>9,} {result['requests_per_second']:>8,.1f} "
+              f"{result['error_rate']:>7.1%} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+              f"{result['p99_ms']:>8.1f} {result['max_ms']:>8.1f}")
+    print()
+
+    if results['target_rps']:
+        print("Service time (from the time a request was sent):")
+        print(f"{'Endpoint':<12} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        print("-" * 70)
+        for endpoint, result in rows:
+            print(f"{endpoint:<12} {result['service_p50_ms']:>8.1f} {result['service_p95_ms']:>8.1f} "
+                  f"{result['service_p99_ms']:>8.1f} {result['service_max_ms']:>8.1f}")
+        print()
+
+    if results['target_rps']:
+        achieved = results['total']['requests_per_second']
+        print(f"✓ Throughput: {achieved:,.1f} requests/s (target {results['target_rps']:,.0f})")
+        print(f"  Lag behind schedule: {results['max_lag_seconds']:.2f} s max")
+        if results['sent_after_end']:
+            print(f"  Sent after the end: {results['sent_after_end']:,} requests that were due before it")
+        if achieved < 0.95 * results['target_rps']:
+            print("Note: the target rate was not reached - add --users or the API is saturated")
+    else:
+        print(f"✓ Throughput: {results['total']['requests_per_second']:,.1f} requests/s")
+    print(f"✓ Error rate: {results['total']['error_rate']:.2%}")
+
+
 def main():
     """Main function with argument parsing."""
     parser = argparse.ArgumentParser(
@@ -132,9 +388,102 @@ def main():
         help='API port (default: 5000)'
     )
 
+    parser.add_argument(
+        '--load',
+        action='store_true',
+        help='Load-test the API instead of running the walkthrough'
+    )
+
+    parser.add_argument(
+        '--users',
+        type=int,
+        default=10,
+        help='Concurrent virtual users in load mode (default: 10)'
+    )
+
+    parser.add_argument(
+        '--rps',
+        type=float,
+        default=None,
+        help='Target requests per second across all users (default: closed loop, '
+             'every user sends its next request when the previous one returned)'
+    )
+
+    parser.add_argument(
+        '--mix',
+        type=str,
+        default=DEFAULT_MIX,
+        help=f'Request mix as endpoint=weight pairs (default: {DEFAULT_MIX})'
+    )
+
+    parser.add_argument(
+        '--duration',
+        type=int,
+        default=60,
+        help='Seconds measured in load mode (default: 60)'
+    )
+
+    parser.add_argument(
+        '--warmup',
+        type=int,
+        default=10,
+        help='Seconds of load before measuring starts (default: 10)'
+    )
+
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=10,
+        help='Request timeout in seconds in load mode (default: 10)'
+    )
+
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=42,
+        help='Seed of the request mix in load mode (default: 42)'
+    )
+
+    parser.add_argument(
+        '--json',
+        type=str,
+        default=None,
+        help='Also write the load test results to this JSON file'
+    )
+
     args = parser.parse_args()
 
-    test_api(args.host, args.port)
+    if not args.load:
+        test_api(args.host, args.port)
+        return
+
+    if args.users < 1:
+        parser.error("--users must be at least 1")
+    if args.rps is not None and args.rps <= 0:
+        parser.error("--rps must be positive")
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print("=" * 70)
+    print("TimescaleDB API Load Test")
+    print("=" * 70)
+    print(f"API URL: http://{args.host}:{args.port}/api")
+    print(f"Mix: {', '.join(f'{endpoint}={weight:g}' for endpoint, weight in mix.items())}")
+
+    results = run_load_test(
+        args.host, args.port, args.users, mix, args.duration,
+        warmup=args.warmup, rps=args.rps, timeout=args.timeout, seed=args.seed
+    )
+    if results is None:
+        return
+    print_load_results(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Results written to {args.json}")
 
 
 if __name__ == "__main__":
@@ -7,14 +7,32 @@ Generates realistic sensor data for testing:
 - Humidity (30-80%)
 - Pressure (980-1020 hPa)
 - Multiple sensors over configurable time period
+
+Readings are generated as NumPy columns per sensor and loaded with
+binary COPY, without creating a Python object per reading.
 """
 
 import psycopg2
+from psycopg2.extras import execute_values
 import argparse
-from datetime import datetime, timedelta
-import random
+from datetime import datetime, timedelta, timezone
+import glob
+import gzip
+import hashlib
+import io
+import json
+import multiprocessing
+import numpy as np
+import os
+from queue import Empty
 import sys
 import time
+import zlib
+
+# Shard configuration shared with the API (app/shards.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app'))
+from sensor_keys import SensorDictionary, detect_schema  # noqa: E402
+from shards import ShardRing, parse_shards  # noqa: E402
 
 
 # Database configuration
@@ -26,119 +44,1415 @@ DB_CONFIG = {
     'password': 'postgres'
 }
 
+# Bulk insert methods, fastest first
+INSERT_METHODS = ['copy', 'execute_values', 'executemany']
+
+SENSOR_DATA_COLUMNS = "sensor_data (time, sensor_id, temperature, humidity, pressure)"
+
+# Binary COPY: fixed-size columns first, variable-length sensor_id last
+COPY_BINARY_COLUMNS = "sensor_data (time, temperature, humidity, pressure, sensor_id)"
+COPY_BINARY_HEADER = b'PGCOPY\n\xff\r\n\x00' + b'\x00' * 8
+COPY_BINARY_TRAILER = b'\xff\xff'
+
+# Fixed part of one binary COPY tuple (big-endian, no padding)
+COPY_BINARY_ROW = np.dtype([
+    ('fields', '>i2'),
+    ('time_len', '>i4'), ('time', '>i8'),
+    ('temperature_len', '>i4'), ('temperature', '>f8'),
+    ('humidity_len', '>i4'), ('humidity', '>f8'),
+    ('pressure_len', '>i4'), ('pressure', '>f8'),
+    ('sensor_id_len', '>i4')
+])
+
+# Compact schema (init_database.py --schema compact): integer sensor_key,
+# so every binary COPY tuple has the same fixed layout
+SENSOR_DATA_COMPACT_COLUMNS = "sensor_data (time, sensor_key, temperature, humidity, pressure)"
+
+COPY_BINARY_COMPACT_ROW = np.dtype([
+    ('fields', '>i2'),
+    ('time_len', '>i4'), ('time', '>i8'),
+    ('sensor_key_len', '>i4'), ('sensor_key', '>i4'),
+    ('temperature_len', '>i4'), ('temperature', '>f8'),
+    ('humidity_len', '>i4'), ('humidity', '>f8'),
+    ('pressure_len', '>i4'), ('pressure', '>f8')
+])
+
+# Staging table for loading CSV files into the compact schema
+COMPACT_STAGING_TABLE = """
+    CREATE TEMP TABLE IF NOT EXISTS sensor_data_staging (
+        time        TIMESTAMPTZ NOT NULL,
+        sensor_id   VARCHAR(50) NOT NULL,
+        temperature DOUBLE PRECISION,
+        humidity    DOUBLE PRECISION,
+        pressure    DOUBLE PRECISION
+    ) ON COMMIT DELETE ROWS
+"""
+
+# PostgreSQL timestamps count microseconds from 2000-01-01 UTC
+POSTGRES_EPOCH_US = 946684800 * 1000000
+
+MICROSECONDS = 1000000
+
+# Readings per random stream: one day of data (see draw_noise)
+BLOCK_SECONDS = 86400
+
+# Offline dataset formats
+OUTPUT_FORMATS = ['csv', 'parquet']
+
+# Generation orders: whole history per sensor, or all sensors per tick
+GENERATION_ORDERS = ['sensor', 'time']
+
+# Time order generates about this many readings (all sensors) at once
+TIME_ORDER_WINDOW_ROWS = 250000
+
+# Random stream tags for disorder injection (see apply_disorder)
+DISORDER_STREAM = 1
+OUTAGE_STREAM = 2
+
+# Live mode inserts about this many seconds worth of readings per batch
+LIVE_FLUSH_SECONDS = 0.5
+
+# Seconds between progress lines
+PROGRESS_INTERVAL = 5
+
+CHUNK_COUNT_QUERY = """
+    SELECT count(*) FROM timescaledb_information.chunks
+    WHERE hypertable_name = 'sensor_data'
+"""
+
+# Checkpoints of database loads, stored on every shard (see --resume)
+CHECKPOINT_TABLES = """
+    CREATE TABLE IF NOT EXISTS generator_runs (
+        run_id TEXT PRIMARY KEY,
+        params JSONB NOT NULL,
+        started_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        finished_at TIMESTAMPTZ
+    );
+    CREATE TABLE IF NOT EXISTS generator_checkpoints (
+        run_id TEXT NOT NULL,
+        worker_id INTEGER NOT NULL,
+        shard TEXT NOT NULL,
+        rows BIGINT NOT NULL,
+        last_sensor_id TEXT,
+        last_time TIMESTAMPTZ,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        PRIMARY KEY (run_id, worker_id, shard)
+    );
+"""
+
+CHECKPOINT_UPSERT = """
+    INSERT INTO generator_checkpoints
+        (run_id, worker_id, shard, rows, last_sensor_id, last_time, updated_at)
+    VALUES (%s, %s, %s, %s, %s, to_timestamp(%s / 1000000.0), now())
+    ON CONFLICT (run_id, worker_id, shard) DO UPDATE SET
+        rows = EXCLUDED.rows,
+        last_sensor_id = EXCLUDED.last_sensor_id,
+        last_time = EXCLUDED.last_time,
+        updated_at = EXCLUDED.updated_at
+"""
+
+
+def sensor_offset(sensor_id):
+    """
+    Get the stable base temperature offset (0-4 °C) of a sensor.
+
+    Uses CRC32 instead of hash(), which is randomized per process.
+    """
+    return zlib.crc32(sensor_id.encode('utf-8')) % 5
+
+
+def draw_block_uniform(key, index, readings_per_block, rows, low, high):
+    """
+    Draw uniform numbers for readings from per-block random streams.
+
+    Readings are grouped into blocks of readings_per_block consecutive
+    readings. Each block has its own random stream seeded with
+    key + [block], holding `rows` rows of readings_per_block draws, so a
+    reading always gets the same numbers no matter how the dataset is
+    split across workers or batches.
+
+    Args:
+        key: List of integers identifying the stream (seed, sensor, ...)
+        index: Ascending NumPy array of reading numbers (0 = first reading)
+        readings_per_block: Readings per random stream
+        rows: Number of values per reading
+        low, high: Range of the uniform distribution
+
+    Returns:
+        NumPy array of shape (rows, len(index))
+    """
+    values = np.empty((rows, len(index)))
+    blocks = index // readings_per_block
+
+    start = 0
+    for block in np.unique(blocks):
+        stop = np.searchsorted(blocks, block, side='right')
+        positions = index[start:stop] % readings_per_block
+        first = int(positions[0])
+        width = int(positions[-1]) - first + 1
+
+        # Skip straight to the needed positions instead of drawing the whole block
+        rng = np.random.default_rng(key + [int(block)])
+        rng.bit_generator.advance(first)
+        for row in range(rows):
+            values[row, start:stop] = rng.uniform(low, high, width)[positions - first]
+            rng.bit_generator.advance(readings_per_block - width)
+
+        start = stop
+
+    return values
+
+
+def draw_noise(seed, sensor_id, index, readings_per_block):
+    """
+    Draw uniform noise in [-1, 1) for temperature, humidity and pressure.
+
+    Args:
+        seed: Dataset seed
+        sensor_id: sensor identifier
+        index: Ascending NumPy array of reading numbers (0 = first reading)
+        readings_per_block: Readings per random stream
+
+    Returns:
+        NumPy array of shape (3, len(index))
+    """
+    key = [seed, zlib.crc32(sensor_id.encode('utf-8'))]
+    return draw_block_uniform(key, index, readings_per_block, 3, -1, 1)
+
+
+def generate_temperature(times_us, sensor_id, noise, utc_offset):
+    """
+    Generate realistic temperatures with daily variation.
+
+    Args:
+        times_us: NumPy array of UTC timestamps in microseconds
+        sensor_id: sensor identifier
+        noise: NumPy array of uniform noise in [-1, 1)
+        utc_offset: Local UTC offset in seconds (for the hour of day)
+
+    Returns:
+        NumPy array of temperatures in Celsius
+    """
+    # Base temperature varies by sensor
+    base_temp = 20 + sensor_offset(sensor_id)
+
+    # Daily variation (warmer during day, cooler at night)
+    hour = ((times_us // MICROSECONDS + utc_offset) // 3600) % 24
+    daily_variation = 5 * np.abs((hour - 14) / 12 - 1)  # Peak at 2 PM
+
+    # Random noise (-2 to 2 °C)
+    temperature = base_temp + daily_variation + 2 * noise
+    return np.round(temperature, 2)
+
+
+def generate_humidity(temperature, noise):
+    """
+    Generate humidity that correlates negatively with temperature.
+
+    Args:
+        temperature: NumPy array of temperatures
+        noise: NumPy array of uniform noise in [-1, 1)
+
+    Returns:
+        NumPy array of humidity percentages
+    """
+    # Higher temperature = lower humidity (generally)
+    base_humidity = 70 - (temperature - 20) * 1.5
+
+    # Random variation (-10 to 10 %)
+    humidity = np.clip(base_humidity + 10 * noise, 30, 80)
+    return np.round(humidity, 2)
+
+
+def generate_pressure(noise):
+    """
+    Generate atmospheric pressure.
+
+    Args:
+        noise: NumPy array of uniform noise in [-1, 1)
+
+    Returns:
+        NumPy array of pressures in hPa
+    """
+    # Standard pressure with random variation (-20 to 20 hPa)
+    pressure = 1013.25 + 20 * noise
+    return np.round(pressure, 2)
+
+
+def generate_sensor_readings(sensor_id, index, spec):
+    """
+    Generate readings of one sensor as NumPy columns.
+
+    Args:
+        sensor_id: sensor identifier
+        index: Ascending NumPy array of reading numbers
+        spec: Dataset specification (seed, start_us, interval_us,
+              utc_offset, readings_per_block, optional disorder)
+
+    Returns:
+        Dictionary of equally long arrays: time (UTC microseconds),
+        sensor_id (bytes), temperature, humidity, pressure; with
+        disorder also arrival (see apply_disorder)
+    """
+    times_us = spec['start_us'] + index * spec['interval_us']
+    noise = draw_noise(spec['seed'], sensor_id, index, spec['readings_per_block'])
+
+    temperature = generate_temperature(times_us, sensor_id, noise[0], spec['utc_offset'])
+    humidity = generate_humidity(temperature, noise[1])
+    pressure = generate_pressure(noise[2])
+
+    readings = {
+        'time': times_us,
+        'sensor_id': np.full(len(index), sensor_id.encode('utf-8')),
+        'temperature': temperature,
+        'humidity': humidity,
+        'pressure': pressure
+    }
+
+    if spec.get('disorder'):
+        readings = apply_disorder(readings, sensor_id, index, spec)
+
+    return readings
+
+
+def parse_delay(value):
+    """Validate a --late-delay distribution: exp:MEAN, uniform:MIN:MAX or fixed:SECONDS."""
+    kind, _, params = value.partition(':')
+    try:
+        numbers = [float(param) for param in params.split(':')]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid delay distribution: {value}")
+
+    expected = {'exp': 1, 'uniform': 2, 'fixed': 1}
+    if kind not in expected or len(numbers) != expected[kind] or min(numbers) < 0:
+        raise argparse.ArgumentTypeError(
+            f"invalid delay distribution: {value} (use exp:MEAN, uniform:MIN:MAX or fixed:SECONDS)"
+        )
+    return value
+
+
+def delay_seconds(u, delay):
+    """
+    Map uniform numbers in [0, 1) to delays of a distribution.
+
+    Args:
+        u: NumPy array of uniform numbers in [0, 1)
+        delay: Distribution as accepted by parse_delay
+
+    Returns:
+        NumPy array of delays in seconds
+    """
+    kind, *params = delay.split(':')
+    params = [float(param) for param in params]
+
+    if kind == 'exp':
+        return -params[0] * np.log1p(-u)
+    if kind == 'uniform':
+        return params[0] + u * (params[1] - params[0])
+    return np.full(len(u), params[0])
+
+
+def outage_mask(sensor_key, index, spec):
+    """
+    Find readings lost in sensor outages.
+
+    Every block (one day of readings) gets a Poisson number of outages
+    with uniform start and exponential duration, drawn from its own
+    random stream.
+
+    Args:
+        sensor_key: CRC32 of the sensor identifier
+        index: Ascending NumPy array of reading numbers
+        spec: Dataset specification with disorder settings
+
+    Returns:
+        Boolean NumPy array, True for readings inside an outage
+    """
+    disorder = spec['disorder']
+    mask = np.zeros(len(index), dtype=bool)
+    if not disorder['outage_rate']:
+        return mask
+
+    readings_per_block = spec['readings_per_block']
+    block_us = readings_per_block * spec['interval_us']
+    expected = disorder['outage_rate'] * block_us / (BLOCK_SECONDS * MICROSECONDS)
+    blocks = index // readings_per_block
+
+    for block in np.unique(blocks):
+        rng = np.random.default_rng([spec['seed'], sensor_key, OUTAGE_STREAM, int(block)])
+        count = rng.poisson(expected)
+        if not count:
+            continue
+
+        starts = rng.uniform(0, block_us, count)
+        ends = starts + rng.exponential(disorder['outage_duration'] * MICROSECONDS, count)
+
+        selected = blocks == block
+        offsets = (index[selected] % readings_per_block * spec['interval_us'])[:, None]
+        mask[selected] = ((offsets >= starts) & (offsets < ends)).any(axis=1)
+
+    return mask
+
+
+def apply_disorder(readings, sensor_id, index, spec):
+    """
+    Inject outages, late arrivals and duplicates into a sensor's readings.
+
+    Adds an 'arrival' column (UTC microseconds): the reading time, plus a
+    delay for late readings. Readings inside outages are removed and
+    duplicates are appended with their own retry delay. All decisions
+    come from per-block random streams, so they do not depend on how the
+    dataset is split.
+
+    Args:
+        readings: Dictionary of NumPy columns from generate_sensor_readings
+        sensor_id: sensor identifier
+        index: Ascending NumPy array of reading numbers
+        spec: Dataset specification with disorder settings
+
+    Returns:
+        Readings dictionary with the additional 'arrival' column
+    """
+    disorder = spec['disorder']
+    sensor_key = zlib.crc32(sensor_id.encode('utf-8'))
+    late_u, delay_u, duplicate_u, retry_u = draw_block_uniform(
+        [spec['seed'], sensor_key, DISORDER_STREAM], index, spec['readings_per_block'], 4, 0, 1
+    )
+
+    arrival = readings['time'].copy()
+    late = late_u < disorder['late_pct'] / 100
+    arrival[late] += (delay_seconds(delay_u[late], disorder['late_delay']) * MICROSECONDS).astype(np.int64)
+    readings = dict(readings, arrival=arrival)
+
+    keep = ~outage_mask(sensor_key, index, spec)
+    duplicate = keep & (duplicate_u < disorder['duplicate_pct'] / 100)
+
+    duplicates = {column: values[duplicate] for column, values in readings.items()}
+    duplicates['arrival'] = duplicates['arrival'] + (
+        delay_seconds(retry_u[duplicate], disorder['late_delay']) * MICROSECONDS
+    ).astype(np.int64)
+
+    return concat_readings([{column: values[keep] for column, values in readings.items()}, duplicates])
+
+
+class ArrivalBuffer:
+    """Holds back readings until their arrival time."""
+
+    def __init__(self):
+        self.pieces = []
+
+    def push(self, readings):
+        """Add readings with an 'arrival' column."""
+        if len(readings['time']):
+            self.pieces.append(readings)
+
+    def release(self, watermark=None):
+        """
+        Take the readings that have arrived.
+
+        Args:
+            watermark: Current time in UTC microseconds (None = everything)
+
+        Returns:
+            Readings with arrival <= watermark in arrival order, without
+            the 'arrival' column, or None if there are none
+        """
+        if not self.pieces:
+            return None
+
+        held = concat_readings(self.pieces)
+        ready = held['arrival'] <= watermark if watermark is not None else np.ones(len(held['time']), bool)
+
+        waiting = ~ready
+        self.pieces = [{column: values[waiting] for column, values in held.items()}] if waiting.any() else []
+        if not ready.any():
+            return None
+
+        order = np.argsort(held['arrival'][ready], kind='stable')
+        return {column: values[ready][order] for column, values in held.items() if column != 'arrival'}
+
+
+def iter_arrivals(pieces, batch_size):
+    """
+    Reorder a stream of (shard, readings) pieces by arrival time.
+
+    The newest reading time of each piece serves as the current time of
+    its shard; held-back readings are emitted once it passes their arrival.
+
+    Args:
+        pieces: Iterable of (shard name, readings with 'arrival')
+        batch_size: Maximum number of readings per emitted piece
+
+    Yields:
+        (shard name, readings dictionary) with at most batch_size rows
+    """
+    buffers = {}
+
+    def emit(shard, readings):
+        if readings is not None:
+            for start in range(0, len(readings['time']), batch_size):
+                yield shard, slice_readings(readings, start, start + batch_size)
+
+    for shard, piece in pieces:
+        if not len(piece['time']):
+            continue
+        buffer = buffers.setdefault(shard, ArrivalBuffer())
+        buffer.push(piece)
+        yield from emit(shard, buffer.release(int(piece['time'].max())))
+
+    for shard, buffer in buffers.items():
+        yield from emit(shard, buffer.release())
+
+
+def slice_readings(readings, start, stop):
+    """Select rows [start, stop) of a readings dictionary."""
+    return {column: values[start:stop] for column, values in readings.items()}
+
+
+def concat_readings(pieces):
+    """Concatenate several readings dictionaries into one."""
+    if len(pieces) == 1:
+        return pieces[0]
+    return {column: np.concatenate([piece[column] for piece in pieces]) for column in pieces[0]}
+
+
+def encode_copy_binary(readings):
+    """
+    Encode readings in PostgreSQL's binary COPY format.
+
+    The whole batch is built with NumPy array operations, without a
+    Python object per row.
+
+    Args:
+        readings: Dictionary of NumPy columns (see generate_sensor_readings)
+
+    Returns:
+        bytes ready for COPY ... FROM STDIN WITH (FORMAT binary)
+    """
+    count = len(readings['time'])
+    sensor_ids = readings['sensor_id']
+    id_lengths = np.char.str_len(sensor_ids)
+
+    fixed = np.empty(count, dtype=COPY_BINARY_ROW)
+    fixed['fields'] = 5
+    fixed['time_len'] = 8
+    fixed['time'] = readings['time'] - POSTGRES_EPOCH_US
+    for column in ('temperature', 'humidity', 'pressure'):
+        fixed[column + '_len'] = 8
+        fixed[column] = readings[column]
+    fixed['sensor_id_len'] = id_lengths
+
+    width = sensor_ids.dtype.itemsize
+    if count == 0 or (id_lengths == width).all():
+        # All sensor IDs equally long: every tuple has the same layout
+        rows = np.empty(count, dtype=[('fixed', COPY_BINARY_ROW), ('sensor_id', f'S{width}')])
+        rows['fixed'] = fixed
+        rows['sensor_id'] = sensor_ids
+        return COPY_BINARY_HEADER + rows.tobytes() + COPY_BINARY_TRAILER
+
+    # Byte offset of every tuple in the output buffer
+    row_sizes = COPY_BINARY_ROW.itemsize + id_lengths
+    offsets = np.zeros(count, dtype=np.int64)
+    np.cumsum(row_sizes[:-1], out=offsets[1:])
+
+    body = np.empty(int(row_sizes.sum()), dtype=np.uint8)
+
+    # Scatter the fixed part of every tuple
+    fixed_positions = offsets[:, None] + np.arange(COPY_BINARY_ROW.itemsize)
+    body[fixed_positions] = fixed.view(np.uint8).reshape(count, COPY_BINARY_ROW.itemsize)
+
+    # Scatter the sensor_id bytes (variable length) after it
+    id_bytes = sensor_ids.view(np.uint8).reshape(count, width)
+    id_mask = np.arange(width) < id_lengths[:, None]
+    id_positions = offsets[:, None] + COPY_BINARY_ROW.itemsize + np.arange(width)
+    body[id_positions[id_mask]] = id_bytes[id_mask]
+
+    return COPY_BINARY_HEADER + body.tobytes() + COPY_BINARY_TRAILER
+
+
+def encode_sensor_keys(sensor_ids, sensor_keys):
+    """
+    Translate a column of sensor_id bytes into sensor keys.
+
+    Args:
+        sensor_ids: NumPy array of sensor identifiers (bytes)
+        sensor_keys: Dictionary {sensor_id: sensor_key}
+
+    Returns:
+        NumPy int32 array
+    """
+    names, inverse = np.unique(sensor_ids, return_inverse=True)
+    keys = np.array([sensor_keys[name.decode('utf-8')] for name in names], dtype=np.int32)
+    return keys[inverse]
+
+
+def encode_copy_binary_compact(readings, sensor_keys):
+    """
+    Encode readings in binary COPY format for the compact schema.
+
+    Args:
+        readings: Dictionary of NumPy columns
+        sensor_keys: Dictionary {sensor_id: sensor_key}
+
+    Returns:
+        bytes for COPY SENSOR_DATA_COMPACT_COLUMNS FROM STDIN WITH (FORMAT binary)
+    """
+    rows = np.empty(len(readings['time']), dtype=COPY_BINARY_COMPACT_ROW)
+    rows['fields'] = 5
+    rows['time_len'] = 8
+    rows['time'] = readings['time'] - POSTGRES_EPOCH_US
+    rows['sensor_key_len'] = 4
+    rows['sensor_key'] = encode_sensor_keys(readings['sensor_id'], sensor_keys)
+    for column in ('temperature', 'humidity', 'pressure'):
+        rows[column + '_len'] = 8
+        rows[column] = readings[column]
+
+    return COPY_BINARY_HEADER + rows.tobytes() + COPY_BINARY_TRAILER
+
+
+def readings_to_rows(readings, sensor_keys=None):
+    """
+    Convert NumPy columns into row tuples for INSERT-based methods.
+
+    Args:
+        readings: Dictionary of NumPy columns
+        sensor_keys: Dictionary {sensor_id: sensor_key} for the compact
+                     schema (None = sensor_id strings)
+
+    Returns:
+        List of (time, sensor_id or sensor_key, temperature, humidity, pressure)
+    """
+    times = [
+        datetime.fromtimestamp(us / MICROSECONDS, tz=timezone.utc)
+        for us in readings['time'].tolist()
+    ]
+    if sensor_keys is not None:
+        sensor_ids = encode_sensor_keys(readings['sensor_id'], sensor_keys).tolist()
+    else:
+        sensor_ids = [sensor_id.decode('utf-8') for sensor_id in readings['sensor_id'].tolist()]
+
+    return list(zip(
+        times,
+        sensor_ids,
+        readings['temperature'].tolist(),
+        readings['humidity'].tolist(),
+        readings['pressure'].tolist()
+    ))
+
+
+def insert_batch(conn, readings, method='copy', checkpoint=None, sensor_keys=None):
+    """
+    Insert a batch of readings into the database.
+
+    Args:
+        conn: Database connection
+        readings: Dictionary of NumPy columns
+        method: 'copy' (binary COPY FROM STDIN), 'execute_values'
+                (multi-row INSERT) or 'executemany' (one INSERT per row)
+        checkpoint: Optional (sql, params) executed in the same transaction
+        sensor_keys: Dictionary {sensor_id: sensor_key} of a compact-schema
+                     database (None = standard schema)
+    """
+    cursor = conn.cursor()
+    columns = SENSOR_DATA_COLUMNS if sensor_keys is None else SENSOR_DATA_COMPACT_COLUMNS
+
+    # Execute batch insert
+    if method == 'copy':
+        if sensor_keys is None:
+            buffer = io.BytesIO(encode_copy_binary(readings))
+            columns = COPY_BINARY_COLUMNS
+        else:
+            buffer = io.BytesIO(encode_copy_binary_compact(readings, sensor_keys))
+        cursor.copy_expert(f"COPY {columns} FROM STDIN WITH (FORMAT binary)", buffer)
+    elif method == 'execute_values':
+        values = readings_to_rows(readings, sensor_keys)
+        execute_values(
+            cursor,
+            f"INSERT INTO {columns} VALUES %s",
+            values,
+            page_size=len(values)
+        )
+    elif method == 'executemany':
+        cursor.executemany(f"""
+            INSERT INTO {columns}
+            VALUES (%s, %s, %s, %s, %s)
+        """, readings_to_rows(readings, sensor_keys))
+    else:
+        raise ValueError(f"Unknown insert method: {method}")
+
+    if checkpoint:
+        cursor.execute(*checkpoint)
+
+    conn.commit()
+    cursor.close()
+
+
+def register_sensors(conn, sensor_ids):
+    """
+    Register sensors in a compact-schema database and get their keys.
+
+    Args:
+        conn: Database connection
+        sensor_ids: Sensors about to be loaded
+
+    Returns:
+        Dictionary {sensor_id: sensor_key}, or None for the standard schema
+    """
+    cursor = conn.cursor()
+    sensor_keys = None
+    if detect_schema(cursor) == 'compact':
+        sensor_keys = SensorDictionary().encode(cursor, sensor_ids, register=True)
+    conn.commit()
+    cursor.close()
+    return sensor_keys
+
+
+def import_pyarrow():
+    """Import pyarrow for Parquet support, with a helpful error."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow, pyarrow.parquet
+    except ImportError:
+        print("✗ Parquet support requires pyarrow: pip install pyarrow")
+        sys.exit(1)
+
+
+def write_csv(path, readings):
+    """
+    Write readings to a gzip-compressed CSV file (COPY CSV format).
+
+    Args:
+        path: Output file path (.csv.gz)
+        readings: Dictionary of NumPy columns
+    """
+    times = np.datetime_as_string(readings['time'].astype('datetime64[us]'), unit='us', timezone='UTC')
+    columns = [
+        times,
+        readings['sensor_id'].astype(str),
+        np.char.mod('%.2f', readings['temperature']),
+        np.char.mod('%.2f', readings['humidity']),
+        np.char.mod('%.2f', readings['pressure'])
+    ]
+
+    lines = columns[0]
+    for column in columns[1:]:
+        lines = np.char.add(np.char.add(lines, ','), column)
+
+    with gzip.open(path, 'wt', compresslevel=6) as f:
+        f.write("time,sensor_id,temperature,humidity,pressure\n")
+        f.write("\n".join(lines.tolist()))
+        f.write("\n")
+
+
+def write_parquet(path, readings):
+    """
+    Write readings to a Parquet file (zstd-compressed).
+
+    Args:
+        path: Output file path (.parquet)
+        readings: Dictionary of NumPy columns
+    """
+    pa, pq = import_pyarrow()
+
+    table = pa.table({
+        'time': pa.array(readings['time'], type=pa.timestamp('us', tz='UTC')),
+        'sensor_id': pa.array(readings['sensor_id'].astype(str)),
+        'temperature': readings['temperature'],
+        'humidity': readings['humidity'],
+        'pressure': readings['pressure']
+    })
+    pq.write_table(table, path, compression='zstd')
+
+
+def write_batch_file(directory, shard, worker_id, sequence, readings, output_format):
+    """
+    Write one batch as a dataset shard file.
+
+    File names start with the database shard name so that the dataset
+    can be reloaded into the same shard layout.
+
+    Args:
+        directory: Output directory
+        shard: Database shard name
+        worker_id: Worker number
+        sequence: Batch number within the worker
+        readings: Dictionary of NumPy columns
+        output_format: 'csv' or 'parquet'
+    """
+    extension = 'csv.gz' if output_format == 'csv' else 'parquet'
+    path = os.path.join(directory, f"{shard}__w{worker_id:02d}__{sequence:06d}.{extension}")
+
+    # Write to a temporary name first so partial files are never loaded
+    temp_path = path + '.tmp'
+    if output_format == 'csv':
+        write_csv(temp_path, readings)
+    else:
+        write_parquet(temp_path, readings)
+    os.replace(temp_path, path)
+
+
+def shard_of_file(path):
+    """Get the database shard name a dataset file was written for."""
+    return os.path.basename(path).split('__')[0]
+
+
+def load_file(conn, path, dictionary=None):
+    """
+    Load one dataset file with COPY.
+
+    CSV files are streamed through gzip straight into COPY ... CSV;
+    Parquet files are read into NumPy columns and sent as binary COPY.
+
+    Args:
+        conn: Database connection
+        path: Dataset file (.csv.gz or .parquet)
+        dictionary: SensorDictionary of a compact-schema database
+                    (None = standard schema)
+
+    Returns:
+        Number of rows loaded
+    """
+    cursor = conn.cursor()
+
+    if path.endswith('.csv.gz') and dictionary is not None:
+        # Files hold sensor_id names: COPY into staging, then join the keys
+        cursor.execute(COMPACT_STAGING_TABLE)
+        with gzip.open(path, 'rb') as f:
+            cursor.copy_expert(
+                "COPY sensor_data_staging (time, sensor_id, temperature, humidity, pressure) "
+                "FROM STDIN WITH (FORMAT csv, HEADER true)", f
+            )
+        cursor.execute("""
+            INSERT INTO sensors (sensor_id)
+            SELECT DISTINCT sensor_id FROM sensor_data_staging ORDER BY sensor_id
+            ON CONFLICT (sensor_id) DO NOTHING
+        """)
+        cursor.execute(f"""
+            INSERT INTO {SENSOR_DATA_COMPACT_COLUMNS}
+            SELECT s.time, k.sensor_key, s.temperature, s.humidity, s.pressure
+            FROM sensor_data_staging s JOIN sensors k USING (sensor_id)
+        """)
+        rows = cursor.rowcount
+    elif path.endswith('.csv.gz'):
+        with gzip.open(path, 'rb') as f:
+            cursor.copy_expert(
+                f"COPY {SENSOR_DATA_COLUMNS} FROM STDIN WITH (FORMAT csv, HEADER true)", f
+            )
+        rows = cursor.rowcount
+    else:
+        pa, pq = import_pyarrow()
+        table = pq.read_table(path)
+        readings = {
+            'time': table.column('time').cast(pa.int64()).to_numpy(),
+            'sensor_id': np.array(table.column('sensor_id').to_pylist(), dtype=bytes),
+            'temperature': table.column('temperature').to_numpy(),
+            'humidity': table.column('humidity').to_numpy(),
+            'pressure': table.column('pressure').to_numpy()
+        }
+        if dictionary is not None:
+            names = [name.decode('utf-8') for name in np.unique(readings['sensor_id'])]
+            sensor_keys = dictionary.encode(cursor, names, register=True)
+            buffer = io.BytesIO(encode_copy_binary_compact(readings, sensor_keys))
+            columns = SENSOR_DATA_COMPACT_COLUMNS
+        else:
+            buffer = io.BytesIO(encode_copy_binary(readings))
+            columns = COPY_BINARY_COLUMNS
+        cursor.copy_expert(f"COPY {columns} FROM STDIN WITH (FORMAT binary)", buffer)
+        rows = len(readings['time'])
+
+    conn.commit()
+    cursor.close()
+    return rows
+
+
+def interleave_by_time(pieces):
+    """
+    Merge per-sensor pieces into time order.
+
+    Rows of the same tick stay in sensor order: tick 0 of every sensor,
+    then tick 1 of every sensor, and so on.
+    """
+    readings = concat_readings(pieces)
+    order = np.argsort(readings['time'], kind='stable')
+    return {column: values[order] for column, values in readings.items()}
+
+
+def iter_readings(sensor_ids, index, spec, batch_size, order, ring):
+    """
+    Generate a partition of the dataset as a stream of batch pieces.
+
+    Memory use does not grow with the number of days: sensor order holds
+    one batch, time order a window of about TIME_ORDER_WINDOW_ROWS
+    readings (at least one tick of every sensor).
+
+    Args:
+        sensor_ids: List of sensor identifiers
+        index: Ascending NumPy array of reading numbers
+        spec: Dataset specification
+        batch_size: Maximum number of readings per piece
+        order: 'sensor' (each sensor's whole history in turn) or 'time'
+               (all sensors per tick, the way devices report)
+        ring: ShardRing used to route sensors to shards
+
+    Yields:
+        (shard name, readings dictionary) with at most batch_size rows
+    """
+    if order == 'sensor':
+        for sensor_id in sensor_ids:
+            # Readings go to the shard that owns the sensor
+            shard = ring.shard_for(sensor_id)
+            for offset in range(0, len(index), batch_size):
+                yield shard, generate_sensor_readings(sensor_id, index[offset:offset + batch_size], spec)
+        return
+
+    groups = {shard: ids for shard, ids in ring.partition(sensor_ids).items() if ids}
+    ticks = max(1, max(batch_size, TIME_ORDER_WINDOW_ROWS) // len(sensor_ids))
+
+    for offset in range(0, len(index), ticks):
+        window = index[offset:offset + ticks]
+        for shard, shard_sensor_ids in groups.items():
+            readings = interleave_by_time([
+                generate_sensor_readings(sensor_id, window, spec) for sensor_id in shard_sensor_ids
+            ])
+            for start in range(0, len(readings['time']), batch_size):
+                yield shard, slice_readings(readings, start, start + batch_size)
+
+
+def load_partition(task, report):
+    """
+    Generate and load (or write) one partition of the dataset.
+
+    Runs in a worker process with its own connections and loader.
+
+    Args:
+        task: Dictionary with worker_id, sensor_ids, index, spec, order,
+              batch_size, method, shards, output, output_format, run_id
+              and skip ({shard: rows already loaded} when resuming)
+        report: Function called as report(rows, insert_seconds) after
+                every inserted batch
+    """
+    shards = task['shards']
+    ring = ShardRing(list(shards))
+    batch_size = task['batch_size']
+    output = task['output']
+    run_id = task.get('run_id')
+
+    # Rows per shard loaded by an earlier run, skipped when resuming
+    skip = dict(task.get('skip') or {})
+    loaded = dict(skip)
+
+    # Connect only to the shards this partition writes to
+    groups = ring.partition(task['sensor_ids'])
+    owned = {shard for shard, sensor_ids in groups.items() if sensor_ids}
+    connections = {}
+    sensor_keys = {shard: None for shard in owned}
+    if not output:
+        connections = {shard: psycopg2.connect(**shards[shard]) for shard in owned}
+        sensor_keys = {shard: register_sensors(connections[shard], groups[shard]) for shard in owned}
+
+    # Pending batch pieces per shard
+    data_batches = {shard: [] for shard in owned}
+    pending_rows = {shard: 0 for shard in owned}
+    sequence = 0
+
+    def flush(shard):
+        nonlocal sequence
+        readings = concat_readings(data_batches[shard])
+        start_insert = time.time()
+        if output:
+            sequence += 1
+            write_batch_file(output, shard, task['worker_id'], sequence,
+                             readings, task['output_format'])
+        else:
+            checkpoint = None
+            if run_id:
+                # Record progress in the same transaction as the data
+                loaded[shard] = loaded.get(shard, 0) + len(readings['time'])
+                checkpoint = (CHECKPOINT_UPSERT, (
+                    run_id, task['worker_id'], shard, loaded[shard],
+                    readings['sensor_id'][-1].decode('utf-8'), int(readings['time'][-1])
+                ))
+            insert_batch(connections[shard], readings, task['method'], checkpoint,
+                         sensor_keys[shard])
+        report(len(readings['time']), time.time() - start_insert)
+        data_batches[shard] = []
+        pending_rows[shard] = 0
+
+    try:
+        pieces = iter_readings(task['sensor_ids'], task['index'], task['spec'],
+                               batch_size, task['order'], ring)
+        if task['spec'].get('disorder'):
+            pieces = iter_arrivals(pieces, batch_size)
+
+        for shard, piece in pieces:
+            if skip.get(shard):
+                rows = len(piece['time'])
+                if rows <= skip[shard]:
+                    skip[shard] -= rows
+                    continue
+                piece = slice_readings(piece, skip[shard], rows)
+                skip[shard] = 0
+
+            data_batches[shard].append(piece)
+            pending_rows[shard] += len(piece['time'])
+
+            # Insert batch when it reaches batch_size
+            if pending_rows[shard] >= batch_size:
+                flush(shard)
+
+        # Insert remaining batches
+        for shard in owned:
+            if data_batches[shard]:
+                flush(shard)
+    finally:
+        for conn in connections.values():
+            conn.close()
+
+
+def load_files_partition(task, report):
+    """
+    Load a list of dataset files with COPY.
+
+    Args:
+        task: Dictionary with worker_id, files and shards
+        report: Function called as report(rows, load_seconds) per file
+    """
+    shards = task['shards']
+    connections = {}
+    dictionaries = {}
+
+    try:
+        for path in task['files']:
+            # Files go back to the shard they were written for
+            shard = shard_of_file(path)
+            if shard not in shards:
+                if len(shards) > 1:
+                    raise ValueError(f"{path}: shard '{shard}' is not configured")
+                shard = next(iter(shards))
+
+            if shard not in connections:
+                conn = connections[shard] = psycopg2.connect(**shards[shard])
+                cursor = conn.cursor()
+                compact = detect_schema(cursor) == 'compact'
+                cursor.close()
+                dictionaries[shard] = SensorDictionary() if compact else None
+
+            start_load = time.time()
+            rows = load_file(connections[shard], path, dictionaries[shard])
+            report(rows, time.time() - start_load)
+    finally:
+        for conn in connections.values():
+            conn.close()
+
+
+def worker_main(target, task, queue):
+    """
+    Entry point of a worker process.
+
+    Sends ('progress', worker_id, rows, insert_seconds) messages while
+    loading, then ('done', worker_id) or ('error', worker_id, traceback).
+    """
+    worker_id = task['worker_id']
+
+    def report(rows, insert_seconds):
+        queue.put(('progress', worker_id, rows, insert_seconds))
+
+    try:
+        target(task, report)
+        queue.put(('done', worker_id))
+    except Exception:
+        import traceback
+        queue.put(('error', worker_id, traceback.format_exc()))
+
 
-def generate_temperature(base_time, sensor_id):
+def partition_tasks(sensor_ids, index, workers, partition):
     """
-    Generate realistic temperature with daily variation.
+    Split the dataset into one task per worker.
 
     Args:
-        base_time: datetime object
-        sensor_id: sensor identifier
+        sensor_ids: List of sensor identifiers
+        index: NumPy array of reading numbers
+        workers: Number of worker processes
+        partition: 'sensor' (each worker loads a subset of sensors) or
+                   'time' (each worker loads all sensors for a time range)
 
     Returns:
-        Temperature in Celsius
+        List of (sensor_ids, index) pairs, empty ones removed
     """
-    # Base temperature varies by sensor
-    sensor_offset = hash(sensor_id) % 5
-    base_temp = 20 + sensor_offset
+    if partition == 'sensor':
+        parts = [(sensor_ids[i::workers], index) for i in range(workers)]
+    else:
+        parts = [(sensor_ids, chunk) for chunk in np.array_split(index, workers)]
+
+    return [(ids, chunk) for ids, chunk in parts if len(ids) and len(chunk)]
+
+
+def format_duration(seconds):
+    """Format a duration as e.g. '1h 05m', '3m 20s' or '45s'."""
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class Progress:
+    """Aggregated load progress across all workers."""
+
+    def __init__(self, total_readings, shards=None, done=0):
+        """
+        Start tracking a load.
+
+        Args:
+            total_readings: Expected number of readings of the whole load
+            shards: Dictionary {shard_name: db_config} to count hypertable
+                    chunks on (None = no chunk counts)
+            done: Readings loaded by an earlier run (when resuming)
+        """
+        self.total_readings = total_readings
+        self.shards = shards
+        self.done = done
+        self.count = 0
+        self.insert_seconds = 0.0
+        self.start = time.time()
+        self.last_print = self.start
+        self.connections = {}
+
+    def update(self, rows, insert_seconds):
+        """Record an inserted batch and print progress every PROGRESS_INTERVAL seconds."""
+        self.count += rows
+        self.insert_seconds += insert_seconds
+
+        now = time.time()
+        if now - self.last_print >= PROGRESS_INTERVAL:
+            self.print_progress(now)
+            self.last_print = now
+
+    def print_progress(self, now):
+        """Print loaded readings, rows/s, ETA and chunk count."""
+        rate = self.count / (now - self.start)
+        loaded = self.done + self.count
+
+        line = f"  Progress: {loaded:,} / {self.total_readings:,}"
+        if self.total_readings:
+            line += f" ({min(loaded / self.total_readings, 1) * 100:.1f}%)"
+        line += f" - {rate:,.0f} rows/s"
+        if rate and self.total_readings > loaded:
+            line += f" - ETA {format_duration((self.total_readings - loaded) / rate)}"
+
+        chunks = self.count_chunks()
+        if chunks is not None:
+            line += f" - {chunks:,} chunks"
+
+        print(line)
+
+    def count_chunks(self):
+        """Count sensor_data chunks on all shards, or None if unavailable."""
+        if not self.shards:
+            return None
+
+        try:
+            total = 0
+            for shard, db_config in self.shards.items():
+                if shard not in self.connections:
+                    conn = psycopg2.connect(**db_config)
+                    conn.autocommit = True
+                    self.connections[shard] = conn
+
+                cursor = self.connections[shard].cursor()
+                cursor.execute(CHUNK_COUNT_QUERY)
+                total += cursor.fetchone()[0]
+                cursor.close()
+            return total
+        except psycopg2.Error:
+            # Not a hypertable (yet) or no access: stop asking
+            self.shards = None
+            return None
+
+    def close(self):
+        """Close the connections used for chunk counts."""
+        for conn in self.connections.values():
+            conn.close()
+        self.connections = {}
+
+
+def run_workers(target, tasks, progress):
+    """
+    Run all tasks, in worker processes when there are several.
 
-    # Daily variation (warmer during day, cooler at night)
-    hour = base_time.hour
-    daily_variation = 5 * abs((hour - 14) / 12 - 1)  # Peak at 2 PM
+    Args:
+        target: Task function, called as target(task, report)
+        tasks: List of task dictionaries
+        progress: Progress object receiving the workers' reports
+    """
+    if len(tasks) == 1:
+        target(tasks[0], progress.update)
+        return
+
+    queue = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=worker_main, args=(target, task, queue), daemon=True)
+        for task in tasks
+    ]
+    for process in processes:
+        process.start()
+
+    running = len(processes)
+    errors = []
+
+    while running:
+        try:
+            message = queue.get(timeout=1)
+        except Empty:
+            if not any(process.is_alive() for process in processes):
+                break
+            continue
+
+        if message[0] == 'progress':
+            progress.update(message[2], message[3])
+        elif message[0] == 'done':
+            running -= 1
+        else:
+            running -= 1
+            errors.append(f"Worker {message[1]}:\n{message[2]}")
+
+    for process in processes:
+        process.join()
+
+    if errors or running:
+        raise RuntimeError("\n".join(errors) or "A worker process exited unexpectedly")
+
+
+def dataset_spec(days, interval_seconds, seed, end_time, disorder=None):
+    """
+    Build the dataset specification shared by all workers.
+
+    Args:
+        days: Number of days of historical data
+        interval_seconds: Seconds between readings per sensor
+        seed: Dataset seed
+        end_time: End of the dataset (naive = local time)
+        disorder: Disorder settings (see make_disorder) or None
 
-    # Random noise
-    noise = random.uniform(-2, 2)
+    Returns:
+        Dictionary with seed, start_us, interval_us, utc_offset,
+        readings_per_block, readings_per_sensor and disorder
+    """
+    start_time = end_time - timedelta(days=days)
+    local_end = end_time if end_time.tzinfo else end_time.astimezone()
+    utc_offset = int(local_end.utcoffset().total_seconds())
 
-    temperature = base_temp + daily_variation + noise
-    return round(temperature, 2)
+    return {
+        'seed': seed,
+        'start_us': int(start_time.timestamp()) * MICROSECONDS,
+        'interval_us': interval_seconds * MICROSECONDS,
+        'utc_offset': utc_offset,
+        'readings_per_block': max(1, BLOCK_SECONDS // interval_seconds),
+        'readings_per_sensor': (days * 24 * 3600) // interval_seconds,
+        'disorder': disorder
+    }
 
 
-def generate_humidity(temperature):
+def make_disorder(late_pct=0, late_delay='exp:300', duplicate_pct=0, outage_rate=0,
+                  outage_duration=1800):
     """
-    Generate humidity that correlates negatively with temperature.
+    Collect disorder injection settings.
 
     Args:
-        temperature: Current temperature
+        late_pct: Percent of readings that arrive late
+        late_delay: Delay distribution of late and duplicate readings
+                    (exp:MEAN, uniform:MIN:MAX or fixed:SECONDS)
+        duplicate_pct: Percent of readings that are sent twice
+        outage_rate: Sensor outages per sensor and day
+        outage_duration: Mean outage duration in seconds
 
     Returns:
-        Humidity percentage
+        Dictionary of settings, or None if no disorder is injected
     """
-    # Higher temperature = lower humidity (generally)
-    base_humidity = 70 - (temperature - 20) * 1.5
+    if not (late_pct or duplicate_pct or outage_rate):
+        return None
+
+    return {
+        'late_pct': late_pct,
+        'late_delay': late_delay,
+        'duplicate_pct': duplicate_pct,
+        'outage_rate': outage_rate,
+        'outage_duration': outage_duration
+    }
 
-    # Random variation
-    noise = random.uniform(-10, 10)
 
-    humidity = max(30, min(80, base_humidity + noise))
-    return round(humidity, 2)
+def describe_disorder(disorder):
+    """Summarize disorder settings in one line."""
+    if not disorder:
+        return "none"
+    return (f"{disorder['late_pct']:g}% late ({disorder['late_delay']}), "
+            f"{disorder['duplicate_pct']:g}% duplicates, "
+            f"{disorder['outage_rate']:g} outages/sensor/day "
+            f"(mean {disorder['outage_duration']:g} s)")
 
 
-def generate_pressure():
+def run_params(days, num_sensors, interval_seconds, batch_size, method, workers,
+               partition, seed, end_time, order, disorder, shard_names):
     """
-    Generate atmospheric pressure.
+    Describe a load run; the same parameters produce the same row stream.
 
     Returns:
-        Pressure in hPa
+        (run_id, params): a short hash and a JSON-serializable dictionary
+        of generate_data arguments plus the shard names
     """
-    # Standard pressure with random variation
-    pressure = 1013.25 + random.uniform(-20, 20)
-    return round(pressure, 2)
+    params = {
+        'shard_names': list(shard_names),
+        'days': days,
+        'num_sensors': num_sensors,
+        'interval_seconds': interval_seconds,
+        'batch_size': batch_size,
+        'method': method,
+        'workers': workers,
+        'partition': partition,
+        'seed': seed,
+        'end_time': end_time.isoformat(),
+        'order': order,
+        'disorder': disorder
+    }
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+    return digest[:12], params
 
 
-def generate_sensor_reading(timestamp, sensor_id):
+def prepare_run(shards, run_id, params, resume=False):
     """
-    Generate a complete sensor reading.
+    Register a load run on every shard and read its checkpoints.
 
     Args:
-        timestamp: datetime object
-        sensor_id: sensor identifier
+        shards: Dictionary {shard_name: db_config}
+        run_id: Run identifier from run_params
+        params: Run parameters from run_params
+        resume: Keep the run's checkpoints (False = start from scratch)
 
     Returns:
-        Dictionary with sensor data
+        Dictionary {worker_id: {shard: (rows, last_sensor_id, last_time)}}
     """
-    temperature = generate_temperature(timestamp, sensor_id)
-    humidity = generate_humidity(temperature)
-    pressure = generate_pressure()
+    checkpoints = {}
 
-    return {
-        'time': timestamp,
-        'sensor_id': sensor_id,
-        'temperature': temperature,
-        'humidity': humidity,
-        'pressure': pressure
-    }
+    for shard, db_config in shards.items():
+        conn = psycopg2.connect(**db_config)
+        cursor = conn.cursor()
+        cursor.execute(CHECKPOINT_TABLES)
+
+        if resume:
+            cursor.execute("""
+                SELECT worker_id, rows, last_sensor_id, last_time
+                FROM generator_checkpoints
+                WHERE run_id = %s AND shard = %s
+            """, (run_id, shard))
+            for worker_id, rows, last_sensor_id, last_time in cursor.fetchall():
+                checkpoints.setdefault(worker_id, {})[shard] = (rows, last_sensor_id, last_time)
+        else:
+            cursor.execute("DELETE FROM generator_checkpoints WHERE run_id = %s", (run_id,))
+
+        cursor.execute("""
+            INSERT INTO generator_runs (run_id, params) VALUES (%s, %s)
+            ON CONFLICT (run_id) DO UPDATE SET finished_at = NULL
+        """, (run_id, json.dumps(params)))
+
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+    return checkpoints
 
 
-def insert_batch(conn, data_batch):
+def find_run(shards, run_id='latest'):
     """
-    Insert a batch of readings into the database.
+    Look up a load run to resume.
 
     Args:
-        conn: Database connection
-        data_batch: List of sensor readings
+        shards: Dictionary {shard_name: db_config}
+        run_id: Run identifier, or 'latest' for the most recent unfinished run
+
+    Returns:
+        (run_id, params) or None if there is no such run
     """
+    conn = psycopg2.connect(**next(iter(shards.values())))
     cursor = conn.cursor()
 
-    # Prepare data for batch insert
-    values = [(
-        d['time'],
-        d['sensor_id'],
-        d['temperature'],
-        d['humidity'],
-        d['pressure']
-    ) for d in data_batch]
+    try:
+        cursor.execute("SELECT to_regclass('generator_runs')")
+        if cursor.fetchone()[0] is None:
+            return None
+
+        if run_id == 'latest':
+            cursor.execute("""
+                SELECT run_id, params FROM generator_runs
+                WHERE finished_at IS NULL
+                ORDER BY started_at DESC LIMIT 1
+            """)
+        else:
+            cursor.execute("SELECT run_id, params FROM generator_runs WHERE run_id = %s", (run_id,))
+
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
 
-    # Execute batch insert
-    cursor.executemany("""
-        INSERT INTO sensor_data (time, sensor_id, temperature, humidity, pressure)
-        VALUES (%s, %s, %s, %s, %s)
-    """, values)
 
-    conn.commit()
+def finish_run(shards, run_id):
+    """Mark a load run as complete on every shard."""
+    for db_config in shards.values():
+        conn = psycopg2.connect(**db_config)
+        cursor = conn.cursor()
+        cursor.execute("UPDATE generator_runs SET finished_at = now() WHERE run_id = %s", (run_id,))
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+
+def show_sample_data(db_config):
+    """Print the five most recent readings of a database."""
+    print("Sample data:")
+    conn = psycopg2.connect(**db_config)
+    cursor = conn.cursor()
+    if detect_schema(cursor) == 'compact':
+        cursor.execute("""
+            SELECT d.time, s.sensor_id, d.temperature, d.humidity, d.pressure
+            FROM (SELECT * FROM sensor_data ORDER BY time DESC LIMIT 5) d
+            JOIN sensors s USING (sensor_key)
+            ORDER BY d.time DESC
+        """)
+    else:
+        cursor.execute("""
+            SELECT time, sensor_id, temperature, humidity, pressure
+            FROM sensor_data
+            ORDER BY time DESC
+            LIMIT 5
+        """)
+
+    print(f"{'Time':<20} {'Sensor':<15} {'Temp (°C)':<12} {'Humidity (%)':<15} {'Pressure (hPa)':<15}")
+    print("-" * 80)
+
+    for row in cursor.fetchall():
+        print(f"{row[0].strftime('%Y-%m-%d %H:%M:%S'):<20} {row[1]:<15} {row[2]:<12.2f} {row[3]:<15.2f} {row[4]:<15.2f}")
+
     cursor.close()
+    conn.close()
+
 
+def check_connections(shards):
+    """Exit with an error if any shard is unreachable."""
+    try:
+        for db_config in shards.values():
+            psycopg2.connect(**db_config).close()
+        print(f"✓ Connected to database ({len(shards)} shard(s))")
+    except Exception as e:
+        print(f"✗ Error connecting to database: {e}")
+        sys.exit(1)
 
-def generate_data(days, num_sensors, interval_seconds, batch_size=1000):
+
+def generate_data(days, num_sensors, interval_seconds, batch_size=10000, shards=None,
+                  method='copy', workers=1, partition='sensor', seed=None, end_time=None,
+                  output=None, output_format='csv', order='sensor', disorder=None,
+                  resume=None):
     """
     Generate historical IoT data.
 
@@ -147,96 +1461,163 @@ def generate_data(days, num_sensors, interval_seconds, batch_size=1000):
         num_sensors: Number of different sensors
         interval_seconds: Seconds between readings per sensor
         batch_size: Number of readings to insert at once
+        shards: Dictionary {shard_name: db_config} (None = DB_CONFIG only)
+        method: Bulk insert method (see INSERT_METHODS)
+        workers: Number of worker processes, each with its own connection
+        partition: Split work across workers by 'sensor' or 'time'
+        seed: Dataset seed (None = random, printed for reproduction)
+        end_time: End of the dataset (None = now)
+        output: Directory to write dataset files to instead of the database
+        output_format: 'csv' (gzip) or 'parquet'
+        order: Write each sensor's history in turn ('sensor') or all
+               sensors per tick ('time')
+        disorder: Late/duplicate/outage injection settings (see make_disorder)
+        resume: Run ID of an interrupted database load to continue
     """
+    shards = shards or {'shard1': DB_CONFIG}
+    ring = ShardRing(list(shards))
+
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % 2**32)
+    end_time = end_time or datetime.now().replace(microsecond=0)
+    spec = dataset_spec(days, interval_seconds, seed, end_time, disorder)
+
+    # Database loads are checkpointed so they can be resumed
+    run_id = None
+    if not output:
+        run_id, params = run_params(days, num_sensors, interval_seconds, batch_size, method,
+                                    workers, partition, seed, end_time, order, disorder,
+                                    list(shards))
+        run_id = resume or run_id
+
     print("=" * 60)
     print("IoT Data Generator")
     print("=" * 60)
     print(f"  Days of data: {days}")
     print(f"  Number of sensors: {num_sensors}")
     print(f"  Interval: {interval_seconds} seconds")
+    print(f"  Seed: {seed}")
     print(f"  Batch size: {batch_size} readings")
+    if output:
+        print(f"  Output: {output} ({output_format})")
+    else:
+        print(f"  Insert method: {method}")
+    print(f"  Shards: {len(shards)}")
+    print(f"  Workers: {workers} (partitioned by {partition})")
+    print(f"  Order: by {order}")
+    print(f"  Disorder: {describe_disorder(disorder)}")
+    if run_id:
+        print(f"  Run: {run_id}{' (resuming)' if resume else ''}")
     print()
 
     # Calculate total readings
-    readings_per_sensor = (days * 24 * 3600) // interval_seconds
+    readings_per_sensor = spec['readings_per_sensor']
     total_readings = readings_per_sensor * num_sensors
 
     print(f"  Total readings to generate: {total_readings:,}")
     print()
 
-    # Connect to database
-    try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        print("✓ Connected to database")
-    except Exception as e:
-        print(f"✗ Error connecting to database: {e}")
-        sys.exit(1)
+    checkpoints = {}
+    if output:
+        os.makedirs(output, exist_ok=True)
+    else:
+        check_connections(shards)
+        checkpoints = prepare_run(shards, run_id, params, resume=bool(resume))
 
     # Generate sensor IDs
     sensor_ids = [f"sensor_{i:03d}" for i in range(1, num_sensors + 1)]
 
-    # Start time (days ago)
-    start_time = datetime.now() - timedelta(days=days)
-
-    print(f"✓ Generating data from {start_time} to {datetime.now()}")
+    start_time = datetime.fromtimestamp(spec['start_us'] / MICROSECONDS, tz=end_time.tzinfo)
+    print(f"✓ Generating data from {start_time} to {end_time}")
+    print(f"  Reproduce with: --seed {seed} --end {end_time.isoformat()}")
+    if run_id:
+        print(f"  If interrupted, continue with: --resume {run_id}")
     print()
 
-    try:
-        data_batch = []
-        count = 0
-        last_print_count = 0
-
-        # Generate data for each sensor
-        for sensor_id in sensor_ids:
-            current_time = start_time
-
-            while current_time < datetime.now():
-                # Generate reading
-                reading = generate_sensor_reading(current_time, sensor_id)
-                data_batch.append(reading)
-                count += 1
-
-                # Insert batch when it reaches batch_size
-                if len(data_batch) >= batch_size:
-                    insert_batch(conn, data_batch)
-                    data_batch = []
+    # Report where each worker continues
+    for worker_id, worker_checkpoints in sorted(checkpoints.items()):
+        for shard, (rows, last_sensor_id, last_time) in sorted(worker_checkpoints.items()):
+            print(f"  Worker {worker_id}, {shard}: resuming after {rows:,} readings "
+                  f"(last {last_sensor_id} at {last_time})")
+    if checkpoints:
+        print()
 
-                    # Print progress every 10000 readings
-                    if count - last_print_count >= 10000:
-                        progress = (count / total_readings) * 100
-                        print(f"  Progress: {count:,} / {total_readings:,} ({progress:.1f}%)")
-                        last_print_count = count
+    index = np.arange(readings_per_sensor, dtype=np.int64)
+    tasks = [
+        {
+            'worker_id': worker_id,
+            'sensor_ids': part_sensor_ids,
+            'index': part_index,
+            'spec': spec,
+            'order': order,
+            'batch_size': batch_size,
+            'method': method,
+            'shards': shards,
+            'output': output,
+            'output_format': output_format,
+            'run_id': run_id,
+            'skip': {
+                shard: checkpoint[0]
+                for shard, checkpoint in checkpoints.get(worker_id, {}).items()
+            }
+        }
+        for worker_id, (part_sensor_ids, part_index)
+        in enumerate(partition_tasks(sensor_ids, index, workers, partition), start=1)
+    ]
+
+    progress = Progress(
+        total_readings,
+        shards=None if output else shards,
+        done=sum(checkpoint[0] for worker in checkpoints.values() for checkpoint in worker.values())
+    )
 
-                # Move to next reading time
-                current_time += timedelta(seconds=interval_seconds)
+    try:
+        run_workers(load_partition, tasks, progress)
+        chunks = progress.count_chunks()
+        if run_id:
+            finish_run(shards, run_id)
 
-        # Insert remaining batch
-        if data_batch:
-            insert_batch(conn, data_batch)
+        count = progress.count
+        total_seconds = time.time() - progress.start
+        insert_seconds = progress.insert_seconds
+        step = f"Write time ({output_format})" if output else f"Insert time ({method}"
 
         print()
         print("=" * 60)
         print(f"✓ Successfully generated {count:,} readings")
+        print(f"  Total time: {total_seconds:.1f} s ({count / total_seconds:,.0f} rows/s)")
+        print(f"  {step}, summed over {len(tasks)} worker(s)): {insert_seconds:.1f} s "
+              f"({count / insert_seconds if insert_seconds > 0 else 0:,.0f} rows/s per worker)")
+        if progress.done:
+            print(f"  Resumed after {progress.done:,} readings loaded earlier")
+        if chunks is not None:
+            print(f"  Chunks: {chunks:,}")
         print("=" * 60)
         print()
 
-        # Show sample data
-        print("Sample data:")
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT time, sensor_id, temperature, humidity, pressure
-            FROM sensor_data
-            ORDER BY time DESC
-            LIMIT 5
-        """)
-
-        print(f"{'Time':<20} {'Sensor':<15} {'Temp (°C)':<12} {'Humidity (%)':<15} {'Pressure (hPa)':<15}")
-        print("-" * 80)
-
-        for row in cursor.fetchall():
-            print(f"{row[0].strftime('%Y-%m-%d %H:%M:%S'):<20} {row[1]:<15} {row[2]:<12.2f} {row[3]:<15.2f} {row[4]:<15.2f}")
-
-        cursor.close()
+        if output:
+            # Describe the dataset next to its files
+            with open(os.path.join(output, 'dataset.json'), 'w') as f:
+                json.dump({
+                    'seed': seed,
+                    'days': days,
+                    'sensors': num_sensors,
+                    'interval_seconds': interval_seconds,
+                    'end_time': end_time.isoformat(),
+                    'format': output_format,
+                    'order': order,
+                    'disorder': disorder,
+                    'shards': list(shards),
+                    'readings': count
+                }, f, indent=2)
+
+            print("Next steps:")
+            print(f"  1. Load the dataset: python3 generate_data.py --load {output}")
+            print()
+            return
+
+        # Show sample data (from the shard of the first sensor)
+        show_sample_data(shards[ring.shard_for(sensor_ids[0])])
 
         print()
         print("Next steps:")
@@ -247,10 +1628,307 @@ def generate_data(days, num_sensors, interval_seconds, batch_size=1000):
 
     except Exception as e:
         print(f"\n✗ Error generating data: {e}")
+        if run_id:
+            print(f"  Continue with: python3 generate_data.py --resume {run_id}")
         import traceback
         traceback.print_exc()
+
     finally:
-        conn.close()
+        progress.close()
+
+
+def load_dataset(directory, shards=None, workers=1):
+    """
+    Load a dataset written with --output using COPY.
+
+    Args:
+        directory: Dataset directory
+        shards: Dictionary {shard_name: db_config} (None = DB_CONFIG only)
+        workers: Number of worker processes
+    """
+    shards = shards or {'shard1': DB_CONFIG}
+    files = sorted(
+        glob.glob(os.path.join(directory, '*.csv.gz')) +
+        glob.glob(os.path.join(directory, '*.parquet'))
+    )
+
+    total_readings = 0
+    metadata_path = os.path.join(directory, 'dataset.json')
+    if os.path.exists(metadata_path):
+        with open(metadata_path) as f:
+            total_readings = json.load(f).get('readings', 0)
+
+    print("=" * 60)
+    print("IoT Dataset Loader")
+    print("=" * 60)
+    print(f"  Directory: {directory}")
+    print(f"  Files: {len(files)}")
+    print(f"  Readings: {total_readings:,}")
+    print(f"  Workers: {workers}")
+    print()
+
+    if not files:
+        print("✗ No dataset files found")
+        sys.exit(1)
+
+    check_connections(shards)
+    print()
+
+    tasks = [
+        {'worker_id': worker_id, 'files': files[worker_id - 1::workers], 'shards': shards}
+        for worker_id in range(1, min(workers, len(files)) + 1)
+    ]
+
+    progress = Progress(total_readings, shards=shards)
+
+    try:
+        run_workers(load_files_partition, tasks, progress)
+
+        total_seconds = time.time() - progress.start
+
+        print()
+        print("=" * 60)
+        print(f"✓ Successfully loaded {progress.count:,} readings")
+        print(f"  Total time: {total_seconds:.1f} s ({progress.count / total_seconds:,.0f} rows/s)")
+        print("=" * 60)
+        print()
+
+    except Exception as e:
+        print(f"\n✗ Error loading dataset: {e}")
+        import traceback
+        traceback.print_exc()
+
+    finally:
+        progress.close()
+
+
+class TokenBucket:
+    """Token-bucket rate limiter for live mode."""
+
+    def __init__(self, rate, capacity):
+        """
+        Create an empty bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of stored tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+
+    def acquire(self, count):
+        """Block until `count` tokens are available, then take them."""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            if self.tokens >= count:
+                self.tokens -= count
+                return
+
+            time.sleep((count - self.tokens) / self.rate)
+
+
+def parse_rate(value):
+    """Parse a --rate value such as '500' or '500/s' (readings per second)."""
+    try:
+        rate = float(value[:-2] if value.endswith('/s') else value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid rate: {value}")
+    if rate <= 0:
+        raise argparse.ArgumentTypeError("rate must be positive")
+    return rate
+
+
+def format_percentiles(latencies):
+    """Format p50/p95/p99 of a list of insert latencies in milliseconds."""
+    if not latencies:
+        return "p50 -, p95 -, p99 -"
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return f"p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms"
+
+
+def live_readings(sensor_ids, sensor_specs, first, count):
+    """
+    Generate live readings [first, first + count) grouped by sensor.
+
+    Reading k belongs to sensor k % len(sensor_ids) and is that sensor's
+    reading number k // len(sensor_ids), so every sensor reports once
+    per round.
+
+    Args:
+        sensor_ids: List of sensor identifiers
+        sensor_specs: Per-sensor dataset specifications
+        first: Number of the first reading
+        count: Number of readings
+
+    Returns:
+        List of (sensor position, readings dictionary)
+    """
+    numbers = np.arange(first, first + count, dtype=np.int64)
+    positions = numbers % len(sensor_ids)
+    index = numbers // len(sensor_ids)
+
+    return [
+        (int(position), generate_sensor_readings(
+            sensor_ids[position], index[positions == position], sensor_specs[position]
+        ))
+        for position in np.unique(positions)
+    ]
+
+
+def stream_live(num_sensors, rate, duration=0, batch_size=10000, shards=None,
+                method='copy', seed=None, report_interval=5, disorder=None):
+    """
+    Stream readings into the database at wall-clock pace.
+
+    A token bucket releases readings at `rate` per second and they are
+    inserted in batches. Periodic reports show the achieved rate, insert
+    latency percentiles and how far ingest lags behind schedule.
+
+    Args:
+        num_sensors: Number of different sensors
+        rate: Target readings per second across all sensors
+        duration: Seconds to run (0 = until interrupted)
+        batch_size: Maximum number of readings per insert
+        shards: Dictionary {shard_name: db_config} (None = DB_CONFIG only)
+        method: Bulk insert method (see INSERT_METHODS)
+        seed: Dataset seed (None = random, printed for reproduction)
+        report_interval: Seconds between progress reports
+        disorder: Late/duplicate/outage injection settings (see make_disorder);
+                  late readings are inserted once their arrival time is reached
+    """
+    shards = shards or {'shard1': DB_CONFIG}
+    ring = ShardRing(list(shards))
+
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % 2**32)
+
+    sensor_ids = [f"sensor_{i:03d}" for i in range(1, num_sensors + 1)]
+    sensor_shards = [ring.shard_for(sensor_id) for sensor_id in sensor_ids]
+    batch = max(1, min(batch_size, round(rate * LIVE_FLUSH_SECONDS)))
+
+    print("=" * 60)
+    print("IoT Data Generator (live)")
+    print("=" * 60)
+    print(f"  Number of sensors: {num_sensors}")
+    print(f"  Target rate: {rate:,.0f} readings/s "
+          f"(each sensor every {num_sensors / rate:.2f} s)")
+    print(f"  Duration: {f'{duration} s' if duration else 'until Ctrl+C'}")
+    print(f"  Seed: {seed}")
+    print(f"  Batch size: {batch} readings")
+    print(f"  Insert method: {method}")
+    print(f"  Shards: {len(shards)}")
+    print(f"  Disorder: {describe_disorder(disorder)}")
+    print()
+
+    check_connections(shards)
+    connections = {name: psycopg2.connect(**db_config) for name, db_config in shards.items()}
+    groups = ring.partition(sensor_ids)
+    sensor_keys = {name: register_sensors(conn, groups[name]) for name, conn in connections.items()}
+
+    # Reading k is due at start + k / rate; sensors are staggered within a round
+    start = time.time()
+    interval_us = max(1, round(num_sensors * MICROSECONDS / rate))
+    spec = {
+        'seed': seed,
+        'start_us': int(start * MICROSECONDS),
+        'interval_us': interval_us,
+        'utc_offset': int(datetime.now().astimezone().utcoffset().total_seconds()),
+        'readings_per_block': max(1, BLOCK_SECONDS * MICROSECONDS // interval_us),
+        'disorder': disorder
+    }
+    sensor_specs = [
+        dict(spec, start_us=spec['start_us'] + position * interval_us // num_sensors)
+        for position in range(num_sensors)
+    ]
+
+    bucket = TokenBucket(rate, capacity=2 * batch)
+    buffers = {name: ArrivalBuffer() for name in shards}
+    latencies = []
+    window_latencies = []
+    generated = 0
+    count = 0
+    window_count = 0
+    max_lag = 0.0
+    started = time.monotonic()
+    window_start = started
+
+    print(f"✓ Streaming from {datetime.fromtimestamp(start).replace(microsecond=0)} "
+          f"(Ctrl+C to stop)")
+    print()
+
+    try:
+        while not duration or time.monotonic() - started < duration:
+            bucket.acquire(batch)
+
+            by_shard = {}
+            for position, readings in live_readings(sensor_ids, sensor_specs, generated, batch):
+                by_shard.setdefault(sensor_shards[position], []).append(readings)
+            generated += batch
+
+            if disorder:
+                # Hold back late readings until their arrival time
+                watermark = spec['start_us'] + int((generated - 1) * MICROSECONDS / rate)
+                for name, pieces in by_shard.items():
+                    for piece in pieces:
+                        buffers[name].push(piece)
+                by_shard = {}
+                for name, buffer in buffers.items():
+                    readings = buffer.release(watermark)
+                    if readings is not None:
+                        by_shard[name] = [readings]
+
+            for name, pieces in by_shard.items():
+                readings = concat_readings(pieces)
+                insert_start = time.perf_counter()
+                insert_batch(connections[name], readings, method, sensor_keys=sensor_keys[name])
+                latency = (time.perf_counter() - insert_start) * 1000
+                latencies.append(latency)
+                window_latencies.append(latency)
+                count += len(readings['time'])
+                window_count += len(readings['time'])
+
+            # How long ago the newest generated reading was due
+            lag = max(0.0, time.time() - (start + (generated - 1) / rate))
+            max_lag = max(max_lag, lag)
+
+            now = time.monotonic()
+            if now - window_start >= report_interval:
+                print(f"  [{now - started:5.0f} s] {count:,} readings - "
+                      f"{window_count / (now - window_start):,.0f} readings/s - "
+                      f"insert {format_percentiles(window_latencies)} - lag {lag:.2f} s")
+                window_latencies = []
+                window_count = 0
+                window_start = now
+
+    except KeyboardInterrupt:
+        print()
+        print("  Stopping...")
+
+    except Exception as e:
+        print(f"\n✗ Error streaming data: {e}")
+        import traceback
+        traceback.print_exc()
+
+    finally:
+        for conn in connections.values():
+            conn.close()
+
+    total_seconds = time.monotonic() - started
+
+    print()
+    print("=" * 60)
+    print(f"✓ Streamed {count:,} readings in {total_seconds:.1f} s")
+    print(f"  Achieved rate: {count / total_seconds if total_seconds > 0 else 0:,.0f} "
+          f"readings/s (target {rate:,.0f})")
+    print(f"  Insert latency per batch: {format_percentiles(latencies)}")
+    print(f"  Lag behind schedule: {max_lag:.2f} s max")
+    print("=" * 60)
+    print()
 
 
 def main():
@@ -283,11 +1961,217 @@ def main():
     parser.add_argument(
         '--batch-size',
         type=int,
-        default=1000,
-        help='Batch size for inserts (default: 1000)'
+        default=10000,
+        help='Batch size for inserts (default: 10000)'
+    )
+
+    parser.add_argument(
+        '--method',
+        choices=INSERT_METHODS,
+        default='copy',
+        help='Bulk insert method: COPY from an in-memory buffer, multi-row '
+             'INSERT (execute_values) or one INSERT per row (default: copy)'
+    )
+
+    parser.add_argument(
+        '--shards',
+        type=str,
+        default=os.getenv('DB_SHARDS', ''),
+        help='Comma-separated shards "name=host:port[/db]"; sensors are '
+             'placed by consistent hashing (default: $DB_SHARDS or localhost:5432)'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Worker processes, each with its own connection (default: 1)'
+    )
+
+    parser.add_argument(
+        '--partition',
+        choices=['sensor', 'time'],
+        default='sensor',
+        help='Split work across workers by sensor or by time range (default: sensor)'
+    )
+
+    parser.add_argument(
+        '--order',
+        choices=GENERATION_ORDERS,
+        default='sensor',
+        help='Write each sensor\'s whole history in turn, or all sensors per '
+             'tick the way devices report (default: sensor)'
+    )
+
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=None,
+        help='Seed for reproducible datasets (default: random, printed)'
+    )
+
+    parser.add_argument(
+        '--end',
+        type=datetime.fromisoformat,
+        default=None,
+        help='End of the dataset as ISO timestamp, e.g. 2024-01-31T00:00:00+00:00 '
+             '(default: now)'
+    )
+
+    parser.add_argument(
+        '--output',
+        type=str,
+        default=None,
+        help='Write the dataset to compressed files in this directory '
+             'instead of the database'
+    )
+
+    parser.add_argument(
+        '--format',
+        choices=OUTPUT_FORMATS,
+        default='csv',
+        help='File format for --output: gzip CSV or Parquet (default: csv)'
+    )
+
+    parser.add_argument(
+        '--load',
+        type=str,
+        default=None,
+        help='Load a dataset directory written with --output using COPY'
+    )
+
+    parser.add_argument(
+        '--resume',
+        nargs='?',
+        const='latest',
+        default=None,
+        metavar='RUN_ID',
+        help='Continue an interrupted database load from its checkpoints, '
+             'with its original parameters (default: the latest unfinished run)'
+    )
+
+    parser.add_argument(
+        '--late-pct',
+        type=float,
+        default=0,
+        help='Percent of readings that arrive late, after newer readings (default: 0)'
+    )
+
+    parser.add_argument(
+        '--late-delay',
+        type=parse_delay,
+        default='exp:300',
+        help='Delay distribution of late and duplicate readings in seconds: '
+             'exp:MEAN, uniform:MIN:MAX or fixed:SECONDS (default: exp:300)'
+    )
+
+    parser.add_argument(
+        '--duplicate-pct',
+        type=float,
+        default=0,
+        help='Percent of readings that are sent twice (default: 0)'
+    )
+
+    parser.add_argument(
+        '--outage-rate',
+        type=float,
+        default=0,
+        help='Sensor outages (gaps without readings) per sensor and day (default: 0)'
+    )
+
+    parser.add_argument(
+        '--outage-duration',
+        type=float,
+        default=1800,
+        help='Mean outage duration in seconds, exponentially distributed (default: 1800)'
+    )
+
+    parser.add_argument(
+        '--live',
+        action='store_true',
+        help='Stream readings at wall-clock pace instead of backfilling history'
+    )
+
+    parser.add_argument(
+        '--rate',
+        type=parse_rate,
+        default=100.0,
+        help='Target readings per second across all sensors for --live, '
+             'e.g. 500 or 500/s (default: 100)'
+    )
+
+    parser.add_argument(
+        '--duration',
+        type=int,
+        default=0,
+        help='Seconds to stream with --live, 0 = until Ctrl+C (default: 0)'
+    )
+
+    parser.add_argument(
+        '--report-interval',
+        type=int,
+        default=5,
+        help='Seconds between --live progress reports (default: 5)'
     )
 
     args = parser.parse_args()
+    shards = parse_shards(args.shards, DB_CONFIG)
+
+    for name in ('late_pct', 'duplicate_pct'):
+        if not 0 <= getattr(args, name) <= 100:
+            print(f"Error: --{name.replace('_', '-')} must be between 0 and 100")
+            sys.exit(1)
+
+    if args.outage_rate < 0 or args.outage_duration <= 0:
+        print("Error: --outage-rate must not be negative and --outage-duration must be positive")
+        sys.exit(1)
+
+    disorder = make_disorder(
+        late_pct=args.late_pct,
+        late_delay=args.late_delay,
+        duplicate_pct=args.duplicate_pct,
+        outage_rate=args.outage_rate,
+        outage_duration=args.outage_duration
+    )
+
+    if args.resume:
+        run = find_run(shards, args.resume)
+        if not run:
+            print(f"✗ No load run to resume ({args.resume})")
+            sys.exit(1)
+
+        run_id, params = run
+        shard_names = params.pop('shard_names')
+        if shard_names != list(shards):
+            print(f"✗ Run {run_id} used shards {', '.join(shard_names)}; "
+                  f"configure the same shard names with --shards")
+            sys.exit(1)
+
+        params['end_time'] = datetime.fromisoformat(params['end_time'])
+        generate_data(shards=shards, resume=run_id, **params)
+        return
+
+    if args.live:
+        if args.sensors < 1:
+            print("Error: --sensors must be at least 1")
+            sys.exit(1)
+
+        stream_live(
+            num_sensors=args.sensors,
+            rate=args.rate,
+            duration=args.duration,
+            batch_size=args.batch_size,
+            shards=shards,
+            method=args.method,
+            seed=args.seed,
+            report_interval=args.report_interval,
+            disorder=disorder
+        )
+        return
+
+    if args.load:
+        load_dataset(args.load, shards=shards, workers=args.workers)
+        return
 
     # Validate arguments
     if args.days < 1:
@@ -302,12 +2186,26 @@ def main():
         print("Error: --interval must be at least 1")
         sys.exit(1)
 
+    if args.workers < 1:
+        print("Error: --workers must be at least 1")
+        sys.exit(1)
+
     # Generate data
     generate_data(
         days=args.days,
         num_sensors=args.sensors,
         interval_seconds=args.interval,
-        batch_size=args.batch_size
+        batch_size=args.batch_size,
+        shards=shards,
+        method=args.method,
+        workers=args.workers,
+        partition=args.partition,
+        seed=args.seed,
+        end_time=args.end,
+        output=args.output,
+        output_format=args.format,
+        order=args.order,
+        disorder=disorder
     )
 
 
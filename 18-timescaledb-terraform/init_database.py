@@ -11,8 +11,15 @@ This script creates:
 
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+import argparse
+import os
 import sys
 
+# Shard configuration shared with the API (app/shards.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app'))
+from shards import parse_shards  # noqa: E402
+from sensor_keys import SENSOR_COLUMNS, detect_schema  # noqa: E402
+
 
 # Database configuration
 DB_CONFIG = {
@@ -24,97 +31,458 @@ DB_CONFIG = {
 }
 
 
-def connect_db():
+# Continuous aggregate levels, finest first
+AGGREGATE_LEVELS = [('hourly', '1 hour'), ('daily', '1 day'), ('monthly', '1 month')]
+
+# Continuous aggregate layouts (see create_continuous_aggregates)
+AGGREGATE_LAYOUTS = ['flat', 'hierarchical']
+
+# sensor_data schemas (see create_hypertable)
+SENSOR_SCHEMAS = list(SENSOR_COLUMNS)
+
+# Index profiles of sensor_data: {name: [(index name, definition)]}.
+# {sensor} is the sensor column of the schema.
+INDEX_PROFILES = {
+    # Per-sensor lookups plus a B-tree on time for fleet-wide time ranges
+    'default': [
+        ('sensor_data_{sensor}_time_idx', '({sensor}, time DESC)'),
+        ('sensor_data_time_idx', '(time DESC)')
+    ],
+    # One index that answers raw reads with index-only scans
+    'covering': [
+        ('sensor_data_{sensor}_time_covering_idx',
+         '({sensor}, time DESC) INCLUDE (temperature, humidity, pressure)')
+    ],
+    # Per-sensor index plus a small BRIN index on time (rows arrive in time order)
+    'brin': [
+        ('sensor_data_{sensor}_time_idx', '({sensor}, time DESC)'),
+        ('sensor_data_time_brin_idx', 'USING brin (time)')
+    ],
+    # Only the per-sensor index; time ranges rely on chunk exclusion
+    'minimal': [
+        ('sensor_data_{sensor}_time_idx', '({sensor}, time DESC)')
+    ]
+}
+
+# Chunk interval sizing (see choose_chunk_interval): the chunks being
+# written, with their indexes, should fit in about 25% of main memory
+MEMORY_SHARE = 0.25
+
+# Approximate bytes per row of a chunk, heap plus both indexes, used
+# until there is data to measure
+ESTIMATED_ROW_BYTES = {'standard': 140, 'compact': 120}
+
+# Chunk intervals to choose from, in seconds
+CHUNK_INTERVAL_STEPS = [
+    600, 900, 1800, 3600, 2 * 3600, 3 * 3600, 4 * 3600, 6 * 3600, 8 * 3600, 12 * 3600,
+    86400, 2 * 86400, 3 * 86400, 7 * 86400, 14 * 86400, 30 * 86400
+]
+
+# Refresh policy of each aggregate level: (start_offset, end_offset, schedule_interval)
+REFRESH_POLICIES = {
+    'hourly': ('2 hours', '1 minute', '1 hour'),
+    'daily': ('3 days', '1 hour', '1 day'),
+    'monthly': ('2 months', '1 day', '1 day')
+}
+
+# Relations that can expire; daily and monthly aggregates are kept forever
+RETENTION_RELATIONS = ['sensor_data', 'sensor_data_hourly']
+
+# Retention tiers, applied by refresh_aggregates.py (see create_retention_policies)
+RETENTION_TABLE = """
+    CREATE TABLE IF NOT EXISTS retention_tiers (
+        relation    TEXT PRIMARY KEY,
+        drop_after  INTERVAL NOT NULL
+    )
+"""
+
+
+def connect_db(db_config=DB_CONFIG):
     """Connect to PostgreSQL database."""
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
+        conn = psycopg2.connect(**db_config)
         return conn
     except Exception as e:
         print(f"Error connecting to database: {e}")
         sys.exit(1)
 
 
-def create_hypertable(conn):
-    """Create sensor_data table and convert to hypertable."""
-    print("Creating sensor_data hypertable...")
+def index_profile_indexes(profile, sensor_column):
+    """Get the (index name, definition) pairs of an index profile."""
+    return [
+        (name.format(sensor=sensor_column), definition.format(sensor=sensor_column))
+        for name, definition in INDEX_PROFILES[profile]
+    ]
+
+
+def current_index_profile(cursor, sensor_column):
+    """
+    Find the index profile sensor_data currently has.
+
+    Returns:
+        Profile name, or None if the indexes match no profile
+    """
+    managed = {
+        name for profile in INDEX_PROFILES
+        for name, _ in index_profile_indexes(profile, sensor_column)
+    }
+    cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'sensor_data'")
+    present = {row[0] for row in cursor.fetchall()} & managed
+
+    for profile in INDEX_PROFILES:
+        if present == {name for name, _ in index_profile_indexes(profile, sensor_column)}:
+            return profile
+    return None
+
+
+def apply_index_profile(conn, profile, sensor_column):
+    """
+    Create the indexes of a profile and drop those of the other profiles.
+
+    Indexes on a hypertable are built on every chunk, which takes a
+    while on a large table.
+
+    Args:
+        conn: Database connection
+        profile: Key of INDEX_PROFILES
+        sensor_column: 'sensor_id' or 'sensor_key'
+    """
+    cursor = conn.cursor()
+
+    wanted = index_profile_indexes(profile, sensor_column)
+    wanted_names = {name for name, _ in wanted}
+
+    for name, definition in wanted:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON sensor_data {definition};")
+
+    for other in INDEX_PROFILES:
+        for name, _ in index_profile_indexes(other, sensor_column):
+            if name not in wanted_names:
+                cursor.execute(f"DROP INDEX IF EXISTS {name};")
+
+    conn.commit()
+    cursor.close()
+    print(f"✓ Indexes created ({profile}: {', '.join(sorted(wanted_names))})")
+
+
+def create_hypertable(conn, schema='standard', indexes=None):
+    """
+    Create sensor_data table and convert to hypertable.
+
+    Args:
+        conn: Database connection
+        schema: 'standard' (sensor_id string in every row) or 'compact'
+                (integer sensor_key, names in the sensors table)
+        indexes: Index profile (None = 'default' for a new table, keep
+                 the indexes of an existing one)
+
+    Returns:
+        Schema of sensor_data (an existing table keeps its schema)
+    """
+    print(f"Creating sensor_data hypertable ({schema})...")
 
     cursor = conn.cursor()
 
+    cursor.execute("SELECT to_regclass('sensor_data') IS NULL")
+    new_table = cursor.fetchone()[0]
+
+    if schema == 'compact':
+        # Sensor dictionary: each name is stored once
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sensors (
+                sensor_key  INTEGER GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+                sensor_id   VARCHAR(50) NOT NULL UNIQUE
+            );
+        """)
+        print("✓ Sensor dictionary table created")
+
+    sensor_column = "sensor_key  INTEGER" if schema == 'compact' else "sensor_id   VARCHAR(50)"
+
     # Create table
-    cursor.execute("""
+    cursor.execute(f"""
         CREATE TABLE IF NOT EXISTS sensor_data (
             time        TIMESTAMPTZ NOT NULL,
-            sensor_id   VARCHAR(50) NOT NULL,
+            {sensor_column} NOT NULL,
             temperature DOUBLE PRECISION,
             humidity    DOUBLE PRECISION,
             pressure    DOUBLE PRECISION
         );
     """)
 
+    existing = detect_schema(cursor)
+    if existing != schema:
+        print(f"  Note: sensor_data already exists with the {existing} schema; "
+              f"drop it to switch to {schema}")
+        schema = existing
+
     # Convert to hypertable (if not already)
     try:
         cursor.execute("""
             SELECT create_hypertable('sensor_data', 'time',
                 if_not_exists => TRUE,
-                chunk_time_interval => INTERVAL '1 day'
+                chunk_time_interval => INTERVAL '1 day',
+                create_default_indexes => FALSE
             );
         """)
         print("✓ Hypertable created successfully")
     except Exception as e:
         print(f"  Note: {e}")
 
+    conn.commit()
+    cursor.close()
+
     # Create indexes for better query performance
+    if indexes is None and new_table:
+        indexes = 'default'
+    if indexes:
+        apply_index_profile(conn, indexes, SENSOR_COLUMNS[schema])
+
+    return schema
+
+
+def parse_size(value):
+    """
+    Parse a memory size such as '16GB', '512MB' or '1.5 GiB' into bytes.
+
+    Raises:
+        ValueError: If the size cannot be parsed
+    """
+    units = {'': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3, 't': 1024 ** 4}
+    text = value.strip().lower().replace(' ', '').rstrip('b').rstrip('i')
+    number = text.rstrip('kmgt')
+    unit = text[len(number):]
+    if unit not in units:
+        raise ValueError(f"Invalid size: {value}")
+    try:
+        return int(float(number) * units[unit])
+    except ValueError:
+        raise ValueError(f"Invalid size: {value}")
+
+
+def format_size(size):
+    """Format a size in bytes as e.g. '1.2 GB'."""
+    for unit in ['B', 'kB', 'MB', 'GB']:
+        if abs(size) < 1024 or unit == 'GB':
+            return f"{size:.1f} {unit}" if unit != 'B' else f"{size:.0f} B"
+        size /= 1024
+
+
+def format_interval(seconds):
+    """Format a number of seconds as a PostgreSQL interval, e.g. '6 hours'."""
+    for unit, length in (('day', 86400), ('hour', 3600), ('minute', 60)):
+        if seconds >= length and seconds % length == 0:
+            count = seconds // length
+            return f"{count} {unit}{'s' if count != 1 else ''}"
+    return f"{seconds} seconds"
+
+
+def measure_ingest(cursor, schema):
+    """
+    Measure the ingest rate and row size from the data in sensor_data.
+
+    The rate is taken from the newest day of data, in data time, which
+    is what fills a chunk (also for backfilled history).
+
+    Args:
+        cursor: Database cursor
+        schema: sensor_data schema, for the row size estimate
+
+    Returns:
+        (readings per second or None, bytes per row, source of the row size)
+    """
     cursor.execute("""
-        CREATE INDEX IF NOT EXISTS sensor_data_sensor_id_time_idx
-        ON sensor_data (sensor_id, time DESC);
+        SELECT count(*), extract(epoch FROM max(time) - min(time))
+        FROM sensor_data
+        WHERE time > (SELECT max(time) FROM sensor_data) - INTERVAL '1 day'
     """)
+    rows, span = cursor.fetchone()
+    rate = rows / float(span) if rows and span else None
 
+    cursor.execute("SELECT hypertable_size('sensor_data'), approximate_row_count('sensor_data')")
+    size, total_rows = cursor.fetchone()
+    if size and total_rows and total_rows >= 10000:
+        return rate, size / total_rows, f"measured: {format_size(size)} / {total_rows:,} rows"
+
+    return rate, ESTIMATED_ROW_BYTES[schema], "estimated"
+
+
+def choose_chunk_interval(rows_per_second, bytes_per_row, memory_budget):
+    """
+    Pick the longest chunk interval whose chunk fits the memory budget.
+
+    Args:
+        rows_per_second: Ingest rate in readings per second
+        bytes_per_row: Chunk bytes per reading, indexes included
+        memory_budget: Bytes one chunk may use
+
+    Returns:
+        Interval in seconds (from CHUNK_INTERVAL_STEPS)
+    """
+    fitting = [
+        step for step in CHUNK_INTERVAL_STEPS
+        if step * rows_per_second * bytes_per_row <= memory_budget
+    ]
+    return fitting[-1] if fitting else CHUNK_INTERVAL_STEPS[0]
+
+
+def configure_chunk_interval(conn, schema, interval=None, ingest_rate=None, memory=None):
+    """
+    Size sensor_data chunks and apply the interval with set_chunk_time_interval.
+
+    The interval only applies to chunks created from now on.
+
+    Args:
+        conn: Database connection
+        schema: sensor_data schema
+        interval: 'auto' or an explicit interval such as '6 hours'
+        ingest_rate: Readings per second (None = measure from existing data)
+        memory: Server memory in bytes (None = use shared_buffers, which is
+                usually set to 25% of memory)
+    """
+    print("\nSizing chunks...")
+
+    cursor = conn.cursor()
+
+    measured_rate, bytes_per_row, row_source = measure_ingest(cursor, schema)
+    rate_source = "given"
+    if ingest_rate is None:
+        ingest_rate, rate_source = measured_rate, "measured over the newest day of data"
+
+    if memory is None:
+        cursor.execute("SELECT pg_size_bytes(current_setting('shared_buffers'))")
+        budget = cursor.fetchone()[0]
+        budget_source = "shared_buffers"
+    else:
+        budget = memory * MEMORY_SHARE
+        budget_source = f"{MEMORY_SHARE:.0%} of {format_size(memory)}"
+
+    # With space partitions, every time slice has several chunks written at once
     cursor.execute("""
-        CREATE INDEX IF NOT EXISTS sensor_data_time_idx
-        ON sensor_data (time DESC);
+        SELECT
+            max(extract(epoch FROM time_interval))::bigint,
+            max(num_partitions) FILTER (WHERE dimension_type = 'Space')
+        FROM timescaledb_information.dimensions
+        WHERE hypertable_name = 'sensor_data'
     """)
+    current, partitions = cursor.fetchone()
+    partitions = partitions or 1
+
+    if ingest_rate:
+        print(f"  Ingest rate: {ingest_rate:,.1f} readings/s ({rate_source})")
+    print(f"  Row size: {bytes_per_row:,.0f} B incl. indexes ({row_source})")
+    print(f"  Memory budget for the chunks being written: {format_size(budget)} ({budget_source})")
+    if partitions > 1:
+        print(f"  Space partitions: {partitions} chunks per time slice")
+
+    if interval == 'auto':
+        if not ingest_rate:
+            print("  ✗ No data to measure the ingest rate from; pass --ingest-rate")
+            cursor.close()
+            return
+        seconds = choose_chunk_interval(ingest_rate, bytes_per_row, budget)
+        interval = format_interval(seconds)
+    else:
+        cursor.execute("SELECT extract(epoch FROM %s::interval)::bigint", (interval,))
+        seconds = cursor.fetchone()[0]
+
+    # Projected chunk sizes of the current, chosen and neighbouring intervals
+    if ingest_rate:
+        candidates = {current, seconds}
+        if seconds in CHUNK_INTERVAL_STEPS:
+            position = CHUNK_INTERVAL_STEPS.index(seconds)
+            candidates.update(CHUNK_INTERVAL_STEPS[max(0, position - 1):position + 2])
+
+        print()
+        print(f"  {'Interval':<12} {'Rows/chunk':>14} {'Size/chunk':>12} {'Chunks/day':>11}")
+        for step in sorted(candidates):
+            rows = ingest_rate * step
+            size = rows * bytes_per_row
+            marks = ("✓" if size <= budget else "✗") + (" chosen" if step == seconds else "") + \
+                (" current" if step == current else "")
+            print(f"  {format_interval(step):<12} {rows / partitions:>14,.0f} "
+                  f"{format_size(size / partitions):>12} {86400 / step * partitions:>11.1f}  {marks}")
+        print()
 
+    cursor.execute("SELECT set_chunk_time_interval('sensor_data', %s::interval)", (interval,))
     conn.commit()
     cursor.close()
-    print("✓ Indexes created")
+    print(f"  ✓ Chunk interval set to {interval} (applies to new chunks)")
 
 
-def create_continuous_aggregates(conn):
-    """Create continuous aggregates for different time periods."""
-    print("\nCreating continuous aggregates...")
+def configure_space_partitions(conn, sensor_column, partitions):
+    """
+    Hash-partition sensor_data by sensor in addition to time.
+
+    Each time slice is split into `partitions` chunks, so a per-sensor
+    query reads one smaller chunk per slice. A space dimension can only
+    be added while the hypertable is empty; an existing one can change
+    its partition count (applies to new chunks).
+
+    Args:
+        conn: Database connection
+        sensor_column: 'sensor_id' or 'sensor_key'
+        partitions: Number of hash partitions
+    """
+    print(f"\nConfiguring space partitioning ({partitions} partitions)...")
 
     cursor = conn.cursor()
 
-    # Hourly aggregate
-    print("  Creating hourly aggregate...")
     cursor.execute("""
-        CREATE MATERIALIZED VIEW IF NOT EXISTS sensor_data_hourly
-        WITH (timescaledb.continuous) AS
-        SELECT
-            time_bucket('1 hour', time) AS bucket,
-            sensor_id,
-            AVG(temperature) as avg_temperature,
-            MIN(temperature) as min_temperature,
-            MAX(temperature) as max_temperature,
-            AVG(humidity) as avg_humidity,
-            MIN(humidity) as min_humidity,
-            MAX(humidity) as max_humidity,
-            AVG(pressure) as avg_pressure,
-            COUNT(*) as reading_count
-        FROM sensor_data
-        GROUP BY bucket, sensor_id
-        WITH NO DATA;
+        SELECT column_name FROM timescaledb_information.dimensions
+        WHERE hypertable_name = 'sensor_data' AND dimension_type = 'Space'
     """)
-    print("    ✓ Hourly aggregate created")
+    row = cursor.fetchone()
 
-    # Daily aggregate
-    print("  Creating daily aggregate...")
-    cursor.execute("""
-        CREATE MATERIALIZED VIEW IF NOT EXISTS sensor_data_daily
+    try:
+        if row:
+            cursor.execute(
+                "SELECT set_number_partitions('sensor_data', %s, %s)", (partitions, row[0])
+            )
+            print(f"  ✓ Partitions of {row[0]} set to {partitions} (applies to new chunks)")
+        else:
+            cursor.execute(
+                "SELECT add_dimension('sensor_data', %s, number_partitions => %s)",
+                (sensor_column, partitions)
+            )
+            print(f"  ✓ Space dimension added: hash of {sensor_column}")
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"    Note: {e}")
+        print("    Space partitioning can only be added to an empty sensor_data: "
+              "drop the table, re-run init_database.py and reload the data")
+    finally:
+        cursor.close()
+
+
+def raw_aggregate_sql(view, bucket_width, totals=False, sensor_column='sensor_id'):
+    """
+    Build a continuous aggregate over raw sensor_data.
+
+    Args:
+        view: View name
+        bucket_width: time_bucket width, e.g. '1 hour'
+        totals: Also store sums and counts so that coarser aggregates
+                can be built on top of this one
+        sensor_column: 'sensor_id' or 'sensor_key' (compact schema)
+
+    Returns:
+        CREATE MATERIALIZED VIEW statement
+    """
+    totals_columns = """,
+            SUM(temperature) as sum_temperature,
+            COUNT(temperature) as temperature_count,
+            SUM(humidity) as sum_humidity,
+            COUNT(humidity) as humidity_count,
+            SUM(pressure) as sum_pressure,
+            COUNT(pressure) as pressure_count""" if totals else ""
+
+    return f"""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS {view}
         WITH (timescaledb.continuous) AS
         SELECT
-            time_bucket('1 day', time) AS bucket,
-            sensor_id,
+            time_bucket('{bucket_width}', time) AS bucket,
+            {sensor_column},
             AVG(temperature) as avg_temperature,
             MIN(temperature) as min_temperature,
             MAX(temperature) as max_temperature,
@@ -122,37 +490,135 @@ def create_continuous_aggregates(conn):
             MIN(humidity) as min_humidity,
             MAX(humidity) as max_humidity,
             AVG(pressure) as avg_pressure,
-            COUNT(*) as reading_count
+            COUNT(*) as reading_count{totals_columns}
         FROM sensor_data
-        GROUP BY bucket, sensor_id
+        GROUP BY bucket, {sensor_column}
         WITH NO DATA;
-    """)
-    print("    ✓ Daily aggregate created")
+    """
 
-    # Monthly aggregate
-    print("  Creating monthly aggregate...")
-    cursor.execute("""
-        CREATE MATERIALIZED VIEW IF NOT EXISTS sensor_data_monthly
+
+def rollup_aggregate_sql(view, bucket_width, source, totals=False, sensor_column='sensor_id'):
+    """
+    Build a continuous aggregate on top of a finer one.
+
+    Averages are recomputed from the source's sums and counts (an
+    average of averages would weight every bucket equally), minimums
+    and maximums from the source's minimums and maximums.
+
+    Args:
+        view: View name
+        bucket_width: time_bucket width, e.g. '1 day'
+        source: Finer continuous aggregate created with totals
+        totals: Also store sums and counts for the next level
+        sensor_column: 'sensor_id' or 'sensor_key' (compact schema)
+
+    Returns:
+        CREATE MATERIALIZED VIEW statement
+    """
+    totals_columns = """,
+            SUM(sum_temperature) as sum_temperature,
+            SUM(temperature_count)::bigint as temperature_count,
+            SUM(sum_humidity) as sum_humidity,
+            SUM(humidity_count)::bigint as humidity_count,
+            SUM(sum_pressure) as sum_pressure,
+            SUM(pressure_count)::bigint as pressure_count""" if totals else ""
+
+    return f"""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS {view}
         WITH (timescaledb.continuous) AS
         SELECT
-            time_bucket('1 month', time) AS bucket,
-            sensor_id,
-            AVG(temperature) as avg_temperature,
-            MIN(temperature) as min_temperature,
-            MAX(temperature) as max_temperature,
-            AVG(humidity) as avg_humidity,
-            MIN(humidity) as min_humidity,
-            MAX(humidity) as max_humidity,
-            AVG(pressure) as avg_pressure,
-            COUNT(*) as reading_count
-        FROM sensor_data
-        GROUP BY bucket, sensor_id
+            time_bucket('{bucket_width}', bucket) AS bucket,
+            {sensor_column},
+            SUM(sum_temperature) / NULLIF(SUM(temperature_count), 0)::double precision as avg_temperature,
+            MIN(min_temperature) as min_temperature,
+            MAX(max_temperature) as max_temperature,
+            SUM(sum_humidity) / NULLIF(SUM(humidity_count), 0)::double precision as avg_humidity,
+            MIN(min_humidity) as min_humidity,
+            MAX(max_humidity) as max_humidity,
+            SUM(sum_pressure) / NULLIF(SUM(pressure_count), 0)::double precision as avg_pressure,
+            SUM(reading_count)::bigint as reading_count{totals_columns}
+        FROM {source}
+        GROUP BY time_bucket('{bucket_width}', bucket), {sensor_column}
         WITH NO DATA;
-    """)
-    print("    ✓ Monthly aggregate created")
+    """
+
+
+def create_continuous_aggregates(conn, layout='flat', prefix='sensor_data'):
+    """
+    Create continuous aggregates for different time periods.
+
+    Args:
+        conn: Database connection
+        layout: 'flat' (every level from raw sensor_data) or 'hierarchical'
+                (daily from hourly, monthly from daily)
+        prefix: View name prefix; views are named <prefix>_hourly etc.
+
+    The views group by the sensor column of sensor_data's schema.
+    """
+    print(f"\nCreating continuous aggregates ({layout})...")
+
+    cursor = conn.cursor()
+    sensor_column = SENSOR_COLUMNS[detect_schema(cursor)]
+
+    source = None
+    for level, (name, bucket_width) in enumerate(AGGREGATE_LEVELS):
+        view = f"{prefix}_{name}"
+        has_next_level = level < len(AGGREGATE_LEVELS) - 1
+
+        print(f"  Creating {name} aggregate...")
+        if layout == 'hierarchical' and source:
+            cursor.execute(rollup_aggregate_sql(
+                view, bucket_width, source, totals=has_next_level, sensor_column=sensor_column
+            ))
+            print(f"    ✓ {name.capitalize()} aggregate created (from {source})")
+        else:
+            cursor.execute(raw_aggregate_sql(
+                view, bucket_width, totals=layout == 'hierarchical' and has_next_level,
+                sensor_column=sensor_column
+            ))
+            print(f"    ✓ {name.capitalize()} aggregate created")
+        source = view
+
+    conn.commit()
+    cursor.close()
+
 
+def drop_continuous_aggregates(conn, prefix='sensor_data'):
+    """Drop the continuous aggregates (coarsest first) so they can be recreated."""
+    print("\nDropping continuous aggregates...")
+
+    cursor = conn.cursor()
+    for name, _ in reversed(AGGREGATE_LEVELS):
+        cursor.execute(f"DROP MATERIALIZED VIEW IF EXISTS {prefix}_{name} CASCADE;")
     conn.commit()
     cursor.close()
+    print("  ✓ Dropped")
+
+
+def aggregate_sources(cursor, prefix='sensor_data'):
+    """
+    Find the relation each continuous aggregate level reads from.
+
+    Returns:
+        Dictionary {level name: source relation}, e.g. {'daily':
+        'sensor_data_hourly'} for the hierarchical layout; levels
+        that do not exist are left out
+    """
+    cursor.execute("""
+        SELECT view_name, view_definition
+        FROM timescaledb_information.continuous_aggregates
+        WHERE view_name LIKE %s
+    """, (f"{prefix}_%",))
+    definitions = dict(cursor.fetchall())
+
+    sources = {}
+    finer = None
+    for name, _ in AGGREGATE_LEVELS:
+        view = f"{prefix}_{name}"
+        if view in definitions:
+            sources[name] = finer if finer and finer in definitions[view] else 'sensor_data'
+        finer = view
+    return sources
 
 
 def create_refresh_policies(conn):
@@ -161,80 +627,212 @@ def create_refresh_policies(conn):
 
     cursor = conn.cursor()
 
-    # Hourly aggregate: refresh every hour, looking at last 2 hours
-    try:
-        cursor.execute("""
-            SELECT add_continuous_aggregate_policy('sensor_data_hourly',
-                start_offset => INTERVAL '2 hours',
-                end_offset => INTERVAL '1 minute',
-                schedule_interval => INTERVAL '1 hour',
-                if_not_exists => TRUE
-            );
-        """)
-        print("  ✓ Hourly refresh policy created (runs every hour)")
-    except Exception as e:
-        print(f"    Note: {e}")
+    # Each policy looks back start_offset, e.g. hourly: last 2 hours, every hour
+    for name, _ in AGGREGATE_LEVELS:
+        start_offset, end_offset, schedule_interval = REFRESH_POLICIES[name]
+        try:
+            cursor.execute("""
+                SELECT add_continuous_aggregate_policy(%s,
+                    start_offset => %s::interval,
+                    end_offset => %s::interval,
+                    schedule_interval => %s::interval,
+                    if_not_exists => TRUE
+                );
+            """, (f"sensor_data_{name}", start_offset, end_offset, schedule_interval))
+            print(f"  ✓ {name.capitalize()} refresh policy created "
+                  f"(runs every {schedule_interval.split()[-1]})")
+        except Exception as e:
+            conn.rollback()
+            print(f"    Note: {e}")
+
+    conn.commit()
+    cursor.close()
+
+
+def enable_compression(conn, segmentby=None, orderby='time DESC', compress_after='7 days'):
+    """
+    Enable native compression on sensor_data with a compression policy.
+
+    Args:
+        conn: Database connection
+        segmentby: Columns stored as separate segments, e.g. 'sensor_id'
+                   (empty = no segmenting, None = the sensor column)
+        orderby: Sort order inside compressed segments, e.g. 'time DESC'
+        compress_after: Compress chunks older than this interval
+    """
+    print("\nEnabling compression...")
+
+    cursor = conn.cursor()
+
+    if segmentby is None:
+        segmentby = SENSOR_COLUMNS[detect_schema(cursor)]
 
-    # Daily aggregate: refresh every day, looking at last 3 days
     try:
         cursor.execute("""
-            SELECT add_continuous_aggregate_policy('sensor_data_daily',
-                start_offset => INTERVAL '3 days',
-                end_offset => INTERVAL '1 hour',
-                schedule_interval => INTERVAL '1 day',
-                if_not_exists => TRUE
+            ALTER TABLE sensor_data SET (
+                timescaledb.compress,
+                timescaledb.compress_segmentby = %s,
+                timescaledb.compress_orderby = %s
             );
-        """)
-        print("  ✓ Daily refresh policy created (runs every day)")
+        """, (segmentby, orderby))
+        print(f"  ✓ Compression enabled (segmentby: '{segmentby}', orderby: '{orderby}')")
     except Exception as e:
+        # Settings cannot change while chunks are compressed
+        conn.rollback()
         print(f"    Note: {e}")
 
-    # Monthly aggregate: refresh every day, looking at last 2 months
     try:
+        # if_not_exists keeps an existing policy even if its interval
+        # differs, so a changed --compress-after replaces the policy
         cursor.execute("""
-            SELECT add_continuous_aggregate_policy('sensor_data_monthly',
-                start_offset => INTERVAL '2 months',
-                end_offset => INTERVAL '1 day',
-                schedule_interval => INTERVAL '1 day',
-                if_not_exists => TRUE
-            );
-        """)
-        print("  ✓ Monthly refresh policy created (runs every day)")
+            SELECT config->>'compress_after', (config->>'compress_after')::interval = %s::interval
+            FROM timescaledb_information.jobs
+            WHERE proc_name = 'policy_compression' AND hypertable_name = 'sensor_data'
+        """, (compress_after,))
+        existing = cursor.fetchone()
+
+        if existing and existing[1]:
+            print(f"  ✓ Compression policy kept (chunks older than {existing[0]})")
+        else:
+            if existing:
+                cursor.execute("SELECT remove_compression_policy('sensor_data')")
+            cursor.execute("""
+                SELECT add_compression_policy('sensor_data', %s::interval);
+            """, (compress_after,))
+            if existing:
+                print(f"  ✓ Compression policy changed (chunks older than {compress_after}, was {existing[0]})")
+            else:
+                print(f"  ✓ Compression policy created (chunks older than {compress_after})")
     except Exception as e:
+        conn.rollback()
         print(f"    Note: {e}")
 
     conn.commit()
     cursor.close()
 
 
-def create_optional_policies(conn):
-    """Create optional compression and retention policies."""
-    print("\nOptional policies (commented out by default):")
+def check_retention(cursor, retention):
+    """
+    Check that no aggregate can lose buckets to a retention tier.
+
+    A refresh recomputes whole buckets from the aggregate's source, so
+    the source must be kept longer than the refresh policy looks back
+    plus one bucket. Otherwise refreshing a bucket whose oldest source
+    rows were already dropped would overwrite it with partial data.
+
+    Args:
+        cursor: Database cursor
+        retention: Dictionary {relation: drop_after interval}
+
+    Returns:
+        List of problems (empty if the tiers are safe)
+    """
+    problems = []
+    widths = dict(AGGREGATE_LEVELS)
+
+    for name, source in aggregate_sources(cursor).items():
+        drop_after = retention.get(source)
+        if not drop_after:
+            continue
+
+        start_offset = REFRESH_POLICIES[name][0]
+        cursor.execute(
+            "SELECT %s::interval >= %s::interval + %s::interval",
+            (drop_after, start_offset, widths[name])
+        )
+        if not cursor.fetchone()[0]:
+            problems.append(
+                f"sensor_data_{name} is refreshed from {source}, which must be kept at least "
+                f"{start_offset} + {widths[name]} (not {drop_after})"
+            )
+
+    return problems
+
+
+def create_retention_policies(conn, retention):
+    """
+    Store tiered retention for refresh_aggregates.py.
+
+    TimescaleDB's own retention policies drop chunks on a schedule of
+    their own, possibly before the aggregates were refreshed over them.
+    Instead, the tiers are stored in retention_tiers, and
+    refresh_aggregates.py refreshes the coarser aggregates over the
+    expiring window before it drops the chunks. Daily and monthly
+    aggregates are always kept.
+
+    Args:
+        conn: Database connection
+        retention: Dictionary {relation: drop_after interval, or None to
+                   keep the relation forever}
+    """
+    print("\nConfiguring retention tiers...")
 
     cursor = conn.cursor()
+    cursor.execute(RETENTION_TABLE)
+
+    cursor.execute("SELECT relation, drop_after::text FROM retention_tiers")
+    tiers = dict(cursor.fetchall())
+    tiers.update(retention)
+    tiers = {relation: drop_after for relation, drop_after in tiers.items() if drop_after}
+
+    problems = check_retention(cursor, tiers)
+    if problems:
+        conn.rollback()
+        for problem in problems:
+            print(f"  ✗ {problem}")
+        print("    Keep the source longer, or use --aggregates hierarchical so that only "
+              "the hourly aggregate reads raw data")
+        cursor.close()
+        return
 
-    # Compression policy (uncomment to enable)
-    print("  • Compression: Would compress data older than 7 days")
-    print("    Uncomment in script to enable")
-    # cursor.execute("""
-    #     ALTER TABLE sensor_data SET (
-    #         timescaledb.compress,
-    #         timescaledb.compress_segmentby = 'sensor_id'
-    #     );
-    # """)
-    # cursor.execute("""
-    #     SELECT add_compression_policy('sensor_data', INTERVAL '7 days');
-    # """)
-
-    # Retention policy (uncomment to enable)
-    print("  • Retention: Would delete data older than 90 days")
-    print("    Uncomment in script to enable")
-    # cursor.execute("""
-    #     SELECT add_retention_policy('sensor_data', INTERVAL '90 days');
-    # """)
+    for relation, drop_after in retention.items():
+        if drop_after:
+            cursor.execute("""
+                INSERT INTO retention_tiers (relation, drop_after) VALUES (%s, %s::interval)
+                ON CONFLICT (relation) DO UPDATE SET drop_after = EXCLUDED.drop_after
+            """, (relation, drop_after))
+        else:
+            cursor.execute("DELETE FROM retention_tiers WHERE relation = %s", (relation,))
 
+    conn.commit()
     cursor.close()
 
+    for relation in RETENTION_RELATIONS:
+        print(f"  ✓ {relation}: {f'dropped after {tiers[relation]}' if relation in tiers else 'kept forever'}")
+    print("  ✓ sensor_data_daily, sensor_data_monthly: kept forever")
+    print("    Applied by refresh_aggregates.py after each refresh")
+
+
+def create_optional_policies(conn, compression=None, retention=None):
+    """
+    Create optional compression and retention policies.
+
+    Args:
+        conn: Database connection
+        compression: Dictionary with segmentby, orderby and compress_after
+                     (None = compression disabled)
+        retention: Retention tiers for create_retention_policies
+                   (None = leave the current tiers unchanged)
+    """
+    if compression:
+        enable_compression(conn, **compression)
+
+    if retention:
+        create_retention_policies(conn, retention)
+
+    if compression and retention:
+        return
+
+    print("\nOptional policies:")
+
+    if not compression:
+        print("  • Compression: disabled")
+        print("    Enable with --compress (see --help)")
+
+    if not retention:
+        print("  • Retention: unchanged (no tiers = everything is kept)")
+        print("    Enable with --retain-raw / --retain-hourly (see --help)")
+
 
 def verify_setup(conn):
     """Verify that everything was created successfully."""
@@ -279,53 +877,259 @@ def verify_setup(conn):
     cursor.close()
 
 
-def main():
-    """Main function to initialize the database."""
-    print("=" * 60)
-    print("TimescaleDB Initialization Script")
-    print("=" * 60)
-    print()
+def initialize_database(db_config, compression=None, layout='flat', recreate_aggregates=False,
+                        schema='standard', retention=None, chunk_sizing=None, indexes=None,
+                        partitions=None):
+    """
+    Initialize one database (or shard).
+
+    Args:
+        db_config: Database configuration
+        compression: Compression settings for create_optional_policies
+        layout: Continuous aggregate layout ('flat' or 'hierarchical')
+        recreate_aggregates: Drop existing continuous aggregates first
+        schema: sensor_data schema ('standard' or 'compact')
+        retention: Retention tiers for create_optional_policies
+        chunk_sizing: Dictionary with interval, ingest_rate and memory for
+                      configure_chunk_interval (None = keep the interval)
+        indexes: Index profile of sensor_data (see INDEX_PROFILES)
+        partitions: Number of hash partitions by sensor (None = time only,
+                    or keep the current space dimension)
 
+    Returns:
+        True if the initialization succeeded
+    """
     # Connect to database
-    print("Connecting to database...")
-    conn = connect_db()
+    print(f"Connecting to database {db_config['host']}:{db_config['port']}...")
+    conn = connect_db(db_config)
     print("✓ Connected successfully")
     print()
 
     try:
         # Create hypertable
-        create_hypertable(conn)
+        schema = create_hypertable(conn, schema, indexes)
+
+        # Split every time slice by sensor
+        if partitions:
+            configure_space_partitions(conn, SENSOR_COLUMNS[schema], partitions)
+
+        # Size chunks for the ingest rate and memory
+        if chunk_sizing:
+            configure_chunk_interval(conn, schema, **chunk_sizing)
 
         # Create continuous aggregates
-        create_continuous_aggregates(conn)
+        if recreate_aggregates:
+            drop_continuous_aggregates(conn)
+        create_continuous_aggregates(conn, layout)
 
         # Create refresh policies
         create_refresh_policies(conn)
 
         # Create optional policies
-        create_optional_policies(conn)
+        create_optional_policies(conn, compression, retention)
 
         # Verify setup
         verify_setup(conn)
-
-        print()
-        print("=" * 60)
-        print("Database initialization completed successfully!")
-        print("=" * 60)
-        print()
-        print("Next steps:")
-        print("  1. Run: python3 generate_data.py --days 30 --sensors 10")
-        print("  2. Run: python3 app/api.py")
-        print("  3. Test: curl http://localhost:5000/api/sensors")
-        print()
+        return True
 
     except Exception as e:
         print(f"\n✗ Error during initialization: {e}")
         import traceback
         traceback.print_exc()
+        return False
     finally:
         conn.close()
 
 
+def main():
+    """Main function to initialize the database."""
+    parser = argparse.ArgumentParser(
+        description='Initialize TimescaleDB schema, aggregates and policies'
+    )
+
+    parser.add_argument(
+        '--shards',
+        type=str,
+        default=os.getenv('DB_SHARDS', ''),
+        help='Comma-separated shards "name=host:port[/db]" to initialize '
+             '(default: $DB_SHARDS or localhost:5432)'
+    )
+
+    parser.add_argument(
+        '--schema',
+        choices=SENSOR_SCHEMAS,
+        default='standard',
+        help='Store sensor_id in every row, or an integer sensor_key with the names '
+             'in a sensors table (default: standard)'
+    )
+
+    parser.add_argument(
+        '--indexes',
+        choices=list(INDEX_PROFILES),
+        default=None,
+        help='Index profile of sensor_data: default (sensor+time and time), covering '
+             '(sensor+time INCLUDE readings), brin (sensor+time and BRIN on time) or '
+             'minimal (sensor+time only) (default: unchanged, default for a new table)'
+    )
+
+    parser.add_argument(
+        '--space-partitions',
+        type=int,
+        default=None,
+        help='Also partition sensor_data by a hash of the sensor into this many '
+             'partitions; needs an empty table (default: time only)'
+    )
+
+    parser.add_argument(
+        '--compress',
+        action='store_true',
+        help='Enable native compression with a compression policy'
+    )
+
+    parser.add_argument(
+        '--compress-segmentby',
+        type=str,
+        default=None,
+        help='Columns to segment compressed data by, empty for none '
+             '(default: sensor_id, or sensor_key with --schema compact)'
+    )
+
+    parser.add_argument(
+        '--compress-orderby',
+        type=str,
+        default='time DESC',
+        help='Sort order inside compressed segments (default: "time DESC")'
+    )
+
+    parser.add_argument(
+        '--compress-after',
+        type=str,
+        default='7 days',
+        help='Compress chunks older than this interval (default: "7 days")'
+    )
+
+    parser.add_argument(
+        '--aggregates',
+        choices=AGGREGATE_LAYOUTS,
+        default='flat',
+        help='Build every aggregate from raw data, or daily from hourly and '
+             'monthly from daily (default: flat)'
+    )
+
+    parser.add_argument(
+        '--recreate-aggregates',
+        action='store_true',
+        help='Drop and recreate the continuous aggregates, e.g. to switch --aggregates '
+             '(they are empty until the next refresh)'
+    )
+
+    parser.add_argument(
+        '--retain-raw',
+        type=str,
+        default=None,
+        help='Drop raw sensor_data older than this interval, e.g. "30 days", after '
+             'downsampling it; "forever" removes the tier (default: unchanged)'
+    )
+
+    parser.add_argument(
+        '--retain-hourly',
+        type=str,
+        default=None,
+        help='Drop hourly aggregate buckets older than this interval, e.g. "6 months"; '
+             '"forever" removes the tier (default: unchanged)'
+    )
+
+    parser.add_argument(
+        '--chunk-interval',
+        type=str,
+        default=None,
+        help='Chunk interval of sensor_data, e.g. "6 hours", or "auto" to size chunks '
+             'from --ingest-rate and --memory (default: unchanged, 1 day for a new table)'
+    )
+
+    parser.add_argument(
+        '--ingest-rate',
+        type=float,
+        default=None,
+        help='Expected readings per second across all sensors of a database, e.g. '
+             'sensors / interval (default: measured from existing data)'
+    )
+
+    parser.add_argument(
+        '--memory',
+        type=str,
+        default=None,
+        help='Memory of the database server, e.g. "16GB"; a chunk may use '
+             f'{MEMORY_SHARE * 100:.0f}%% of it (default: shared_buffers)'
+    )
+
+    args = parser.parse_args()
+
+    if args.space_partitions is not None and args.space_partitions < 1:
+        parser.error("--space-partitions must be at least 1")
+
+    chunk_sizing = None
+    if args.chunk_interval:
+        try:
+            memory = parse_size(args.memory) if args.memory else None
+        except ValueError as e:
+            parser.error(str(e))
+        chunk_sizing = {
+            'interval': args.chunk_interval,
+            'ingest_rate': args.ingest_rate,
+            'memory': memory
+        }
+    elif args.ingest_rate or args.memory:
+        parser.error("--ingest-rate and --memory need --chunk-interval auto")
+
+    retention = {}
+    for relation, value in (('sensor_data', args.retain_raw), ('sensor_data_hourly', args.retain_hourly)):
+        if value is not None:
+            retention[relation] = None if value.lower() == 'forever' else value
+
+    compression = None
+    if args.compress:
+        compression = {
+            'segmentby': args.compress_segmentby,
+            'orderby': args.compress_orderby,
+            'compress_after': args.compress_after
+        }
+
+    print("=" * 60)
+    print("TimescaleDB Initialization Script")
+    print("=" * 60)
+    print()
+
+    shards = parse_shards(args.shards, DB_CONFIG)
+
+    failed = []
+    for shard, db_config in shards.items():
+        if len(shards) > 1:
+            print("=" * 60)
+            print(f"Shard: {shard}")
+            print("=" * 60)
+        if not initialize_database(db_config, compression, args.aggregates, args.recreate_aggregates,
+                                   args.schema, retention, chunk_sizing, args.indexes,
+                                   args.space_partitions):
+            failed.append(shard)
+        print()
+
+    if failed:
+        print("=" * 60)
+        print(f"✗ Database initialization failed on: {', '.join(failed)}")
+        print("=" * 60)
+        sys.exit(1)
+
+    print("=" * 60)
+    print("Database initialization completed successfully!")
+    print("=" * 60)
+    print()
+    print("Next steps:")
+    print("  1. Run: python3 generate_data.py --days 30 --sensors 10")
+    print("  2. Run: python3 app/api.py")
+    print("  3. Test: curl http://localhost:5000/api/sensors")
+    print()
+
+
 if __name__ == "__main__":
     main()
@@ -4,12 +4,46 @@ Refresh Continuous Aggregates Script
 
 This script manually refreshes all continuous aggregates.
 Typically run by cron job to keep aggregates up-to-date.
+
+Each run only refreshes what changed: the windows pending in an
+aggregate's invalidation log and the readings newer than its
+watermark, the newest reading covered by its last refresh (stored
+in the aggregate_watermarks table). Use --full to refresh the whole
+history, e.g. to repair an aggregate.
+
+Large refreshes are split into bounded windows (--window); the
+windows of one view run one after another. Independent views run in
+parallel on --workers connections, and shards (--shards) in parallel
+processes. A hierarchical level only starts once the level it reads
+from is complete.
+
+Every refreshed window is recorded in aggregate_refresh_history
+(duration, lag, and with --count-buckets the buckets materialized). --summary reports the history
+per day together with the stats of TimescaleDB's policy jobs.
+
+Afterwards it applies the retention tiers configured with
+init_database.py --retain-raw / --retain-hourly, downsampling
+expiring data before its chunks are dropped.
 """
 
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import redirect_stdout
+import io
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+import os
+import queue
 import sys
+import time
+
+# Shard configuration shared with the API (app/shards.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app'))
+from shards import parse_shards  # noqa: E402
+from init_database import (  # noqa: E402
+    AGGREGATE_LEVELS, REFRESH_POLICIES, RETENTION_RELATIONS, aggregate_sources
+)
 
 
 # Database configuration
@@ -21,6 +55,113 @@ DB_CONFIG = {
     'password': 'postgres'
 }
 
+# Newest reading covered by the last refresh of each view
+WATERMARK_TABLE = """
+    CREATE TABLE IF NOT EXISTS aggregate_watermarks (
+        view_name     TEXT PRIMARY KEY,
+        watermark     TIMESTAMPTZ NOT NULL,
+        refreshed_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+"""
+
+# Time before which apply_retention has dropped a relation's chunks;
+# buckets before it cannot be recomputed from complete source data
+RETENTION_MARK_TABLE = """
+    CREATE TABLE IF NOT EXISTS retention_marks (
+        relation        TEXT PRIMARY KEY,
+        dropped_before  TIMESTAMPTZ NOT NULL,
+        dropped_at      TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+"""
+
+# One row per refreshed window
+HISTORY_TABLE = """
+    CREATE TABLE IF NOT EXISTS aggregate_refresh_history (
+        id                BIGSERIAL PRIMARY KEY,
+        run_started       TIMESTAMPTZ NOT NULL,
+        view_name         TEXT NOT NULL,
+        window_start      TIMESTAMPTZ,
+        window_end        TIMESTAMPTZ,
+        started_at        TIMESTAMPTZ NOT NULL,
+        duration_seconds  DOUBLE PRECISION NOT NULL,
+        buckets           BIGINT,
+        lag               INTERVAL,
+        succeeded         BOOLEAN NOT NULL
+    )
+"""
+
+HISTORY_SUMMARY_QUERY = """
+    SELECT
+        view_name,
+        date_trunc('day', started_at) AS day,
+        count(DISTINCT run_started) AS runs,
+        count(*) AS windows,
+        count(*) FILTER (WHERE NOT succeeded) AS failed,
+        sum(duration_seconds) AS seconds,
+        max(duration_seconds) AS max_window_seconds,
+        sum(buckets) AS buckets,
+        max(lag) AS max_lag
+    FROM aggregate_refresh_history
+    WHERE started_at > now() - %s * INTERVAL '1 day'
+    GROUP BY 1, 2
+    ORDER BY 1, 2
+"""
+
+# Background jobs (refresh, compression, retention policies) with their stats
+JOB_STATS_QUERY = """
+    SELECT
+        j.job_id,
+        j.application_name,
+        coalesce(c.view_name::text, j.hypertable_name::text),
+        s.last_run_status,
+        s.last_run_started_at,
+        s.last_run_duration,
+        s.total_runs,
+        s.total_failures,
+        s.next_start
+    FROM timescaledb_information.jobs j
+    JOIN timescaledb_information.job_stats s ON s.job_id = j.job_id
+    LEFT JOIN timescaledb_information.continuous_aggregates c
+        ON c.materialization_hypertable_schema = j.hypertable_schema
+        AND c.materialization_hypertable_name = j.hypertable_name
+    ORDER BY j.job_id
+"""
+
+# Pending invalidations of a continuous aggregate: ranges it has not
+# materialized yet (unbounded before the first and after the last
+# refresh), plus changes to its source hypertable that no refresh has
+# processed and that start before the watermark (newer readings are
+# refreshed anyway). Times are TimescaleDB's internal representation
+# (microseconds since 2000-01-01 UTC).
+INVALIDATION_QUERY = """
+    SELECT l.lowest_modified_value, l.greatest_modified_value
+    FROM _timescaledb_catalog.continuous_aggs_materialization_invalidation_log l
+    JOIN _timescaledb_catalog.continuous_agg c ON c.mat_hypertable_id = l.materialization_id
+    WHERE c.user_view_name = %(view)s
+    UNION ALL
+    SELECT l.lowest_modified_value, l.greatest_modified_value
+    FROM _timescaledb_catalog.continuous_aggs_hypertable_invalidation_log l
+    JOIN _timescaledb_catalog.continuous_agg c ON c.raw_hypertable_id = l.hypertable_id
+    WHERE c.user_view_name = %(view)s
+    AND l.lowest_modified_value < %(watermark)s
+"""
+
+INTERNAL_EPOCH = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+# Largest window refreshed in one call (transaction) per level
+REFRESH_WINDOWS = {
+    'hourly': '7 days',
+    'daily': '1 month',
+    'monthly': '1 year'
+}
+
+
+def format_window(start_time, end_time):
+    """Format a refresh window (None = unbounded)."""
+    start = f"{start_time:%Y-%m-%d %H:%M}" if start_time else "beginning"
+    end = f"{end_time:%Y-%m-%d %H:%M}" if end_time else "end"
+    return f"[{start}, {end})"
+
 
 def refresh_continuous_aggregate(conn, view_name, start_time=None, end_time=None):
     """
@@ -30,59 +171,707 @@ def refresh_continuous_aggregate(conn, view_name, start_time=None, end_time=None
         conn: Database connection
         view_name: Name of the materialized view
         start_time: Start of refresh window (None = beginning of time)
-        end_time: End of refresh window (None = now)
+        end_time: End of refresh window (None = newest data)
+
+    Returns:
+        True if the refresh succeeded
     """
     cursor = conn.cursor()
+    label = view_name
+    if start_time or end_time:
+        label += f" {format_window(start_time, end_time)}"
 
     try:
-        print(f"Refreshing {view_name}...", end=" ")
-
-        if start_time and end_time:
-            cursor.execute(
-                f"CALL refresh_continuous_aggregate(%s, %s, %s);",
-                (view_name, start_time, end_time)
-            )
-        else:
-            # Refresh all data
-            cursor.execute(
-                f"CALL refresh_continuous_aggregate(%s, NULL, NULL);",
-                (view_name,)
-            )
+        # One line per refresh, as refreshes may run in parallel
+        start = time.time()
+        cursor.execute(
+            "CALL refresh_continuous_aggregate(%s, %s, %s);",
+            (view_name, start_time, end_time)
+        )
 
         conn.commit()
-        print("✓")
+        print(f"✓ Refreshed {label} in {time.time() - start:.1f} s")
+        return True
 
     except Exception as e:
-        print(f"✗ Error: {e}")
+        print(f"✗ Error refreshing {label}: {e}")
         conn.rollback()
+        return False
     finally:
         cursor.close()
 
 
-def main():
-    """Main function to refresh all continuous aggregates."""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    print(f"[{timestamp}] Starting continuous aggregate refresh")
+def internal_time(value):
+    """Convert a TimescaleDB internal time to a datetime (None = unbounded)."""
+    try:
+        return INTERNAL_EPOCH + timedelta(microseconds=value)
+    except OverflowError:
+        # -infinity / +infinity
+        return None
+
+
+def invalidated_windows(cursor, view_name, watermark):
+    """
+    Read the pending invalidations of a continuous aggregate.
+
+    Args:
+        cursor: Database cursor
+        view_name: Continuous aggregate
+        watermark: Newest reading covered by the last refresh; source
+                   changes starting after it are left out
 
+    Returns:
+        List of (start, end) windows (None = unbounded), or None if
+        the TimescaleDB catalog cannot be read
+    """
+    internal_watermark = (watermark - INTERNAL_EPOCH) // timedelta(microseconds=1)
     try:
-        # Connect to database
-        conn = psycopg2.connect(**DB_CONFIG)
+        cursor.execute(INVALIDATION_QUERY, {'view': view_name, 'watermark': internal_watermark})
+    except psycopg2.Error as e:
+        print(f"Note: cannot read the invalidation log of {view_name}: {str(e).strip()}")
+        return None
+    return [(internal_time(lowest), internal_time(greatest)) for lowest, greatest in cursor.fetchall()]
+
+
+def bucket_window(cursor, bucket_width, start_time, end_time):
+    """Widen a window to whole buckets (None = unbounded)."""
+    cursor.execute(
+        "SELECT time_bucket(%s::interval, %s::timestamptz), "
+        "time_bucket(%s::interval, %s::timestamptz) + %s::interval",
+        (bucket_width, start_time, bucket_width, end_time, bucket_width)
+    )
+    return cursor.fetchone()
 
-        # Set connection to autocommit mode
-        # This is required because CALL refresh_continuous_aggregate()
-        # cannot run inside a transaction block
-        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+
+def bucket_ceiling(cursor, bucket_width, value):
+    """First bucket boundary at or after value (None = None)."""
+    if value is None:
+        return None
+    cursor.execute("""
+        SELECT CASE WHEN b = %s::timestamptz THEN b ELSE b + %s::interval END
+        FROM (SELECT time_bucket(%s::interval, %s::timestamptz) AS b) t
+    """, (value, bucket_width, bucket_width, value))
+    return cursor.fetchone()[0]
+
+
+def retention_marks(cursor):
+    """
+    Read how far apply_retention has dropped each relation.
+
+    Returns:
+        Dictionary {relation: time before which chunks were dropped}
+    """
+    cursor.execute(RETENTION_MARK_TABLE)
+    cursor.execute("SELECT relation, dropped_before FROM retention_marks")
+    return dict(cursor.fetchall())
+
+
+def merge_windows(windows):
+    """Merge overlapping or adjacent windows (None = unbounded)."""
+    merged = []
+    for start_time, end_time in sorted(windows, key=lambda window: (window[0] is not None, window[0])):
+        if merged and (merged[-1][1] is None or start_time is None or start_time <= merged[-1][1]):
+            previous_start, previous_end = merged[-1]
+            if previous_end is not None and end_time is not None:
+                end_time = max(previous_end, end_time)
+            else:
+                end_time = None
+            merged[-1] = (previous_start, end_time)
+        else:
+            merged.append((start_time, end_time))
+    return merged
+
+
+def plan_refresh(cursor, view_name, bucket_width, lookback, watermark, oldest, newest, full=False):
+    """
+    Choose the windows of a continuous aggregate to refresh.
+
+    These are the pending invalidations from the aggregate's
+    invalidation log plus the readings newer than its watermark. The
+    invalidations are clipped to the readings up to the watermark: the
+    log holds unbounded ranges that were never materialized, and the
+    readings after the watermark are refreshed anyway. If the log
+    cannot be read, the lookback before the watermark is refreshed
+    instead, as the refresh policy would. A view without watermark is
+    refreshed in full.
+
+    Args:
+        cursor: Database cursor
+        view_name: Continuous aggregate
+        bucket_width: Bucket width of the aggregate
+        lookback: Interval refreshed before the watermark if the log
+                  cannot be read
+        watermark: Newest reading covered by the last refresh
+                   (None = no refresh recorded)
+        oldest: Oldest reading in sensor_data
+        newest: Newest reading in sensor_data
+        full: Refresh the whole history
+
+    Returns:
+        (list of bucket-aligned (start, end) windows, where they come from)
+    """
+    if full or watermark is None:
+        return [(None, None)], 'full refresh' if full else 'no watermark yet'
+
+    windows = invalidated_windows(cursor, view_name, watermark)
+    source = 'invalidation log'
+    if windows is None:
+        cursor.execute("SELECT %s::timestamptz - %s::interval", (watermark, lookback))
+        windows = [(cursor.fetchone()[0], watermark)]
+        source = f"last {lookback} before watermark"
+    elif oldest is None:
+        # No readings to refresh from
+        windows = []
+    else:
+        upper = min(newest, watermark)
+        windows = [
+            (max(start_time or oldest, oldest), min(end_time or upper, upper))
+            for start_time, end_time in windows
+        ]
+        windows = [(start_time, end_time) for start_time, end_time in windows if start_time <= end_time]
+
+    if newest is not None and newest > watermark:
+        windows.append((watermark, newest))
+        source += ' and new readings'
+
+    aligned = [bucket_window(cursor, bucket_width, start, end) for start, end in windows]
+    return merge_windows(aligned), source
+
+
+def split_window(cursor, bucket_width, start_time, end_time, window, oldest, newest):
+    """
+    Split a refresh window into bounded windows of whole buckets.
+
+    Unbounded ends are replaced by the buckets of the oldest and
+    newest reading, so a full refresh can be split as well.
+
+    Args:
+        cursor: Database cursor
+        bucket_width: Bucket width of the aggregate
+        start_time: Bucket-aligned start (None = unbounded)
+        end_time: Bucket-aligned end (None = unbounded)
+        window: Largest window as an interval
+        oldest: Oldest reading in sensor_data
+        newest: Newest reading in sensor_data
+
+    Returns:
+        List of (start, end) windows in time order
+    """
+    if start_time is None and oldest is not None:
+        start_time = bucket_window(cursor, bucket_width, oldest, None)[0]
+    if end_time is None and newest is not None:
+        end_time = bucket_window(cursor, bucket_width, None, newest)[1]
+    if start_time is None or end_time is None:
+        # No readings to bound the window with
+        return [(start_time, end_time)]
+
+    cursor.execute("""
+        SELECT DISTINCT time_bucket(%s::interval, boundary)
+        FROM generate_series(%s::timestamptz, %s::timestamptz, %s::interval) boundary
+        ORDER BY 1
+    """, (bucket_width, start_time, end_time, window))
+    boundaries = [row[0] for row in cursor.fetchall()] + [end_time]
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if start < end]
+
+
+def refresh_stages(cursor):
+    """
+    Group the aggregate levels into stages that can refresh together.
+
+    A hierarchical level reads the level below, so it starts a new
+    stage; levels built from raw sensor_data share one.
+
+    Returns:
+        List of lists of (level name, bucket width), finest first
+    """
+    sources = aggregate_sources(cursor)
+    stages = []
+    finer = None
+    for name, bucket_width in AGGREGATE_LEVELS:
+        if not stages or sources.get(name, 'sensor_data') == finer:
+            stages.append([])
+        stages[-1].append((name, bucket_width))
+        finer = f"sensor_data_{name}"
+    return stages
+
+
+def count_buckets(conn, view_name, start_time, end_time):
+    """Count the (bucket, sensor) rows of a view within a window (None = unbounded)."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"""
+            SELECT count(*) FROM {view_name}
+            WHERE bucket >= coalesce(%s::timestamptz, '-infinity')
+            AND bucket < coalesce(%s::timestamptz, 'infinity')
+        """, (start_time, end_time))
+        return cursor.fetchone()[0]
+    except psycopg2.Error:
+        return None
+    finally:
+        cursor.close()
+
+
+def record_refreshes(cursor, run_started, view_name, refreshes, watermark):
+    """
+    Record the refreshed windows of a view in aggregate_refresh_history.
+
+    Args:
+        cursor: Database cursor
+        run_started: Start of this run of the script
+        view_name: Continuous aggregate
+        refreshes: Results of refresh_aggregates' refresh_window
+        watermark: Watermark of the view after the refresh, the lag
+                   is measured from it (None = no lag)
+    """
+    for refresh in refreshes:
+        cursor.execute("""
+            INSERT INTO aggregate_refresh_history
+                (run_started, view_name, window_start, window_end, started_at,
+                 duration_seconds, buckets, lag, succeeded)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, now() - %s::timestamptz, %s)
+        """, (
+            run_started, view_name, refresh['start_time'], refresh['end_time'],
+            refresh['started_at'], refresh['seconds'], refresh['buckets'],
+            watermark, refresh['succeeded']
+        ))
+
+
+def refresh_aggregates(conn, full=False, connections=None, window=None, count=False):
+    """
+    Refresh every continuous aggregate level, finest first.
+
+    The views of one stage (see refresh_stages) are refreshed in
+    parallel, one per connection at a time. The windows of one view
+    run one after another: TimescaleDB locks the materialization
+    hypertable for each refresh, so they would wait for each other
+    anyway. The watermark of a view
+    is only advanced if all of its windows were refreshed, so a failed
+    window is retried by the next run. Every window is recorded in
+    aggregate_refresh_history. Windows never reach back into buckets
+    whose source chunks were dropped by apply_retention.
+
+    Args:
+        conn: Database connection in autocommit mode
+        full: Refresh the whole history instead of what changed
+        connections: Autocommit connections refreshing views in
+                     parallel (None = only conn)
+        window: Largest window refreshed per call, for every level
+                (None = REFRESH_WINDOWS)
+        count: Count the (bucket, sensor) rows of each refreshed window
+               for the history (one more scan of the view per window)
+
+    Returns:
+        True if every window was refreshed
+    """
+    run_started = datetime.now(timezone.utc)
+    cursor = conn.cursor()
+    cursor.execute(WATERMARK_TABLE)
+    cursor.execute(HISTORY_TABLE)
+    cursor.execute("SELECT view_name, watermark FROM aggregate_watermarks")
+    watermarks = dict(cursor.fetchall())
+    marks = retention_marks(cursor)
+    sources = aggregate_sources(cursor)
+
+    # Taken before refreshing: readings arriving meanwhile are newer
+    # than the stored watermark and get picked up by the next run
+    cursor.execute("SELECT min(time), max(time) FROM sensor_data")
+    oldest, newest = cursor.fetchone()
+
+    # Each view borrows a connection until all of its windows are refreshed
+    idle = queue.Queue()
+    for worker_conn in connections or [conn]:
+        idle.put(worker_conn)
+
+    def refresh_view(view_name, windows):
+        worker_conn = idle.get()
+        try:
+            results = []
+            for start_time, end_time in windows:
+                started_at = datetime.now(timezone.utc)
+                start = time.time()
+                refreshed = refresh_continuous_aggregate(worker_conn, view_name, start_time, end_time)
+                results.append({
+                    'start_time': start_time,
+                    'end_time': end_time,
+                    'started_at': started_at,
+                    'seconds': time.time() - start,
+                    'buckets': count_buckets(worker_conn, view_name, start_time, end_time)
+                               if count and refreshed else None,
+                    'succeeded': refreshed
+                })
+            return results
+        finally:
+            idle.put(worker_conn)
+
+    succeeded = True
+    with ThreadPoolExecutor(max_workers=idle.qsize()) as executor:
+        # Finest first: a hierarchical daily/monthly view reads the level
+        # below, whose refresh adds to the invalidation log of the next one
+        for stage in refresh_stages(cursor):
+            # Plan the whole stage first: conn is lent to the refreshes
+            planned = {}
+            for name, bucket_width in stage:
+                view_name = f"sensor_data_{name}"
+                windows, source = plan_refresh(
+                    cursor, view_name, bucket_width, REFRESH_POLICIES[name][0],
+                    watermarks.get(view_name), oldest, newest, full
+                )
+
+                # Buckets whose source rows were partly dropped by the
+                # retention tiers would be overwritten with partial data
+                complete_from = bucket_ceiling(
+                    cursor, bucket_width, marks.get(sources.get(name, 'sensor_data'))
+                )
+                if complete_from is not None:
+                    windows = [
+                        (max(start_time or complete_from, complete_from), end_time)
+                        for start_time, end_time in windows
+                        if end_time is None or end_time > complete_from
+                    ]
+
+                if not windows:
+                    print(f"{view_name}: up to date")
+                    continue
+
+                bounded = []
+                for start_time, end_time in windows:
+                    bounded += split_window(
+                        cursor, bucket_width, start_time, end_time,
+                        window or REFRESH_WINDOWS[name], oldest, newest
+                    )
+                print(f"{view_name}: {len(bounded)} window(s) from {source}")
+                planned[view_name] = bounded
+
+            refreshes = {
+                view_name: executor.submit(refresh_view, view_name, windows)
+                for view_name, windows in planned.items()
+            }
+
+            for view_name, future in refreshes.items():
+                results = future.result()
+                watermark = watermarks.get(view_name)
+                if not all(result['succeeded'] for result in results):
+                    succeeded = False
+                elif newest is not None:
+                    watermark = newest
+                    cursor.execute("""
+                        INSERT INTO aggregate_watermarks (view_name, watermark)
+                        VALUES (%s, %s)
+                        ON CONFLICT (view_name) DO UPDATE
+                        SET watermark = EXCLUDED.watermark, refreshed_at = now()
+                    """, (view_name, newest))
+                record_refreshes(cursor, run_started, view_name, results, watermark)
+
+    cursor.close()
+    return succeeded
+
+
+def print_summary(conn, days):
+    """
+    Print the refresh history per view and day, and the policy job stats.
+
+    Args:
+        conn: Database connection in autocommit mode
+        days: Days of history to report
+    """
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT to_regclass('aggregate_refresh_history') IS NOT NULL")
+    if cursor.fetchone()[0]:
+        cursor.execute(HISTORY_SUMMARY_QUERY, (days,))
+        history = cursor.fetchall()
+    else:
+        history = []
+
+    if history:
+        print(f"\nRefresh history (last {days} days):")
+        print(f"  {'View':<20} {'Day':<10} {'Runs':>5} {'Windows':>8} {'Failed':>6} "
+              f"{'s/run':>8} {'Max s/window':>12} {'Buckets':>12} {'Max lag':>16}")
+        per_run = {}
+        for view_name, day, runs, windows, failed, seconds, max_window, buckets, max_lag in history:
+            per_run.setdefault(view_name, []).append(seconds / runs)
+            print(f"  {view_name:<20} {day:%Y-%m-%d} {runs:>5} {windows:>8} {failed:>6} "
+                  f"{seconds / runs:>8.1f} {max_window:>12.1f} "
+                  f"{f'{buckets:,}' if buckets is not None else '-':>12} "
+                  f"{str(max_lag or '-'):>16}")
+
+        # Trend: seconds per run of the last day against the first day
+        print()
+        for view_name, seconds in per_run.items():
+            if len(seconds) > 1 and seconds[0] > 0:
+                change = (seconds[-1] - seconds[0]) / seconds[0]
+                print(f"  {view_name}: {seconds[-1]:.1f} s per run, {change:+.0%} over {len(seconds)} days")
+            else:
+                print(f"  {view_name}: {seconds[-1]:.1f} s per run")
+    else:
+        print(f"\nNote: no refreshes recorded in the last {days} days")
+
+    try:
+        cursor.execute(JOB_STATS_QUERY)
+        jobs = cursor.fetchall()
+    except psycopg2.Error as e:
+        print(f"\nNote: cannot read timescaledb_information.job_stats: {str(e).strip()}")
+        jobs = []
+
+    if jobs:
+        print("\nPolicy jobs (timescaledb_information.job_stats):")
+        for job_id, name, relation, status, started, duration, runs, failures, next_start in jobs:
+            last = f"{status} at {started:%Y-%m-%d %H:%M} in {duration}" if started else "never run"
+            next_run = f"{next_start:%Y-%m-%d %H:%M}" if next_start else "-"
+            print(f"  {job_id:>5} {name} ({relation}): last {last}, "
+                  f"{runs} runs, {failures} failures, next {next_run}")
+
+    cursor.close()
+
+
+def apply_retention(conn):
+    """
+    Drop expired data tier by tier, downsampling it first.
+
+    Chunks are only dropped before a bucket boundary of the coarsest
+    aggregate reading the relation, so no bucket of it straddles the
+    dropped range. Before they are dropped, every coarser aggregate is
+    refreshed up to that boundary while the source rows still exist,
+    starting at the boundary of the previous run (retention_marks):
+    buckets before it have lost source rows and must not be recomputed.
+    If one of these refreshes fails, the tier is not dropped.
+
+    Args:
+        conn: Database connection in autocommit mode
+    """
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT to_regclass('retention_tiers') IS NOT NULL")
+    if not cursor.fetchone()[0]:
+        cursor.close()
+        return
+
+    cursor.execute("SELECT relation, drop_after::text FROM retention_tiers")
+    tiers = dict(cursor.fetchall())
+    marks = retention_marks(cursor)
+    sources = aggregate_sources(cursor)
+
+    # Finest first, so hourly is downsampled from raw before hourly expires
+    for position, relation in enumerate(RETENTION_RELATIONS):
+        if relation not in tiers:
+            continue
+
+        cursor.execute("SELECT now() - %s::interval", (tiers[relation],))
+        cutoff = cursor.fetchone()[0]
+        readers = [(name, width) for name, width in AGGREGATE_LEVELS if sources.get(name) == relation]
+        if readers:
+            cutoff = bucket_window(cursor, readers[-1][1], cutoff, None)[0]
+
+        time_column = 'time' if relation == 'sensor_data' else 'bucket'
+        cursor.execute(f"SELECT min({time_column}) FROM {relation} WHERE {time_column} < %s", (cutoff,))
+        oldest = cursor.fetchone()[0]
+
+        if oldest is None:
+            print(f"Retention {relation}: nothing older than {cutoff:%Y-%m-%d %H:%M}")
+            continue
+
+        print(f"Retention {relation}: downsampling {oldest:%Y-%m-%d %H:%M} to {cutoff:%Y-%m-%d %H:%M}")
+        downsampled = True
+        for name, bucket_width in AGGREGATE_LEVELS[position:]:
+            start_time = bucket_window(cursor, bucket_width, oldest, None)[0]
+            complete_from = bucket_ceiling(cursor, bucket_width, marks.get(relation))
+            if complete_from is not None:
+                start_time = max(start_time, complete_from)
+            end_time = bucket_window(cursor, bucket_width, cutoff, None)[0]
+
+            if start_time >= end_time:
+                continue
+            if not refresh_continuous_aggregate(conn, f"sensor_data_{name}", start_time, end_time):
+                downsampled = False
+                break
+
+        if not downsampled:
+            print(f"✗ Keeping {relation}: downsampling failed")
+            continue
+
+        cursor.execute("SELECT drop_chunks(%s, older_than => %s)", (relation, cutoff))
+        print(f"✓ Dropped {len(cursor.fetchall())} chunks of {relation} older than {cutoff:%Y-%m-%d %H:%M}")
+
+        cursor.execute("""
+            INSERT INTO retention_marks (relation, dropped_before) VALUES (%s, %s)
+            ON CONFLICT (relation) DO UPDATE
+            SET dropped_before = greatest(retention_marks.dropped_before, EXCLUDED.dropped_before),
+                dropped_at = now()
+        """, (relation, cutoff))
+
+    cursor.close()
+
+
+def connect(db_config):
+    """
+    Connect in autocommit mode.
+
+    This is required because CALL refresh_continuous_aggregate()
+    cannot run inside a transaction block.
+    """
+    conn = psycopg2.connect(**db_config)
+    conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+    return conn
+
+
+def refresh_shard(db_config, full=False, workers=1, window=None, count=False):
+    """
+    Refresh the aggregates of one database and apply its retention tiers.
+
+    Args:
+        db_config: Database configuration
+        full: Refresh the whole history instead of what changed
+        workers: Connections refreshing views in parallel; a stage has
+                 at most one view per aggregate level
+        window: Largest window refreshed per call (None = REFRESH_WINDOWS)
+        count: Count the buckets of each refreshed window
+
+    Returns:
+        True if every window was refreshed
+    """
+    conn = connect(db_config)
+    connections = [conn]
+    try:
+        for _ in range(min(workers, len(AGGREGATE_LEVELS)) - 1):
+            connections.append(connect(db_config))
 
         # Refresh all continuous aggregates
         # Note: Automated refresh policies handle this, but manual refresh
         # can be useful after bulk data inserts or for immediate updates
+        succeeded = refresh_aggregates(conn, full=full, connections=connections, window=window, count=count)
+
+        # Retention tiers (init_database.py --retain-raw / --retain-hourly)
+        apply_retention(conn)
+        return succeeded
+    finally:
+        for worker_conn in connections:
+            worker_conn.close()
+
+
+def refresh_shard_output(db_config, **options):
+    """
+    Run refresh_shard in a worker process, capturing what it prints.
+
+    Returns:
+        (True if every window was refreshed, printed output)
+    """
+    output = io.StringIO()
+    with redirect_stdout(output):
+        try:
+            succeeded = refresh_shard(db_config, **options)
+        except Exception as e:
+            print(f"✗ Error: {e}")
+            succeeded = False
+    return succeeded, output.getvalue()
+
+
+def main():
+    """Main function to refresh all continuous aggregates."""
+    parser = argparse.ArgumentParser(
+        description='Refresh the continuous aggregates and apply the retention tiers'
+    )
+
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Refresh the whole history instead of only what changed since the last run'
+    )
+
+    parser.add_argument(
+        '--summary',
+        action='store_true',
+        help='Report the refresh history and policy job stats instead of refreshing'
+    )
+
+    parser.add_argument(
+        '--days',
+        type=int,
+        default=7,
+        help='Days of history reported by --summary (default: 7)'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Connections per shard refreshing the views of a stage in parallel; '
+             'windows of one view run one after another (default: 1)'
+    )
 
-        refresh_continuous_aggregate(conn, 'sensor_data_hourly')
-        refresh_continuous_aggregate(conn, 'sensor_data_daily')
-        refresh_continuous_aggregate(conn, 'sensor_data_monthly')
+    parser.add_argument(
+        '--shards',
+        type=str,
+        default=os.getenv('DB_SHARDS', ''),
+        help='Comma-separated shards "name=host:port[/db]" to refresh in parallel '
+             '(default: $DB_SHARDS or localhost:5432)'
+    )
 
-        conn.close()
+    parser.add_argument(
+        '--count-buckets',
+        action='store_true',
+        help='Record the buckets of each refreshed window in the history (scans the view again)'
+    )
+
+    parser.add_argument(
+        '--window',
+        type=str,
+        default=None,
+        help='Largest time window refreshed per call, e.g. "1 day" '
+             f"(default: {', '.join(f'{name} {window}' for name, window in REFRESH_WINDOWS.items())})"
+    )
+
+    args = parser.parse_args()
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    if not args.summary:
+        print(f"[{timestamp}] Starting continuous aggregate refresh")
+
+    try:
+        # Refresh every shard, or the single database
+        shards = parse_shards(args.shards, DB_CONFIG)
+
+        if args.summary:
+            for shard, db_config in shards.items():
+                if len(shards) > 1:
+                    print(f"Shard {shard} ({db_config['host']}:{db_config['port']})")
+                conn = connect(db_config)
+                print_summary(conn, args.days)
+                conn.close()
+            return
+
+        options = {
+            'full': args.full,
+            'workers': args.workers,
+            'window': args.window,
+            'count': args.count_buckets
+        }
+
+        failed = []
+        if len(shards) == 1:
+            if not refresh_shard(next(iter(shards.values())), **options):
+                failed.append(next(iter(shards)))
+        else:
+            # Shards are separate databases: refresh them at the same time,
+            # printing the output of each shard once it has finished
+            with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+                futures = {
+                    shard: executor.submit(refresh_shard_output, db_config, **options)
+                    for shard, db_config in shards.items()
+                }
+                for shard, future in futures.items():
+                    succeeded, output = future.result()
+                    db_config = shards[shard]
+                    print(f"Shard {shard} ({db_config['host']}:{db_config['port']})")
+                    print(output, end='')
+                    if not succeeded:
+                        failed.append(shard)
 
+        if failed:
+            print(f"[{timestamp}] Refresh failed on: {', '.join(failed)}")
+            sys.exit(1)
         print(f"[{timestamp}] Refresh completed successfully")
 
     except Exception as e: